@@ -0,0 +1,13 @@
+"""Performance benchmarks of rcsb-api, saved as JSON files to compare releases
+
+Usage:
+    python -m benchmarks --output results-1.8.0.json
+    python -m benchmarks --output results.json --compare results-1.8.0.json
+    python -m benchmarks --filter schema. --filter construct_query. --repeat 3
+
+No network access is needed once the package schemas are available (fetched or bundled): API responses are
+synthetic and served through `rcsbapi.transport` (and, for `DataQuery`, the local stand-in server in
+`rcsbapi.dev_tools.fake_server`, which is why the benchmarks run from a source checkout only).
+"""
+
+from benchmarks.harness import BENCHMARKS, Workload, benchmark, compare, load, run_all, save  # noqa: F401
@@ -0,0 +1,32 @@
+import argparse
+import sys
+
+from benchmarks import bench_query, bench_schema  # noqa: F401  # register the benchmarks
+from benchmarks.harness import compare, load, run_all, save
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Run the rcsb-api performance benchmarks")
+    parser.add_argument("--output", default="benchmark-results.json", help="JSON file to write the results to")
+    parser.add_argument("--compare", metavar="BASELINE", default=None, help="JSON results of a previous run (e.g., the last release) to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="relative slowdown reported as a regression (default: 0.1, i.e. 10%%)")
+    parser.add_argument("--filter", action="append", default=None, help="only run benchmarks whose names start with this prefix (repeatable)")
+    parser.add_argument("--repeat", type=int, default=None, help="number of timed runs per benchmark (default: per benchmark)")
+    args = parser.parse_args()
+
+    results = run_all(args.filter, args.repeat)
+    save(results, args.output)
+    print(f"Results written to {args.output}")
+
+    if args.compare is None:
+        return 0
+    comparisons = compare(results, load(args.compare), args.threshold)
+    regressions = [comparison for comparison in comparisons if comparison["regression"]]
+    for comparison in comparisons:
+        flag = "  REGRESSION" if comparison["regression"] else ""
+        print(f"{comparison['name']:<32} {comparison['baseline']:10.4f} s -> {comparison['current']:10.4f} s  ({comparison['ratio']:.2f}x){flag}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
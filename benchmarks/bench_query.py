@@ -0,0 +1,114 @@
+"""Benchmarks of query construction, execution and response handling, against synthetic responses"""
+
+import json
+import re
+from typing import Any, Dict, List
+
+import httpx
+
+from benchmarks.harness import Workload, benchmark
+from rcsbapi.transport import Cassette, RecordTransport, RedirectTransport, use_transport
+
+ENTRY_IDS = [str(1000 + i) for i in range(2000)]
+
+
+def _entries_response(request: httpx.Request) -> httpx.Response:
+    # Answer a Data API query for "exptl.method" of the requested entries
+    query = json.loads(request.content)["query"]
+    match = re.search(r"entry_ids:\s*\[([^\]]*)\]", query)
+    entry_ids = re.findall(r'"([^"]+)"', match.group(1)) if match else []
+    entries = [{"rcsb_id": entry_id, "exptl": [{"method": "X-RAY DIFFRACTION"}]} for entry_id in entry_ids]
+    return httpx.Response(200, json={"data": {"entries": entries}})
+
+
+@benchmark("construct_query.small")
+def construct_query_small() -> Workload:
+    from rcsbapi.data import DATA_SCHEMA
+    return Workload(run=lambda: DATA_SCHEMA.construct_query("entries", ["4HHB"], ["exptl.method"]), items=1, item_unit="fields")
+
+
+@benchmark("construct_query.huge", repeat=3)
+def construct_query_huge() -> Workload:
+    from rcsbapi.data import DATA_SCHEMA
+    # Every field named "id" reachable from entries
+    return_data_list = DATA_SCHEMA.find_paths("entries", "id")
+    return Workload(
+        run=lambda: DATA_SCHEMA.construct_query("entries", ["4HHB"], return_data_list, suppress_autocomplete_warning=True),
+        items=len(return_data_list),
+        item_unit="fields",
+    )
+
+
+@benchmark("data_query.exec")
+def data_query_exec() -> Workload:
+    from rcsbapi.data import DataQuery
+    from rcsbapi.dev_tools.fake_server import start_server
+
+    def make_query() -> DataQuery:
+        return DataQuery("entries", ENTRY_IDS, ["exptl.method"])
+
+    # Record synthetic responses once, then serve them from the local stand-in server with a realistic latency
+    cassette = Cassette()
+    with use_transport(RecordTransport(cassette, transport=httpx.MockTransport(_entries_response))):
+        make_query().exec(batch_size=100)
+    server = start_server(cassette, latency=0.05)
+    redirect = RedirectTransport(f"http://127.0.0.1:{server.server_address[1]}")
+
+    def run() -> None:
+        with use_transport(redirect):
+            make_query().exec(batch_size=100)
+
+    def teardown() -> None:
+        redirect.close()
+        server.shutdown()
+    return Workload(run=run, items=len(ENTRY_IDS), item_unit="ids", teardown=teardown)
+
+
+@benchmark("data_query.merge_response")
+def merge_response() -> Workload:
+    from rcsbapi.data import DataQuery
+    query = DataQuery("entries", ["4HHB"], ["exptl.method"])
+    batch_ids = [ENTRY_IDS[i:i + 100] for i in range(0, len(ENTRY_IDS), 100)] * 10
+    batches: List[Dict[str, Any]] = [
+        {"data": {"entries": [{"rcsb_id": entry_id, "exptl": [{"method": "X-RAY DIFFRACTION"}]} for entry_id in ids]}}
+        for ids in batch_ids
+    ]
+
+    def run() -> None:
+        merged: Dict[str, Any] = {"data": {"entries": []}}
+        for batch in batches:
+            merged = query._merge_response(merged, batch)
+    return Workload(run=run, items=len(batches), item_unit="responses")
+
+
+@benchmark("search.paging")
+def search_paging() -> Workload:
+    from rcsbapi.search import AttributeQuery
+    total, rows = 20_000, 1000
+
+    def respond(request: httpx.Request) -> httpx.Response:
+        start = json.loads(request.content)["request_options"]["paginate"]["start"]
+        result_set = [str(i) for i in range(start, min(start + rows, total))]  # compact results
+        return httpx.Response(200, json={"query_id": "benchmark", "result_type": "entry", "total_count": total, "result_set": result_set})
+
+    mock_transport = httpx.MockTransport(respond)
+    query = AttributeQuery("exptl.method", "exact_match", "X-RAY DIFFRACTION")
+
+    def run() -> None:
+        with use_transport(mock_transport):
+            ids = list(query(rows=rows))
+        assert len(ids) == total
+    return Workload(run=run, items=total, item_unit="ids")
+
+
+@benchmark("model.download")
+def model_download() -> Workload:
+    from rcsbapi.model import ModelQuery
+    content = ("ATOM   1    N N   . VAL A 1 1   ? 6.204   16.869  4.854   1.00 49.05 ? 1   VAL A N   1\n" * 60_000).encode()
+    mock_transport = httpx.MockTransport(lambda request: httpx.Response(200, content=content, headers={"Content-Type": "text/plain"}))
+    model_query = ModelQuery()
+
+    def run() -> None:
+        with use_transport(mock_transport):
+            model_query.get_full_structure("4HHB")
+    return Workload(run=run, items=len(content), item_unit="bytes")
@@ -0,0 +1,68 @@
+"""Benchmarks of package import and schema construction"""
+
+import logging
+import subprocess
+import sys
+from unittest import mock
+
+from benchmarks.harness import Workload, benchmark
+
+SUBPACKAGES = ["rcsbapi.data", "rcsbapi.search", "rcsbapi.sequence", "rcsbapi.model"]
+
+
+def _import_time(module: str) -> float:
+    # Import in a fresh interpreter, so that nothing is already imported or cached
+    code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def _register_import_benchmark(module: str) -> None:
+    @benchmark(f"import.{module}", repeat=3)
+    def _() -> Workload:
+        return Workload(run=lambda: _import_time(module), self_timed=True)
+
+
+for _module in SUBPACKAGES:
+    _register_import_benchmark(_module)
+
+
+@benchmark("schema.data")
+def data_schema() -> Workload:
+    from rcsbapi.data import DATA_SCHEMA
+    from rcsbapi.data.data_schema import DataSchema
+
+    def run() -> None:
+        # Reuse the already fetched introspection results, to time schema construction only
+        with mock.patch.object(DataSchema, "fetch_schema", return_value=DATA_SCHEMA.schema), \
+                mock.patch.object(DataSchema, "_request_root_types", return_value=DATA_SCHEMA._root_introspection):
+            DataSchema()
+    return Workload(run=run)
+
+
+@benchmark("schema.sequence")
+def seq_schema() -> Workload:
+    from rcsbapi.sequence import SEQ_SCHEMA
+    from rcsbapi.sequence.seq_schema import SeqSchema
+
+    def run() -> None:
+        with mock.patch.object(SeqSchema, "fetch_schema", return_value=SEQ_SCHEMA.schema), \
+                mock.patch.object(SeqSchema, "_request_root_types", return_value=SEQ_SCHEMA._root_introspection):
+            SeqSchema()
+    return Workload(run=run)
+
+
+@benchmark("schema.search")
+def search_schema() -> Workload:
+    from rcsbapi.search.search_query import Attr
+    from rcsbapi.search.search_schema import SearchSchema, logger
+
+    def run() -> None:
+        # Load the bundled schema files, without the warning logged when falling back to them
+        level = logger.level
+        logger.setLevel(logging.ERROR)
+        try:
+            SearchSchema(Attr, refetch=False, use_fallback=True)
+        finally:
+            logger.setLevel(level)
+    return Workload(run=run)
@@ -0,0 +1,145 @@
+"""Registry, timing and JSON result handling for the benchmarks"""
+
+import json
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from rcsbapi.const import __version__
+
+
+@dataclass
+class Workload:
+    """What a benchmark measures.
+
+    Attrs:
+        run (Callable[[], Any]): function to time
+        items (float, optional): amount of work done per call (e.g., IDs or bytes), to report throughput
+        item_unit (str, optional): unit of `items` (e.g., "ids", "bytes")
+        self_timed (bool): whether `run` returns its own duration in seconds (e.g., measured in a subprocess) instead of being timed
+        teardown (Callable[[], Any], optional): function called once after all repeats
+    """
+    run: Callable[[], Any]
+    items: Optional[float] = None
+    item_unit: Optional[str] = None
+    self_timed: bool = False
+    teardown: Optional[Callable[[], Any]] = None
+
+
+@dataclass
+class Benchmark:
+    name: str
+    setup: Callable[[], Workload]
+    repeat: int
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(name: str, repeat: int = 5) -> Callable[[Callable[[], Workload]], Callable[[], Workload]]:
+    """Register a benchmark. The decorated function does any setup and returns the `Workload` to time.
+
+    Args:
+        name (str): dotted benchmark name (e.g., "schema.data")
+        repeat (int, optional): number of timed runs. Defaults to 5.
+    """
+    def register(setup: Callable[[], Workload]) -> Callable[[], Workload]:
+        BENCHMARKS.append(Benchmark(name, setup, repeat))
+        return setup
+    return register
+
+
+def run_benchmark(bench: Benchmark, repeat: Optional[int] = None) -> Dict[str, Any]:
+    """Run one benchmark and summarize its timings"""
+    workload = bench.setup()
+    times: List[float] = []
+    try:
+        for _ in range(repeat if repeat else bench.repeat):
+            start = time.perf_counter()
+            result = workload.run()
+            elapsed = time.perf_counter() - start
+            times.append(float(result) if workload.self_timed else elapsed)
+    finally:
+        if workload.teardown is not None:
+            workload.teardown()
+    median = statistics.median(times)
+    summary: Dict[str, Any] = {
+        "repeat": len(times),
+        "times": times,
+        "min": min(times),
+        "median": median,
+        "mean": statistics.mean(times),
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+    }
+    if workload.items is not None:
+        summary["items"] = workload.items
+        summary["item_unit"] = workload.item_unit
+        summary["throughput"] = workload.items / median if median > 0 else None
+    return summary
+
+
+def run_all(selected: Optional[List[str]] = None, repeat: Optional[int] = None, log: Callable[[str], Any] = print) -> Dict[str, Any]:
+    """Run the registered benchmarks whose names start with any of the `selected` prefixes (all by default)
+
+    Returns:
+        Dict[str, Any]: metadata about the environment and the results of each benchmark
+    """
+    results: Dict[str, Any] = {}
+    for bench in BENCHMARKS:
+        if selected and not any(bench.name.startswith(prefix) for prefix in selected):
+            continue
+        log(f"Running {bench.name}...")
+        results[bench.name] = run_benchmark(bench, repeat)
+        log(f"  median {results[bench.name]['median']:.4f} s")
+    return {
+        "metadata": {
+            "rcsbapi_version": __version__,
+            "python_version": sys.version.split()[0],
+            "platform": platform.platform(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        },
+        "results": results,
+    }
+
+
+def save(results: Dict[str, Any], path: str) -> None:
+    """Write benchmark results to a JSON file"""
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2)
+
+
+def load(path: str) -> Dict[str, Any]:
+    """Read benchmark results from a JSON file"""
+    with open(path, "r", encoding="utf-8") as file:
+        return dict(json.load(file))
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.1) -> List[Dict[str, Any]]:
+    """Compare the median times of benchmarks present in both result sets
+
+    Args:
+        current (Dict[str, Any]): results of the current run
+        baseline (Dict[str, Any]): results to compare against (e.g., from the previous release)
+        threshold (float, optional): relative slowdown above which a benchmark is reported as a regression. Defaults to 0.1 (10%).
+
+    Returns:
+        List[Dict[str, Any]]: name, baseline and current medians, ratio and regression flag for each common benchmark
+    """
+    comparisons = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None or not base["median"]:
+            continue
+        ratio = result["median"] / base["median"]
+        comparisons.append({
+            "name": name,
+            "baseline": base["median"],
+            "current": result["median"],
+            "ratio": ratio,
+            "regression": ratio > 1 + threshold,
+        })
+    return comparisons
@@ -23,12 +23,23 @@ logger = logging.getLogger(__name__)
 class Config:
     API_TIMEOUT: int = 100                       # Timeout in seconds for all API calls
     MAX_RETRIES: int = 5                         # Maximum number of retries to perform per request upon failure
-    RETRY_BACKOFF: int = 1                       # Delay in seconds to wait between retries; increases exponentially between retries (e.g., 1s, 2s, 4s, 8s, ...)
+    RETRY_BACKOFF: int = 1                       # Minimum delay in seconds to wait between retries; delays grow with random jitter between retries (e.g., ~1s, ~3s, ~7s, ...)
+    RETRY_MAX_BACKOFF: int = 60                  # Maximum delay in seconds to wait between retries (unless the server asks for longer with a Retry-After header)
+    CIRCUIT_BREAKER_THRESHOLD: int = 10          # Number of consecutive requests to a host failing all their retries after which further requests fail immediately (0 to disable)
+    CIRCUIT_BREAKER_RESET_TIMEOUT: int = 30      # Delay in seconds after which a trial request is sent to a host whose requests were failing immediately
     SEARCH_API_REQUESTS_PER_SECOND: int = 10     # Requests per second limit for the Search API
+    SEARCH_API_MAX_CONCURRENT_REQUESTS: int = 1  # Max number of Search API result pages to request concurrently when iterating over results (1 to request pages one at a time)
+    SEARCH_API_MAX_IN_VALUES: int = 10_000       # Max number of values of an "in" terminal; queries with more are split into concurrent sub-queries (0 to disable)
+    SEARCH_API_OPTIMIZE_QUERIES: bool = False    # Simplify Search API queries before submission (e.g., flatten groups, merge equality terminals; see SearchQuery.optimize())
     DATA_API_REQUESTS_PER_SECOND: int = 20       # Requests per second limit for the Data API
     DATA_API_BATCH_ID_SIZE: int = 300            # Size of batches to use for batching input ID list to Data API (reduce this if encountering timeouts or errors) (Max: 1000)
     DATA_API_MAX_CONCURRENT_REQUESTS: int = 4    # Max number of Data API requests to run concurrently (e.g., when input ID list is split into many small batches)
     DATA_API_INPUT_ID_LIMIT: int = 50_000        # Threshold for warning user that input ID list for Data API query is very large and may hinder performance
+    DATA_API_COALESCE_REQUESTS: bool = True      # Share one network call between identical Data API requests that are in flight at the same time
+    DATA_API_BACKGROUND_LOOP: bool = True        # Run synchronous Data API queries on a shared background event loop (reusing connections) instead of a new event loop per query
+    DATA_API_HOLDINGS_CACHE_FILE: str = ""       # Path to the local cache of holdings ID lists used by ALL_STRUCTURES (empty for the default, ~/.cache/rcsbapi/holdings.json.gz)
+    DATA_API_HOLDINGS_MAX_AGE: int = 86_400      # Age in seconds after which the cached holdings ID lists used by ALL_STRUCTURES are refreshed
+    DATA_API_HEDGE_PERCENTILE: int = 0           # Percentile of recent Data API latencies after which a slow request is duplicated and the first response used (0 to disable)
     MODEL_API_REQUESTS_PER_SECOND: int = 10      # Requests per second limit for the Model API
     SUPPRESS_AUTOCOMPLETE_WARNING: bool = False  # Turn off autocompletion warnings from being raised for Data API queries
 
@@ -65,6 +76,18 @@ class Config:
             if value <= 0:
                 raise ValueError("DATA_API_BATCH_ID_SIZE must be a positive integer")
 
+        if name == "SEARCH_API_MAX_CONCURRENT_REQUESTS":
+            if value <= 0:
+                raise ValueError("SEARCH_API_MAX_CONCURRENT_REQUESTS must be a positive integer")
+
+        if name == "SEARCH_API_MAX_IN_VALUES":
+            if value < 0:
+                raise ValueError("SEARCH_API_MAX_IN_VALUES must be a positive integer, or 0 to disable splitting queries")
+
+        if name == "DATA_API_HEDGE_PERCENTILE":
+            if not 0 <= value < 100:
+                raise ValueError("DATA_API_HEDGE_PERCENTILE must be between 0 (disabled) and 99")
+
         super().__setattr__(name, value)
 
 
@@ -100,11 +100,12 @@ class Const:
 
     # Regex strings for IDs
     DATA_API_INPUT_TYPE_TO_REGEX: MappingProxyType[str, List[str]] = field(default_factory=lambda: MappingProxyType({
-        "entry": [r"^(MA|AF|ma|af)_[A-Z0-9]*$", r"^[A-Za-z0-9]{4}$"],
-        "entity": [r"^(MA|AF|ma|af)_[A-Z0-9]*_[0-9]+$", r"^[A-Z0-9]{4}_[0-9]+$"],
-        "instance": [r"^(MA|AF|ma|af)_[A-Z0-9]*\.[A-Za-z]+$", r"^[A-Z0-9]{4}\.[A-Za-z]+$"],
-        "assembly": [r"^(MA|AF|ma|af)_[A-Z0-9]*-[0-9]+$", r"^[A-Z0-9]{4}-[0-9]+$"],
-        "interface": [r"^(MA|AF|ma|af)_[A-Z0-9]*-[0-9]+\.[0-9]+$", r"^[A-Z0-9]{4}-[0-9]+\.[0-9]+$"],
+        # Extended PDB IDs (e.g., "PDB_00004HHB") are "PDB_" followed by 8 characters
+        "entry": [r"^(MA|AF|ma|af)_[A-Z0-9]*$", r"^(PDB|pdb)_[A-Za-z0-9]{8}$", r"^[A-Za-z0-9]{4}$"],
+        "entity": [r"^(MA|AF|ma|af)_[A-Z0-9]*_[0-9]+$", r"^(PDB|pdb)_[A-Za-z0-9]{8}_[0-9]+$", r"^[A-Z0-9]{4}_[0-9]+$"],
+        "instance": [r"^(MA|AF|ma|af)_[A-Z0-9]*\.[A-Za-z]+$", r"^(PDB|pdb)_[A-Za-z0-9]{8}\.[A-Za-z]+$", r"^[A-Z0-9]{4}\.[A-Za-z]+$"],
+        "assembly": [r"^(MA|AF|ma|af)_[A-Z0-9]*-[0-9]+$", r"^(PDB|pdb)_[A-Za-z0-9]{8}-[0-9]+$", r"^[A-Z0-9]{4}-[0-9]+$"],
+        "interface": [r"^(MA|AF|ma|af)_[A-Z0-9]*-[0-9]+\.[0-9]+$", r"^(PDB|pdb)_[A-Za-z0-9]{8}-[0-9]+\.[0-9]+$", r"^[A-Z0-9]{4}-[0-9]+\.[0-9]+$"],
         # Regex for uniprot: https://www.uniprot.org/help/accession_numbers
         "uniprot": [r"[OPQ][0-9][A-Z0-9]{3}[0-9]|[A-NR-Z][0-9]([A-Z][A-Z0-9]{2}[0-9]){1,2}"]
     }))
@@ -28,5 +28,8 @@ def __getattr__(name: str):
 
 
 from rcsbapi.data.data_query import DataQuery  # noqa:E402
+from rcsbapi.data.data_cache import DataCache  # noqa:E402
+from rcsbapi.data.data_ids import normalize_ids  # noqa:E402
+from rcsbapi.data.data_mixed import MixedIdQuery  # noqa:E402
 
-__all__ = ["DataQuery", "DataSchema"]
+__all__ = ["DataQuery", "DataSchema", "DataCache", "MixedIdQuery", "normalize_ids"]
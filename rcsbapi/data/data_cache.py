@@ -0,0 +1,90 @@
+"""Persistent per-ID cache of Data API records."""
+
+import hashlib
+import json
+import logging
+import os
+import re
+from typing import Any, Dict, Iterable, Optional
+from rcsbapi.data.data_holdings import user_cache_dir
+from rcsbapi.sqlite_lru import SqliteLruStore
+
+logger = logging.getLogger(__name__)
+
+
+class DataCache:
+    """Disk-backed cache of Data API records, keyed by query shape and ID.
+
+    The query shape is the GraphQL query with its input ID list removed, so a record cached for one
+    set of IDs is reused by any later query requesting the same fields for an overlapping set of IDs.
+    Records are matched to input IDs by their `rcsb_id` field.
+
+    Example:
+        from rcsbapi.data import DataQuery, DataCache
+
+        cache = DataCache(ttl=24 * 3600)  # stored under the user cache directory
+        query = DataQuery(input_type="entries", input_ids=["4HHB", "1IYE"], return_data_list=["exptl.method"])
+        result_dict = query.exec(cache=cache)  # only IDs not already in the cache are requested
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: Optional[float] = 7 * 24 * 3600, max_size: Optional[int] = 1024**3):
+        """Open (or create) a cache database.
+
+        Args:
+            path (str, optional): path to the SQLite database file (":memory:" for a non-persistent cache).
+                Defaults to "data_cache.sqlite" under the user cache directory (`$XDG_CACHE_HOME/rcsbapi`, or `~/.cache/rcsbapi`).
+            ttl (float, optional): time in seconds after which cached records expire. None to never expire. Defaults to 7 days.
+            max_size (int, optional): maximum total size in bytes of cached records. When exceeded, the least recently
+                used records are evicted. None for no limit. Defaults to 1 GiB.
+        """
+        if path is None:
+            path = os.path.join(user_cache_dir(), "data_cache.sqlite")
+        self.path = path
+        self.ttl = ttl
+        self.max_size = max_size
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._store = SqliteLruStore(path, "records", ("shape", "id"))
+
+    @staticmethod
+    def query_shape(query: str) -> str:
+        """Get the key identifying a query independently of its input IDs.
+
+        Args:
+            query (str): query in GraphQL syntax
+
+        Returns:
+            str: hex digest of the query with its ID list removed
+        """
+        return hashlib.sha1(re.sub(r"\[([^]]+)\]", "[]", query).encode("utf-8")).hexdigest()
+
+    def get_many(self, shape: str, ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Get unexpired cached records.
+
+        Args:
+            shape (str): query shape (see `query_shape`)
+            ids (Iterable[str]): IDs to look up
+
+        Returns:
+            Dict[str, Dict[str, Any]]: dictionary mapping each cached ID to its record (IDs that aren't cached are omitted)
+        """
+        found = self._store.get_many(((shape, record_id) for record_id in ids), self.ttl)
+        return {record_id: json.loads(data) for (_, record_id), (_, data) in found.items()}
+
+    def put_many(self, shape: str, records: Dict[str, Dict[str, Any]]) -> None:
+        """Add or replace cached records, then evict expired and least recently used records if necessary.
+
+        Args:
+            shape (str): query shape (see `query_shape`)
+            records (Dict[str, Dict[str, Any]]): dictionary mapping IDs to records
+        """
+        values = {(shape, record_id): json.dumps(record, separators=(",", ":")) for record_id, record in records.items()}
+        self._store.put_many(values, self.ttl, self.max_size)
+
+    def clear(self) -> None:
+        """Remove all cached records."""
+        self._store.clear()
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._store.close()
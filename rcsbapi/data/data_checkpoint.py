@@ -0,0 +1,115 @@
+"""Persist completed Data API batches so that interrupted queries can be resumed."""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def batch_key(id_batch: List[Any]) -> str:
+    """Get a stable key for a batch of input IDs.
+
+    Args:
+        id_batch (List[Any]): batch of input IDs
+
+    Returns:
+        str: hex digest identifying the batch
+    """
+    return hashlib.sha1(json.dumps(id_batch).encode("utf-8")).hexdigest()
+
+
+class BatchCheckpoint:
+    """Local state file recording the response of every completed batch of a `DataQuery`.
+
+    The file is written in JSON Lines format. The first line is a header identifying the query,
+    and every following line holds the key and response of one completed batch. Lines are appended
+    (and flushed to disk) as soon as each batch completes, so finished work survives crashes.
+    """
+
+    def __init__(self, path: str, query: str, batch_size: int):
+        """Open (or create) a checkpoint file.
+
+        Args:
+            path (str): path to the checkpoint file
+            query (str): GraphQL query template the batches belong to
+            batch_size (int): batch size used to split the input IDs
+
+        Raises:
+            ValueError: if the file exists but was written for a different query or batch size
+        """
+        self.path = path
+        self._header = {"query": hashlib.sha1(query.encode("utf-8")).hexdigest(), "batch_size": batch_size}
+        self._completed: Dict[str, Dict[str, Any]] = {}
+        self._write_lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            self._write_header()
+            return
+
+        with open(self.path, "rb+") as file:
+            header_line = file.readline()
+            if not header_line.endswith(b"\n"):
+                # Header is truncated if the process was killed while creating the file, before any batch completed
+                logger.warning("Rewriting incomplete header of checkpoint file %r", self.path)
+                file.seek(0)
+                file.truncate()
+                file.write(self._header_line().encode("utf-8"))
+                return
+            try:
+                header = json.loads(header_line)
+            except json.JSONDecodeError:
+                header = None
+            if header != self._header:
+                raise ValueError(
+                    f"Checkpoint file {self.path!r} was created for a different query or batch size. "
+                    "Use a new checkpoint file or delete the existing one."
+                )
+            end = file.tell()
+            for line in file:
+                if not line.endswith(b"\n"):
+                    # Last line is truncated if the process was killed mid-write. Cut it off, so that the next
+                    # batch isn't appended to it.
+                    logger.warning("Removing incomplete line from checkpoint file %r", self.path)
+                    file.truncate(end)
+                    break
+                end += len(line)
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Skipping invalid line in checkpoint file %r", self.path)
+                    continue
+                self._completed[entry["key"]] = entry["response"]
+        logger.info("Loaded %d completed batches from checkpoint file %r", len(self._completed), self.path)
+
+    def _header_line(self) -> str:
+        return json.dumps(self._header) + "\n"
+
+    def _write_header(self) -> None:
+        with open(self.path, "w", encoding="utf-8") as file:
+            file.write(self._header_line())
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get the stored response of a completed batch, or None if the batch hasn't completed."""
+        return self._completed.get(key)
+
+    def save(self, key: str, response: Dict[str, Any]) -> None:
+        """Record the response of a completed batch.
+
+        This blocks until the line is flushed to disk, so call it from a thread rather than from an event loop.
+        Concurrent calls append their lines one at a time.
+
+        Args:
+            key (str): batch key (see `batch_key`)
+            response (Dict[str, Any]): JSON response of the batch
+        """
+        self._completed[key] = response
+        with self._write_lock, open(self.path, "a", encoding="utf-8") as file:
+            file.write(json.dumps({"key": key, "response": response}) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
@@ -0,0 +1,93 @@
+"""Coalesce identical concurrent Data API requests into a single network call (single-flight)."""
+
+import asyncio
+import concurrent.futures
+import copy
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Registry of in-flight requests, shared across event loops and threads.
+
+    The first caller for a key (the "leader") performs the request; every caller arriving with the
+    same key while it is in flight waits for the leader's result instead of sending its own request.
+    The leader and each waiter get their own copy of the response, so that callers can modify their results independently.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, concurrent.futures.Future] = {}
+        self._waiters: Dict[Hashable, int] = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._in_flight
+
+    async def do(self, key: Hashable, request: Callable[[], Awaitable[Any]], on_coalesced: Optional[Callable[[float], Any]] = None) -> Any:
+        """Run `request`, or wait for the identical request already in flight.
+
+        Args:
+            key (Hashable): key identifying identical requests (e.g., endpoint and query body)
+            request (Callable[[], Awaitable[Any]]): coroutine function performing the request
+            on_coalesced (Callable[[float], Any], optional): called with the time waited in seconds when the
+                caller waited for an identical request instead of sending its own (whether it succeeded or not)
+
+        Returns:
+            Any: response of the request
+        """
+        while True:
+            with self._lock:
+                future = self._in_flight.get(key)
+                leader = future is None
+                if leader:
+                    future = concurrent.futures.Future()
+                    self._in_flight[key] = future
+                    self._waiters[key] = 0
+                else:
+                    self._waiters[key] += 1
+
+            if leader:
+                break
+
+            wait_start = time.monotonic()
+            try:
+                # Shielded, so that a cancelled waiter doesn't cancel the request for the leader and other waiters
+                result = await asyncio.shield(asyncio.wrap_future(future))
+            except asyncio.CancelledError:
+                if future.cancelled():
+                    # The leader was cancelled (not this caller), so try again (possibly as the new leader)
+                    continue
+                raise
+            except BaseException:
+                if on_coalesced is not None:
+                    on_coalesced(time.monotonic() - wait_start)
+                raise
+            if on_coalesced is not None:
+                on_coalesced(time.monotonic() - wait_start)
+            logger.debug("Reused response of identical in-flight request")
+            return copy.deepcopy(result)
+
+        try:
+            result = await request()
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+                waiters = self._waiters.pop(key)
+        # Waiters copy the stored response only after the leader has returned, so it must not be the leader's object
+        # (no copy is needed if nothing is waiting, since no caller can join once the request is no longer in flight)
+        future.set_result(copy.deepcopy(result) if waiters else result)
+        return result
+
+
+DATA_API_SINGLE_FLIGHT = SingleFlight()
@@ -0,0 +1,97 @@
+"""Hedged requests: send a duplicate of a slow request and use whichever response arrives first."""
+
+import asyncio
+import collections
+import logging
+import math
+import threading
+from typing import Awaitable, Callable, Deque, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """Thread-safe window of the most recent request latencies, shared by all Data API queries in the process."""
+
+    def __init__(self, window: int = 1000, min_samples: int = 20):
+        """Create a latency tracker.
+
+        Args:
+            window (int, optional): number of most recent latencies to keep. Defaults to 1000.
+            min_samples (int, optional): number of latencies needed before percentiles are reported. Defaults to 20.
+        """
+        self._lock = threading.Lock()
+        self._latencies: Deque[float] = collections.deque(maxlen=window)
+        self._min_samples = min_samples
+
+    def record(self, seconds: float) -> None:
+        """Record the latency of a request (for a hedged request, the time until the first response was used)."""
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        """Get a percentile of the recent latencies (nearest-rank)
+
+        Args:
+            percentile (float): percentile between 0 and 100
+
+        Returns:
+            Optional[float]: latency in seconds, or None if too few requests have completed yet
+        """
+        with self._lock:
+            if len(self._latencies) < self._min_samples:
+                return None
+            latencies = sorted(self._latencies)
+        rank = max(math.ceil(percentile / 100 * len(latencies)), 1)
+        return latencies[rank - 1]
+
+    def clear(self) -> None:
+        """Forget all recorded latencies."""
+        with self._lock:
+            self._latencies.clear()
+
+
+DATA_API_LATENCY_TRACKER = LatencyTracker()
+
+
+async def hedged(primary: Callable[[], Awaitable[T]], hedge: Callable[[], Awaitable[T]], delay: float) -> T:
+    """Run `primary`, and if it hasn't completed after `delay` seconds, run `hedge` alongside it.
+
+    The first successful result is returned and the other request is cancelled. An error is only raised
+    if both requests fail (the first error is raised). Any returned result counts as a success, so the
+    functions should raise for failed requests (e.g., with `httpx.Response.raise_for_status()`).
+
+    Args:
+        primary (Callable[[], Awaitable[T]]): function starting the request
+        hedge (Callable[[], Awaitable[T]]): function starting the duplicate request (including any rate limiting)
+        delay (float): seconds to wait for `primary` before starting `hedge`
+
+    Returns:
+        T: result of whichever request succeeded first
+    """
+    tasks = [asyncio.ensure_future(primary())]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if done:
+            return tasks[0].result()
+        logger.debug("Request not completed after %.2f seconds; sending hedged request", delay)
+        tasks.append(asyncio.ensure_future(hedge()))
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task_error = task.exception()
+                if task_error is None:
+                    if task is not tasks[0]:
+                        logger.debug("Hedged request completed first")
+                    return task.result()
+                error = error if error is not None else task_error
+        assert error is not None
+        raise error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
@@ -0,0 +1,157 @@
+"""Local cache of the current PDB holdings (all IDs of an input type), used by `ALL_STRUCTURES`."""
+
+import asyncio
+import contextlib
+import gzip
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+import httpx
+from rcsbapi.config import config
+from rcsbapi.const import const
+from rcsbapi.transport import async_client
+
+logger = logging.getLogger(__name__)
+
+
+def user_cache_dir() -> str:
+    """Get the directory for rcsbapi's cache files: `$XDG_CACHE_HOME/rcsbapi` if set, otherwise `~/.cache/rcsbapi`"""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "rcsbapi")
+
+
+def default_holdings_path() -> str:
+    """Get the holdings cache file path: `config.DATA_API_HOLDINGS_CACHE_FILE` if set, otherwise under the user cache directory"""
+    if config.DATA_API_HOLDINGS_CACHE_FILE:
+        return config.DATA_API_HOLDINGS_CACHE_FILE
+    return os.path.join(user_cache_dir(), "holdings.json.gz")
+
+
+@dataclass
+class HoldingsDiff:
+    """Changes to the IDs of an input type between two holdings snapshots.
+
+    Attrs:
+        added (List[str]): IDs that are new in the latest snapshot (sorted)
+        removed (List[str]): IDs that are no longer in the latest snapshot (sorted)
+    """
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+
+class HoldingsCache:
+    """Holdings ID lists persisted as sorted arrays in a gzipped JSON file, with the time of the last refresh.
+
+    The response validators (ETag/Last-Modified) of each holdings endpoint are stored too, so that an
+    incremental refresh only downloads the lists that changed since the cached snapshot.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """Open a holdings cache file (the file is created on the first refresh).
+
+        Args:
+            path (str, optional): path to the cache file. Defaults to `default_holdings_path()`.
+        """
+        self.path = path if path is not None else default_holdings_path()
+        self.timestamp: Optional[float] = None
+        # endpoint URL -> {"ids": sorted list of IDs, "etag": ..., "last_modified": ...}
+        self._endpoints: Dict[str, Dict[str, Any]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as file:
+                snapshot = json.load(file)
+            self.timestamp = snapshot["timestamp"]
+            self._endpoints = snapshot["endpoints"]
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Ignoring unreadable holdings cache file %r: %r", self.path, e)
+            self.timestamp, self._endpoints = None, {}
+
+    def save(self) -> None:
+        """Write the cached holdings to disk (atomically replacing any existing file)."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as file:
+            json.dump({"timestamp": self.timestamp, "endpoints": self._endpoints}, file, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+    def is_fresh(self, max_age: float) -> bool:
+        """Whether every holdings list is cached, and the last refresh was less than `max_age` seconds ago"""
+        if self.timestamp is None or time.time() - self.timestamp >= max_age:
+            return False
+        return all(endpoint in self._endpoints for endpoints in const.INPUT_TYPE_TO_ALL_STRUCTURES_ENDPOINT.values() for endpoint in endpoints)
+
+    def get_all_ids(self) -> Dict[str, List[str]]:
+        """Get the cached IDs of each input type
+
+        Returns:
+            Dict[str, List[str]]: dictionary mapping input types (e.g., "entries") to their IDs
+        """
+        return {
+            input_type: [input_id for endpoint in endpoints for input_id in self._endpoints.get(endpoint, {}).get("ids", [])]
+            for input_type, endpoints in const.INPUT_TYPE_TO_ALL_STRUCTURES_ENDPOINT.items()
+        }
+
+    async def _fetch(self, client: httpx.AsyncClient, endpoint: str, incremental: bool) -> Tuple[str, Optional[httpx.Response]]:
+        """Fetch one holdings list. Returns None as the response if it hasn't changed since the cached snapshot."""
+        headers = {"User-Agent": const.USER_AGENT}
+        cached = self._endpoints.get(endpoint)
+        if incremental and cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+        response = await client.get(endpoint, headers=headers, follow_redirects=True)
+        if response.status_code == httpx.codes.NOT_MODIFIED and cached:
+            return (endpoint, None)
+        response.raise_for_status()
+        return (endpoint, response)
+
+    async def refresh(self, client: Optional[httpx.AsyncClient] = None, incremental: bool = False) -> Dict[str, HoldingsDiff]:
+        """Download the current holdings from all endpoints in parallel, save them, and report what changed.
+
+        Args:
+            client (httpx.AsyncClient, optional): client to send requests with. Defaults to a new client for the duration of the call.
+            incremental (bool, optional): only download lists that changed since the cached snapshot (using conditional requests),
+                and apply only their additions and removals. Defaults to False (download every list).
+
+        Returns:
+            Dict[str, HoldingsDiff]: IDs added and removed for each input type since the previous snapshot
+        """
+        endpoints = [endpoint for endpoints in const.INPUT_TYPE_TO_ALL_STRUCTURES_ENDPOINT.values() for endpoint in endpoints]
+        async with contextlib.AsyncExitStack() as stack:
+            if client is None:
+                client = await stack.enter_async_context(async_client())
+            responses = await asyncio.gather(*(self._fetch(client, endpoint, incremental) for endpoint in endpoints))
+
+        previous = self.get_all_ids()
+        for endpoint, response in responses:
+            if response is None:
+                logger.debug("Holdings at %s unchanged since cached snapshot", endpoint)
+                continue
+            self._endpoints[endpoint] = {
+                "ids": sorted(set(json.loads(response.text))),
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+        self.timestamp = time.time()
+
+        changes: Dict[str, HoldingsDiff] = {}
+        for input_type, ids in self.get_all_ids().items():
+            old_ids, new_ids = set(previous.get(input_type, [])), set(ids)
+            changes[input_type] = HoldingsDiff(added=sorted(new_ids - old_ids), removed=sorted(old_ids - new_ids))
+            logger.info("Holdings for %s: %d IDs (%d added, %d removed)", input_type, len(ids), len(changes[input_type].added), len(changes[input_type].removed))
+
+        try:
+            self.save()
+        except OSError as e:
+            logger.warning("Could not write holdings cache file %r: %r", self.path, e)
+        return changes
@@ -0,0 +1,177 @@
+"""Classify, normalize and validate Data API input IDs in bulk, before any requests are made."""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Pattern
+from rcsbapi.const import const
+
+# Order matters: more specific formats are tried first (e.g., "4HHB-1.1" is an interface, not an assembly)
+ID_KINDS = ("interface", "assembly", "instance", "entity", "entry", "uniprot")
+
+INPUT_TYPE_TO_ID_KIND: Dict[str, str] = {
+    "entry": "entry",
+    "entries": "entry",
+    "polymer_entity": "entity",
+    "polymer_entities": "entity",
+    "branched_entity": "entity",
+    "branched_entities": "entity",
+    "nonpolymer_entity": "entity",
+    "nonpolymer_entities": "entity",
+    "polymer_entity_instance": "instance",
+    "polymer_entity_instances": "instance",
+    "branched_entity_instance": "instance",
+    "branched_entity_instances": "instance",
+    "nonpolymer_entity_instance": "instance",
+    "nonpolymer_entity_instances": "instance",
+    "assembly": "assembly",
+    "assemblies": "assembly",
+    "interface": "interface",
+    "interfaces": "interface",
+    "uniprot": "uniprot",
+}
+
+# Plural input type to query for each kind of ID
+ID_KIND_TO_INPUT_TYPE: Dict[str, str] = {
+    "entry": "entries",
+    "entity": "polymer_entities",
+    "instance": "polymer_entity_instances",
+    "assembly": "assemblies",
+    "interface": "interfaces",
+    "uniprot": "uniprot",
+}
+
+
+def _strip_anchors(pattern: str) -> str:
+    # Make inner groups non-capturing so that `lastgroup` reports the named group of the kind
+    return re.sub(r"\((?!\?)", "(?:", pattern.lstrip("^").rstrip("$"))
+
+
+ID_PATTERNS: Dict[str, Pattern[str]] = {
+    kind: re.compile("|".join(const.DATA_API_INPUT_TYPE_TO_REGEX[kind])) for kind in ID_KINDS
+}
+"""Compiled pattern for each kind of ID, equivalent to joining the patterns in `const.DATA_API_INPUT_TYPE_TO_REGEX`"""
+
+# Single pattern classifying an ID in one match
+_CLASSIFIER = re.compile(
+    "|".join(
+        f"(?P<{kind}>{'|'.join(_strip_anchors(pattern) for pattern in const.DATA_API_INPUT_TYPE_TO_REGEX[kind])})"
+        for kind in ID_KINDS
+    )
+)
+
+
+# Extended PDB IDs of existing entries are their four-character ID with a "PDB_0000" prefix (e.g., "PDB_00004HHB_1" is "4HHB_1")
+_EXTENDED_PREFIX = re.compile(r"PDB_0000(?=[A-Z0-9]{4}(?:$|[_.-]))")
+
+
+def record_id(input_id: str) -> str:
+    """Get the `rcsb_id` the Data API returns for an (uppercased) ID.
+
+    Args:
+        input_id (str): ID in any supported format (e.g., "4HHB_1" or "PDB_00004HHB_1")
+
+    Returns:
+        str: ID with any extended PDB ID shortened to its four-character form (e.g., "4HHB_1")
+    """
+    return _EXTENDED_PREFIX.sub("", input_id, count=1) if input_id.startswith("PDB_0000") else input_id
+
+
+def classify_id(input_id: str) -> Optional[str]:
+    """Identify the kind of an ID from its format.
+
+    Args:
+        input_id (str): ID in PDB identifier format (e.g., "4HHB", "4HHB_1", "4HHB.A", "4HHB-1", "4HHB-1.1", or with an extended
+            PDB ID such as "PDB_00004HHB"), a computed structure model ID (e.g., "AF_AFP69905F1") or a UniProt accession
+
+    Returns:
+        Optional[str]: one of "entry", "entity", "instance", "assembly", "interface" or "uniprot", or None if the format isn't recognized
+    """
+    match = _CLASSIFIER.fullmatch(input_id.upper())
+    return match.lastgroup if match else None
+
+
+def id_error(input_id: Any, input_type: str) -> Optional[str]:
+    """Check the format of a single ID (see `normalize_ids` for bulk checking).
+
+    Args:
+        input_id (Any): input ID (already uppercased)
+        input_type (str): Data API input type the ID will be used with (e.g., "entries")
+
+    Returns:
+        Optional[str]: reason the ID is invalid, or None if it is valid (or input_type has no known ID format)
+    """
+    expected_kind = INPUT_TYPE_TO_ID_KIND.get(input_type)
+    if expected_kind is None or not isinstance(input_id, str):
+        return None
+    match = _CLASSIFIER.fullmatch(input_id)
+    kind = match.lastgroup if match else None
+    if kind is None:
+        return f"Invalid ID format for {input_type}"
+    if kind != expected_kind:
+        return f"Invalid ID format for {input_type} (looks like {kind} ID)"
+    return None
+
+
+@dataclass
+class NormalizedIds:
+    """Result of `normalize_ids`.
+
+    Attrs:
+        ids (List[Any]): valid IDs, uppercased and deduplicated, in input order
+        invalid (Dict[Any, str]): invalid IDs mapped to the reason they were rejected
+        kinds (Dict[str, List[Any]]): valid IDs grouped by kind (e.g., {"entry": [...], "instance": [...]})
+        duplicates (int): number of duplicate IDs removed
+        record_ids (Dict[Any, str]): valid IDs given as extended PDB IDs, mapped to the `rcsb_id` the Data API
+            returns for them (e.g., {"PDB_00004HHB": "4HHB"})
+    """
+    ids: List[Any] = field(default_factory=list)
+    invalid: Dict[Any, str] = field(default_factory=dict)
+    kinds: Dict[str, List[Any]] = field(default_factory=dict)
+    duplicates: int = 0
+    record_ids: Dict[Any, str] = field(default_factory=dict)
+
+
+def normalize_ids(input_ids: Iterable[Any], input_type: Optional[str] = None, deduplicate: bool = True) -> NormalizedIds:
+    """Uppercase, deduplicate, classify and validate input IDs in a single pass.
+
+    Args:
+        input_ids (Iterable[Any]): input IDs
+        input_type (str, optional): Data API input type the IDs will be used with (e.g., "entries"). If given, IDs whose
+            format doesn't match it are reported as invalid. Input types without a known ID format (e.g., "chem_comps")
+            aren't validated. Defaults to None (any recognized format is valid).
+        deduplicate (bool, optional): whether to remove repeated IDs. Defaults to True.
+
+    Returns:
+        NormalizedIds: valid IDs, invalid IDs with reasons, and valid IDs grouped by kind
+    """
+    expected_kind = INPUT_TYPE_TO_ID_KIND.get(input_type) if input_type is not None else None
+    validate = input_type is None or expected_kind is not None
+    fullmatch = _CLASSIFIER.fullmatch
+    result = NormalizedIds()
+    seen = set()
+
+    for input_id in input_ids:
+        if not isinstance(input_id, str):
+            # e.g., integer PubMed IDs
+            kind = None
+        else:
+            input_id = input_id.upper()
+            match = fullmatch(input_id) if validate else None
+            kind = match.lastgroup if match else None
+            if validate and kind is None:
+                result.invalid[input_id] = "Unrecognized ID format" if expected_kind is None else f"Invalid ID format for {input_type}"
+                continue
+            if expected_kind is not None and kind != expected_kind:
+                result.invalid[input_id] = f"Invalid ID format for {input_type} (looks like {kind} ID)"
+                continue
+        if deduplicate:
+            if input_id in seen:
+                result.duplicates += 1
+                continue
+            seen.add(input_id)
+        result.ids.append(input_id)
+        if kind is not None and input_id.startswith("PDB_0000"):
+            result.record_ids[input_id] = record_id(input_id)
+        if kind is not None:
+            result.kinds.setdefault(kind, []).append(input_id)
+    return result
@@ -0,0 +1,181 @@
+"""Route a heterogeneous list of IDs into concurrent per-type Data API queries."""
+
+import asyncio
+import contextlib
+import functools
+import logging
+from typing import Any, Dict, List, Optional, Tuple, Union
+import httpx
+from rcsbapi.config import config
+from rcsbapi.data.data_ids import ID_KIND_TO_INPUT_TYPE, normalize_ids
+from rcsbapi.data.data_query import DataQuery, _run_coroutine
+from rcsbapi.rate_limiter import AsyncRateLimiter
+from rcsbapi.transport import async_client
+
+logger = logging.getLogger(__name__)
+
+
+class MixedIdQuery:
+    """
+    Class for Data API queries over a mix of ID types.
+    """
+    def __init__(
+        self,
+        input_ids: List[str],
+        return_data_list: Union[List[str], Dict[str, List[str]]],
+        input_types: Optional[Dict[str, str]] = None,
+        suppress_autocomplete_warning: bool = False,
+    ):
+        """
+        Query object for Data API requests over IDs of different types (e.g., ["4HHB", "4HHB_1", "4HHB.A", "4HHB-1", "AF_AFP69905F1"]).
+
+        Each ID is classified by its format, and one `DataQuery` is built per input type.
+
+        Args:
+            input_ids (List[str]): IDs of any supported kind (entry, entity, instance, assembly, interface or UniProt accession)
+            return_data_list (list or dict): list of data to return for every input type, or dictionary mapping input types
+                (e.g., "entries", "polymer_entity_instances") to the data to return for that type.
+                IDs of types missing from the dictionary are skipped and reported by `get_invalid_ids()`.
+            input_types (dict, optional): dictionary overriding which input type is queried for a kind of ID
+                (e.g., {"entity": "nonpolymer_entities"}). By default, entities and instances are queried as polymer entities and instances.
+            suppress_autocomplete_warning (bool, optional): Whether to suppress warning when autocompletion of paths is used. Defaults to False.
+        """
+        kind_to_input_type = {**ID_KIND_TO_INPUT_TYPE, **(input_types or {})}
+        normalized = normalize_ids(input_ids)
+        self._input_ids: List[str] = normalized.ids
+        self._invalid_ids: Dict[Any, str] = dict(normalized.invalid)
+        # Records are matched to input IDs by the rcsb_id the API returns for them, which differs for extended PDB IDs
+        self._record_ids: Dict[Any, str] = dict(normalized.record_ids)
+        if self._invalid_ids:
+            logger.warning("WARNING: Skipping %d input IDs with unrecognized format. Run <query object name>.get_invalid_ids() for details.", len(self._invalid_ids))
+
+        # (input_type, query) pairs. UniProt IDs can only be queried one at a time.
+        self._queries: List[Tuple[str, DataQuery]] = []
+        for kind, ids in normalized.kinds.items():
+            input_type = kind_to_input_type[kind]
+            if isinstance(return_data_list, dict):
+                if input_type not in return_data_list:
+                    self._invalid_ids.update({input_id: f"No return_data_list given for {input_type}" for input_id in ids})
+                    continue
+                type_return_data_list = return_data_list[input_type]
+            else:
+                type_return_data_list = return_data_list
+            id_groups = [[input_id] for input_id in ids] if kind == "uniprot" else [ids]
+            for id_group in id_groups:
+                query = DataQuery(
+                    input_type=input_type,
+                    input_ids=id_group,
+                    return_data_list=type_return_data_list,
+                    suppress_autocomplete_warning=suppress_autocomplete_warning,
+                )
+                self._queries.append((query.get_input_type(), query))
+        self._response: Optional[Dict[str, Optional[Dict[str, Any]]]] = None
+
+    def get_queries(self) -> List[DataQuery]:
+        """get the per-type `DataQuery` objects
+
+        Returns:
+            List[DataQuery]: one query per input type (or per ID, for UniProt accessions)
+        """
+        return [query for _, query in self._queries]
+
+    def get_invalid_ids(self) -> Dict[Any, str]:
+        """get input IDs that were skipped, with the reason
+
+        Returns:
+            Dict[Any, str]: dictionary mapping each skipped ID to the reason it was skipped
+        """
+        return dict(self._invalid_ids)
+
+    def get_response(self) -> Optional[Dict[str, Optional[Dict[str, Any]]]]:
+        """get results of the executed query, keyed by input ID
+
+        Returns:
+            Dict[str, Optional[Dict[str, Any]]]: dictionary mapping each input ID to its record (None if no data was returned)
+        """
+        return self._response
+
+    def exec(
+        self,
+        batch_size: int = None,
+        max_retries: int = None,
+        retry_backoff: int = None,
+        max_concurrency: int = None,
+    ) -> Any:
+        """Execute all per-type queries concurrently.
+
+        Args:
+            batch_size (int, optional): size of ID batches to split up input ID lists into. Defaults to `config.DATA_API_BATCH_ID_SIZE`.
+            max_retries (int, optional): maximum number of retries to attempt for each sub-request. Defaults to `config.MAX_RETRIES`.
+            retry_backoff (int, optional): delay in seconds to wait for each retry. Defaults to `config.RETRY_BACKOFF`.
+            max_concurrency (int, optional): maximum number of sub-requests to run concurrently across all input types, and of
+                per-type queries (e.g., one per UniProt ID) to run concurrently. Defaults to `config.DATA_API_MAX_CONCURRENT_REQUESTS`.
+
+        Returns:
+            Dict[str, Optional[Dict[str, Any]]]: dictionary mapping each input ID to its record (None if no data was returned)
+            OR:
+            Coroutine: If this is run via Jupyter with Python 3.14+, a coroutine is returned which must be awaited
+        """
+        coro_factory = functools.partial(self.aexec, batch_size=batch_size, max_retries=max_retries, retry_backoff=retry_backoff, max_concurrency=max_concurrency)
+        return _run_coroutine(coro_factory)
+
+    async def aexec(
+        self,
+        batch_size: int = None,
+        max_retries: int = None,
+        retry_backoff: int = None,
+        max_concurrency: int = None,
+        client: Optional[httpx.AsyncClient] = None,
+        rate_limiter: Optional[AsyncRateLimiter] = None,
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Asynchronously execute all per-type queries concurrently, sharing one client and rate limiter.
+
+        Args:
+            client (httpx.AsyncClient, optional): client to send requests with. Defaults to a new client for the duration of the call.
+            rate_limiter (AsyncRateLimiter, optional): rate limiter shared by all queries. Defaults to a new limiter.
+            All other arguments are the same as for `exec()`.
+
+        Returns:
+            Dict[str, Optional[Dict[str, Any]]]: dictionary mapping each input ID to its record (None if no data was returned)
+        """
+        rate_limiter = rate_limiter if rate_limiter is not None else AsyncRateLimiter(config.DATA_API_REQUESTS_PER_SECOND)
+        max_concurrency = max_concurrency if max_concurrency else config.DATA_API_MAX_CONCURRENT_REQUESTS
+        # All queries share one budget of max_concurrency requests in flight, and at most max_concurrency queries
+        # run at once so that many single-ID queries (e.g., one per UniProt ID) don't all start their workers together
+        request_slots = asyncio.Semaphore(max_concurrency)
+        query_slots = asyncio.Semaphore(max_concurrency)
+
+        async def run(query: DataQuery, client: httpx.AsyncClient) -> Dict[str, Any]:
+            async with query_slots:
+                return await query._async_exec(
+                    batch_size=batch_size,
+                    max_retries=max_retries,
+                    retry_backoff=retry_backoff,
+                    max_concurrency=max_concurrency,
+                    client=client,
+                    rate_limiter=rate_limiter,
+                    semaphore=request_slots,
+                )
+
+        async with contextlib.AsyncExitStack() as stack:
+            if client is None:
+                client = await stack.enter_async_context(async_client())
+            responses = await asyncio.gather(*(run(query, client) for _, query in self._queries))
+
+        results: Dict[str, Optional[Dict[str, Any]]] = {input_id: None for input_id in self._input_ids if input_id not in self._invalid_ids}
+        input_ids_by_record_id: Dict[str, List[str]] = {}
+        for input_id in results:
+            input_ids_by_record_id.setdefault(self._record_ids.get(input_id, input_id), []).append(input_id)
+        for (input_type, query), response in zip(self._queries, responses):
+            records = response.get("data", {}).get(input_type)
+            if isinstance(records, dict):
+                # Singular input types (e.g., "uniprot") return one record for the query's only ID
+                results[query.get_input_ids()[0]] = records
+                continue
+            for record in records or []:
+                if not isinstance(record, dict):
+                    continue
+                for input_id in input_ids_by_record_id.get(str(record.get("rcsb_id")).upper(), []):
+                    results[input_id] = record
+        self._response = results
+        return results
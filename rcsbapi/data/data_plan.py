@@ -0,0 +1,174 @@
+"""Estimate the cost of a Data API query before executing it."""
+
+import math
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from rcsbapi.data.data_cache import DataCache
+
+# Fallbacks used when no requests with the same query shape have completed in this process yet
+DEFAULT_SECONDS_PER_REQUEST = 1.0
+DEFAULT_SECONDS_PER_ID = 0.005
+DEFAULT_BYTES_PER_FIELD = 50
+
+_ID_LIST_PATTERN = re.compile(r"\[([^]]+)\]")
+
+
+def count_ids(query_body: str) -> int:
+    """Count the input IDs in a query (1 for queries without an ID list)"""
+    match = _ID_LIST_PATTERN.search(query_body)
+    return match.group(1).count(",") + 1 if match else 1
+
+
+@dataclass
+class ShapeStats:
+    """Totals over completed requests with the same query shape.
+
+    Attrs:
+        requests (int): number of completed requests
+        ids (int): total number of IDs requested
+        seconds (float): total request duration in seconds
+        bytes (int): total response size in bytes
+    """
+    requests: int = 0
+    ids: int = 0
+    seconds: float = 0.0
+    bytes: int = 0
+
+
+class TimingStats:
+    """Thread-safe, in-memory record of Data API request timings and response sizes, per query shape."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats: Dict[str, ShapeStats] = {}
+
+    def record(self, query_body: str, seconds: float, n_bytes: int) -> None:
+        """Record a completed request.
+
+        Args:
+            query_body (str): query in GraphQL syntax, including its ID list
+            seconds (float): duration of the request in seconds
+            n_bytes (int): size of the response in bytes
+        """
+        n_ids = count_ids(query_body)
+        shape = DataCache.query_shape(query_body)
+        with self._lock:
+            stats = self._stats.setdefault(shape, ShapeStats())
+            stats.requests += 1
+            stats.ids += n_ids
+            stats.seconds += seconds
+            stats.bytes += n_bytes
+
+    def get(self, shape: str) -> Optional[ShapeStats]:
+        """Get a copy of the totals for a query shape, or None if no requests with that shape have completed"""
+        with self._lock:
+            stats = self._stats.get(shape)
+            return ShapeStats(**vars(stats)) if stats else None
+
+    def clear(self) -> None:
+        """Forget all recorded requests."""
+        with self._lock:
+            self._stats.clear()
+
+
+DATA_API_TIMING_STATS = TimingStats()
+
+
+@dataclass
+class QueryPlan:
+    """Estimated cost of executing a `DataQuery`.
+
+    Attrs:
+        input_type (str): query input type
+        input_ids (int): number of input IDs
+        batch_size (int): number of IDs per batch
+        batches (int): number of batches (one request each, excluding retries)
+        max_concurrency (int): maximum number of concurrent requests
+        requests_per_second (int): request rate limit
+        request_bytes (int): total size of the request payloads in bytes
+        estimated_response_bytes (int): estimated total size of the responses in bytes
+        estimated_seconds_per_request (float): estimated duration of one request in seconds
+        estimated_seconds (float): estimated total wall time in seconds
+        based_on_history (bool): whether the estimates use timings of previous requests with the same query shape
+            (otherwise, rough defaults are used)
+    """
+    input_type: str
+    input_ids: int
+    batch_size: int
+    batches: int
+    max_concurrency: int
+    requests_per_second: int
+    request_bytes: int
+    estimated_response_bytes: int
+    estimated_seconds_per_request: float
+    estimated_seconds: float
+    based_on_history: bool
+
+    def __str__(self) -> str:
+        source = "recorded timings" if self.based_on_history else "default estimates (no recorded timings for this query yet)"
+        return (
+            f"{self.input_ids} {self.input_type} IDs in {self.batches} requests of up to {self.batch_size} IDs "
+            f"({self.max_concurrency} concurrent, max {self.requests_per_second} requests/s)\n"
+            f"Estimated response size: {self.estimated_response_bytes / 1e6:.1f} MB\n"
+            f"Estimated duration: {self.estimated_seconds:.0f} s ({self.estimated_seconds_per_request:.2f} s per request), based on {source}"
+        )
+
+
+def estimate_plan(
+    query: str,
+    input_type: str,
+    input_ids: List[str],
+    n_fields: int,
+    batch_size: int,
+    max_concurrency: int,
+    requests_per_second: int,
+    stats: Optional[TimingStats] = None,
+) -> QueryPlan:
+    """Estimate the number of requests, payload sizes and duration of a query.
+
+    Args:
+        query (str): query template in GraphQL syntax
+        input_type (str): query input type
+        input_ids (List[str]): input IDs
+        n_fields (int): number of leaf fields requested per ID
+        batch_size (int): number of IDs per batch
+        max_concurrency (int): maximum number of concurrent requests
+        requests_per_second (int): request rate limit
+        stats (TimingStats, optional): recorded timings to base the estimate on. Defaults to `DATA_API_TIMING_STATS`.
+
+    Returns:
+        QueryPlan: estimated cost of the query
+    """
+    stats = stats if stats is not None else DATA_API_TIMING_STATS
+    n_ids = len(input_ids)
+    batches = math.ceil(n_ids / batch_size) if n_ids else 0
+    template_bytes = len(_ID_LIST_PATTERN.sub("[]", query).encode("utf-8"))
+    request_bytes = batches * template_bytes + sum(len(str(input_id)) + 3 for input_id in input_ids)
+
+    history = stats.get(DataCache.query_shape(query))
+    if history is not None and history.ids:
+        seconds_per_id = history.seconds / history.ids
+        bytes_per_id = history.bytes / history.ids
+        seconds_per_request = max(history.seconds / history.requests, seconds_per_id * min(batch_size, n_ids or 1))
+    else:
+        bytes_per_id = n_fields * DEFAULT_BYTES_PER_FIELD
+        seconds_per_request = DEFAULT_SECONDS_PER_REQUEST + DEFAULT_SECONDS_PER_ID * min(batch_size, n_ids or 1)
+
+    # Requests are bounded both by the number of concurrent requests and by the rate limit
+    concurrency_bound = math.ceil(batches / max_concurrency) * seconds_per_request if batches else 0.0
+    rate_bound = batches / requests_per_second
+    return QueryPlan(
+        input_type=input_type,
+        input_ids=n_ids,
+        batch_size=batch_size,
+        batches=batches,
+        max_concurrency=max_concurrency,
+        requests_per_second=requests_per_second,
+        request_bytes=request_bytes,
+        estimated_response_bytes=int(bytes_per_id * n_ids),
+        estimated_seconds_per_request=seconds_per_request,
+        estimated_seconds=max(concurrency_bound, rate_bound),
+        based_on_history=history is not None,
+    )
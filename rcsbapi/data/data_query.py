@@ -3,14 +3,31 @@ import time
 import sys
 import urllib.parse
 import re
-from typing import Any, Union, List, Dict, Optional, Tuple, Coroutine
-import json
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Iterator, Union, List, Dict, Optional, Tuple, Coroutine
 from warnings import warn
 import asyncio
+import collections.abc
+import contextlib
+import functools
+import itertools
+from dataclasses import dataclass, field
 import httpx
 from tqdm import tqdm
 from rcsbapi.data import DATA_SCHEMA
+from rcsbapi.data.data_cache import DataCache
+from rcsbapi.data.data_coalesce import DATA_API_SINGLE_FLIGHT
+from rcsbapi.data.data_hedge import DATA_API_LATENCY_TRACKER, hedged
+from rcsbapi.data.data_runner import DATA_API_BACKGROUND_LOOP, CoroutineFactory
+from rcsbapi.data.data_holdings import HoldingsCache, HoldingsDiff
+from rcsbapi.data.data_ids import id_error, normalize_ids, record_id
+from rcsbapi.data.data_checkpoint import BatchCheckpoint, batch_key
+from rcsbapi.data.data_plan import DATA_API_TIMING_STATS, QueryPlan, count_ids, estimate_plan
+from rcsbapi.data.data_table import ListPolicy, flatten_response, query_leaf_paths, to_arrow_table
 from rcsbapi.config import config
+from rcsbapi.rate_limiter import AsyncRateLimiter
+from rcsbapi.retry import RETRYABLE_STATUS_CODES, RetryPolicy
+from rcsbapi.instrumentation import COALESCED, INSTRUMENTATION
+from rcsbapi.transport import async_client
 from rcsbapi.const import const
 
 # Detect if running inside Jupyter
@@ -35,6 +52,92 @@ if "ipykernel" in sys.modules:
 logger = logging.getLogger(__name__)
 
 
+def _run_coroutine(coro_factory: CoroutineFactory) -> Any:
+    """Run a coroutine to completion, or return it to be awaited if running in Jupyter with Python 3.14+
+
+    Unless `config.DATA_API_BACKGROUND_LOOP` is False, coroutines run on the shared background event loop
+    (with its pooled client and rate limiter) instead of a new event loop per call.
+    """
+    if "ipykernel" in sys.modules and sys.version_info >= (3, 14, 0):
+        return coro_factory(client=None, rate_limiter=None)
+    if config.DATA_API_BACKGROUND_LOOP:
+        return DATA_API_BACKGROUND_LOOP.run(coro_factory)
+    return asyncio.run(coro_factory(client=None, rate_limiter=None))
+
+
+class GraphQLError(ValueError):
+    """Error reported in the `errors` of a Data API response, caused by the query or its input IDs"""
+
+
+def _is_non_transient_error(error: Exception) -> bool:
+    """Whether an error is caused by the request itself (and so can't be fixed by resending the same request)"""
+    if isinstance(error, GraphQLError):
+        return True  # not other ValueErrors, e.g., a truncated response that fails to decode
+    if isinstance(error, httpx.HTTPStatusError):
+        status_code = error.response.status_code
+        return 400 <= status_code < 500 and status_code not in RETRYABLE_STATUS_CODES
+    return False
+
+
+def _is_id_stream(input_ids: Any) -> bool:
+    """Whether input_ids should be consumed lazily (any iterable or async iterable other than a list or dict)"""
+    if isinstance(input_ids, (list, dict, str, AllStructures)):
+        return False
+    return hasattr(input_ids, "__iter__") or hasattr(input_ids, "__aiter__")
+
+
+def _iter_id_batches(input_ids: Iterable[Any], batch_size: int) -> Iterator[List[Any]]:
+    """Lazily split an iterable of IDs into batches of at most `batch_size` IDs"""
+    iterator = iter(input_ids)
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+async def _aiter_id_batches(input_ids: Union[Iterable[Any], AsyncIterable[Any]], batch_size: int) -> AsyncIterator[List[Any]]:
+    """Lazily split an iterable or async iterable of IDs into batches of at most `batch_size` IDs"""
+    if hasattr(input_ids, "__aiter__"):
+        batch: List[Any] = []
+        async for input_id in input_ids:  # type: ignore[union-attr]
+            batch.append(input_id)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+        return
+
+    # Pull from synchronous iterators in a thread, so that slow sources (e.g., a large file or
+    # a paginated search) don't block requests that are already in flight
+    loop = asyncio.get_running_loop()
+    batches = _iter_id_batches(input_ids, batch_size)  # type: ignore[arg-type]
+    while True:
+        next_batch = await loop.run_in_executor(None, next, batches, None)
+        if next_batch is None:
+            return
+        yield next_batch
+
+
+@dataclass
+class FailedBatch:
+    """Report of a batch of IDs whose sub-request failed.
+
+    Attrs:
+        ids (List[str]): input IDs in the batch
+        error (Exception): exception raised by the final attempt
+        attempts (int): number of attempts made
+        started_at (float): time at which the batch was started (seconds since the epoch)
+        attempt_times (List[float]): duration in seconds of each attempt
+    """
+    ids: List[str]
+    error: Exception
+    attempts: int
+    started_at: float
+    attempt_times: List[float] = field(default_factory=list)
+
+
 class DataQuery:
     """
     Class for Data API queries.
@@ -42,10 +145,11 @@ class DataQuery:
     def __init__(
         self,
         input_type: str,
-        input_ids: Union[List[str], Dict[str, str], Dict[str, List[str]], List[int]],
+        input_ids: Union[List[str], Dict[str, str], Dict[str, List[str]], List[int], Iterable[str], AsyncIterable[str]],
         return_data_list: List[str],
         add_rcsb_id: bool = True,
-        suppress_autocomplete_warning: bool = False
+        suppress_autocomplete_warning: bool = False,
+        validate_ids: bool = False,
     ):
         """
         Query object for Data API requests.
@@ -54,14 +158,26 @@ class DataQuery:
             input_type (str): query input type
                 (e.g., "entry", "polymer_entity_instance", etc.)
             input_ids (list or dict): list (or singular dict) of ids for which to request information
-                (e.g., ["4HHB", "2LGI"])
+                (e.g., ["4HHB", "2LGI"]). For plural input types, this can also be any iterable or async iterable
+                (e.g., a generator or a search `Session`), which is consumed lazily in batches when the query is executed.
+                Other sequences (e.g., a tuple or a search `ResultSet`) are used as a list.
             return_data_list (list): list of data to return (field names)
                 (e.g., ["rcsb_id", "exptl.method"])
             add_rcsb_id (bool, optional): whether to automatically add <input_type>.rcsb_id to queries. Defaults to True.
+            validate_ids (bool, optional): check the format of input_ids against input_type and remove duplicates before any
+                requests are made. Invalid IDs are dropped and can be inspected with `get_invalid_ids()`. Defaults to False.
         """
         suppress_autocomplete_warning = config.SUPPRESS_AUTOCOMPLETE_WARNING if config.SUPPRESS_AUTOCOMPLETE_WARNING else suppress_autocomplete_warning
 
-        if not isinstance(input_ids, AllStructures):
+        if isinstance(input_ids, collections.abc.Sequence) and not isinstance(input_ids, (list, str)):
+            input_ids = list(input_ids)
+        self._stream_consumed = False
+        self._invalid_ids: Dict[Any, str] = {}
+        if _is_id_stream(input_ids):
+            self._input_type, self._input_ids, first_id = self._process_input_id_stream(input_type, input_ids, validate_ids)
+            # Build the query template from the first ID (any ID list is replaced per batch on execution)
+            query_input_ids: Any = [first_id]
+        else:
             if isinstance(input_ids, list):
                 if len(input_ids) > config.DATA_API_INPUT_ID_LIMIT:
                     logger.warning("WARNING: More than %d IDs were provided as input. Query may take several minutes to complete.", config.DATA_API_INPUT_ID_LIMIT)
@@ -69,14 +185,16 @@ class DataQuery:
                 for value in input_ids.values():
                     if len(value) > config.DATA_API_INPUT_ID_LIMIT:
                         logger.warning("WARNING: More than %d IDs were provided as input. Query may take several minutes to complete.", config.DATA_API_INPUT_ID_LIMIT)
-
-        self._input_type, self._input_ids = self._process_input_ids(input_type, input_ids)
+            self._input_type, self._input_ids = self._process_input_ids(input_type, input_ids)
+            if validate_ids:
+                self._input_ids = self._validate_input_ids(self._input_ids)
+            query_input_ids = self._input_ids
         self._return_data_list = return_data_list
         #
         # GraphQL query as a string
         self._query: Dict[str, Any] = DATA_SCHEMA.construct_query(
             input_type=self._input_type,
-            input_ids=self._input_ids,
+            input_ids=query_input_ids,
             return_data_list=return_data_list,
             add_rcsb_id=add_rcsb_id,
             suppress_autocomplete_warning=suppress_autocomplete_warning
@@ -84,13 +202,15 @@ class DataQuery:
         #
         # JSON response to query, will be assigned after executing
         self._response: Optional[Dict[str, Any]] = None
+        self._failed_batches: List[FailedBatch] = []
+        self._quarantined_ids: Dict[str, str] = {}
+        # Settings of the last execution, reused by retry_failed()
+        self._bisect_errors = False
+        self._cache: Optional[DataCache] = None
         #
         # Other request settings
-        self._rate_limit_lock = None
-        self._last_request_time = time.monotonic()
-        self._request_count = 0
-        self._request_limit_time_interval = 10  # request rate limits are applied over 10s window
-        self._requests_per_window_limit = config.DATA_API_REQUESTS_PER_SECOND * self._request_limit_time_interval
+        self._rate_limiter = AsyncRateLimiter(config.DATA_API_REQUESTS_PER_SECOND)
+        self._client: Optional[httpx.AsyncClient] = None  # set while used as an async context manager
 
     def _process_input_ids(self, input_type: str, input_ids: Union[List[str], Dict[str, str], Dict[str, List[str]]]) -> Tuple[str, List[str]]:
         """Convert input_type to plural if possible.
@@ -144,11 +264,83 @@ class DataQuery:
         assert isinstance(input_ids, list)
         return (input_type, input_ids)
 
+    def _validate_input_ids(self, input_ids: List[str]) -> List[str]:
+        """Deduplicate input_ids and drop (and record) those whose format doesn't match the input type.
+
+        Raises:
+            ValueError: if none of the input_ids are valid
+
+        Returns:
+            List[str]: valid, unique input_ids in input order
+        """
+        normalized = normalize_ids(input_ids, self._input_type)
+        self._invalid_ids = normalized.invalid
+        if normalized.invalid:
+            logger.warning(
+                "WARNING: Skipping %d invalid input IDs for %s (e.g., %s). Run <query object name>.get_invalid_ids() for details.",
+                len(normalized.invalid),
+                self._input_type,
+                ", ".join(map(str, list(normalized.invalid)[:5])),
+            )
+        if not normalized.ids:
+            raise ValueError(f"None of the input_ids are valid for {self._input_type}: {normalized.invalid}")
+        if normalized.duplicates:
+            logger.info("Removed %d duplicate input IDs", normalized.duplicates)
+        return normalized.ids
+
+    def _process_input_id_stream(self, input_type: str, input_ids: Union[Iterable[str], AsyncIterable[str]], validate_ids: bool = False) -> Tuple[str, Any, str]:
+        """Convert input_type to plural if possible, and wrap an iterable of ids so that they are uppercased as they are consumed.
+
+        Args:
+            input_type (str): query input type
+            input_ids (Union[Iterable[str], AsyncIterable[str]]): iterable or async iterable of ids
+            validate_ids (bool, optional): drop (and record) ids whose format doesn't match the input type as they are consumed.
+                Streamed ids aren't deduplicated. Defaults to False.
+
+        Raises:
+            ValueError: if input_type has no plural form, or a synchronous iterable is empty
+
+        Returns:
+            Tuple[str, Any, str]: converted input_type, wrapped iterable of ids, and an id to build the query template with
+        """
+        if DATA_SCHEMA._root_dict[input_type][0]["ofKind"] != "LIST":
+            plural_type = const.SINGULAR_TO_PLURAL.get(input_type)
+            if not plural_type:
+                raise ValueError(f"Iterable input_ids can only be used with input types that accept a list of ids (not {input_type!r})")
+            input_type = plural_type
+
+        def normalize(input_id: Any) -> Any:
+            return input_id.upper() if isinstance(input_id, str) else input_id
+
+        def is_valid(input_id: Any) -> bool:
+            if not validate_ids:
+                return True
+            error = id_error(input_id, input_type)
+            if error is not None:
+                self._invalid_ids[input_id] = error
+            return error is None
+
+        if hasattr(input_ids, "__aiter__"):
+            async def normalized_async() -> AsyncIterator[Any]:
+                async for input_id in input_ids:  # type: ignore[union-attr]
+                    input_id = normalize(input_id)
+                    if is_valid(input_id):
+                        yield input_id
+            # IDs can't be peeked without running the event loop, so build the query with a placeholder
+            return (input_type, normalized_async(), "_")
+
+        iterator = filter(is_valid, map(normalize, input_ids))  # type: ignore[arg-type]
+        first_id = next(iterator, None)
+        if first_id is None:
+            raise ValueError("input_ids is empty" if not self._invalid_ids else f"None of the input_ids are valid for {input_type}")
+        return (input_type, itertools.chain([first_id], iterator), str(first_id))
+
     def get_input_ids(self) -> List[str]:
         """get input_ids used to make query
 
         Returns:
             Union[List[str], Dict[str, List[str]], Dict[str, str]]: input id list or dictionary
+                (or, if an iterable was given, the iterator the ids are lazily consumed from)
         """
         return self._input_ids
 
@@ -196,13 +388,109 @@ class DataQuery:
         editor_base_link = str(const.DATA_API_ENDPOINT) + "/index.html?query="
         return str(editor_base_link + urllib.parse.quote(str(self._query["query"])))
 
+    def to_columns(self, explode: Optional[str] = None, list_policy: ListPolicy = "list", separator: str = ";") -> Dict[str, List[Any]]:
+        """Flatten the executed query's response into columns, one per requested field.
+
+        Args:
+            explode (str, optional): dot-separated path of a list-valued field to produce one row per element for
+                (e.g., "polymer_entities"). Defaults to None (one row per input ID).
+            list_policy (str, optional): how to represent remaining list-valued columns: "list", "first", or "join". Defaults to "list".
+            separator (str, optional): separator used when `list_policy` is "join". Defaults to ";".
+
+        Returns:
+            Dict[str, List[Any]]: dictionary mapping dot-separated field names to equal-length lists of values
+                (e.g., {"rcsb_id": ["4HHB", "1IYE"], "exptl.method": [["X-RAY DIFFRACTION"], ["X-RAY DIFFRACTION"]]})
+        """
+        if self._response is None:
+            raise ValueError("Query has not been executed yet. Run <query object name>.exec() first.")
+        return flatten_response(
+            self._response,
+            input_type=self._input_type,
+            query=self.get_query(),
+            explode=explode,
+            list_policy=list_policy,
+            separator=separator,
+        )
+
+    def to_arrow(self, explode: Optional[str] = None, list_policy: ListPolicy = "list", separator: str = ";") -> Any:
+        """Flatten the executed query's response into a `pyarrow.Table` (requires pyarrow).
+
+        Args:
+            explode (str, optional): see `to_columns`. Defaults to None.
+            list_policy (str, optional): see `to_columns`. Defaults to "list".
+            separator (str, optional): see `to_columns`. Defaults to ";".
+
+        Returns:
+            pyarrow.Table: columnar table with one column per requested field
+        """
+        return to_arrow_table(self.to_columns(explode=explode, list_policy=list_policy, separator=separator))
+
+    def get_failed_batches(self) -> List["FailedBatch"]:
+        """get batches that failed during the last execution with `allow_partial=True`
+
+        Returns:
+            List[FailedBatch]: failed batches, with their IDs, exception, number of attempts and timings
+        """
+        return list(self._failed_batches)
+
+    def get_invalid_ids(self) -> Dict[Any, str]:
+        """get input IDs that were dropped by `validate_ids` because their format doesn't match the input type
+
+        Returns:
+            Dict[Any, str]: dictionary mapping each invalid ID to the reason it was rejected
+        """
+        return dict(self._invalid_ids)
+
+    def get_quarantined_ids(self) -> Dict[str, str]:
+        """get input IDs that were isolated as the cause of errors during the last execution with `bisect_errors=True`
+
+        Returns:
+            Dict[str, str]: dictionary mapping each quarantined ID to its error message
+        """
+        return dict(self._quarantined_ids)
+
+    def plan(self, batch_size: int = None, max_concurrency: int = None) -> QueryPlan:
+        """Estimate the cost of executing the query, without sending any requests.
+
+        Estimates are based on the timings and response sizes of previous requests for the same query
+        (with any input IDs) in this session when available, and on rough defaults otherwise.
+
+        Args:
+            batch_size (int, optional): size of ID batches to split up input ID lists into. Defaults to `config.DATA_API_BATCH_ID_SIZE`.
+            max_concurrency (int, optional): maximum number of sub-requests to run concurrently. Defaults to `config.DATA_API_MAX_CONCURRENT_REQUESTS`.
+
+        Raises:
+            ValueError: if the input IDs are lazily consumed from an iterable (their number isn't known in advance)
+
+        Returns:
+            QueryPlan: number of batches and requests, payload sizes and estimated duration
+        """
+        if self._is_streaming():
+            raise ValueError("Can't plan a query over lazily consumed input_ids; pass a list to estimate its cost")
+        batch_size = batch_size if batch_size else config.DATA_API_BATCH_ID_SIZE
+        if batch_size > const.DATA_API_MAX_BATCH_ID_SIZE:
+            raise ValueError(f"Max value for Data API `batch_size` is {const.DATA_API_MAX_BATCH_ID_SIZE} (currently set to {batch_size})")
+        return estimate_plan(
+            query=self._query["query"],
+            input_type=self._input_type,
+            input_ids=self._input_ids,
+            n_fields=len(query_leaf_paths(self._query["query"])),
+            batch_size=batch_size,
+            max_concurrency=max_concurrency if max_concurrency else config.DATA_API_MAX_CONCURRENT_REQUESTS,
+            requests_per_second=config.DATA_API_REQUESTS_PER_SECOND,
+        )
+
     def exec(
         self,
         batch_size: int = None,
         progress_bar: bool = False,
         max_retries: int = None,
         retry_backoff: int = None,
-        max_concurrency: int = None
+        max_concurrency: int = None,
+        checkpoint_file: Optional[str] = None,
+        allow_partial: bool = False,
+        bisect_errors: bool = False,
+        cache: Optional[DataCache] = None,
     ) -> Union[Dict[str, Any], Coroutine[Any, Any, Dict[str, Any]]]:
         """POST a GraphQL query and get response concurrently using httpx.
 
@@ -212,133 +500,591 @@ class DataQuery:
             max_retries (int, optional): maximum number of retries to attempt for each individual sub-request (in case of timeouts or errors). Defaults to `config.MAX_RETRIES`.
             retry_backoff (int, optional): delay in seconds to wait for each retry. Defaults to `config.RETRY_BACKOFF`.
             max_concurrency (int, optional): maximum number of sub-requests to run concurrently. Defaults to `config.DATA_API_MAX_CONCURRENT_REQUESTS`.
+            checkpoint_file (str, optional): path to a local state file in which the response of every completed batch is saved.
+                If the query is re-run with the same file (e.g., after a failure), completed batches are loaded from the file
+                and only failed or missing batches are requested. Defaults to None (no checkpointing).
+            allow_partial (bool, optional): instead of raising an error when a sub-request fails, return the merged data of all
+                successful sub-requests. Failed batches can be inspected with `get_failed_batches()` and re-requested with
+                `retry_failed()`. Defaults to False.
+            bisect_errors (bool, optional): if a sub-request fails with an error that retrying can't fix (e.g., a GraphQL error
+                caused by an invalid or withdrawn ID), recursively split the batch to isolate the offending IDs instead of failing.
+                Offending IDs are skipped and can be inspected with `get_quarantined_ids()`. Defaults to False.
+            cache (DataCache, optional): persistent cache of records. Only input IDs that aren't cached are requested, and
+                cached records are spliced into the response in input order. Newly retrieved records are added to the cache.
+                Defaults to None (no caching).
 
         Returns:
             Dict[str, Any]: JSON object containing the compiled query result (aggregated across all sub-requests)
             OR:
             Coroutine: If this is run via Jupyter with Python 3.14+, a coroutine is returned which must be awaited
         """
-        coro = self._async_exec(batch_size=batch_size, progress_bar=progress_bar, max_retries=max_retries, retry_backoff=retry_backoff, max_concurrency=max_concurrency)
+        coro_factory = functools.partial(
+            self._async_exec,
+            batch_size=batch_size,
+            progress_bar=progress_bar,
+            max_retries=max_retries,
+            retry_backoff=retry_backoff,
+            max_concurrency=max_concurrency,
+            checkpoint_file=checkpoint_file,
+            allow_partial=allow_partial,
+            bisect_errors=bisect_errors,
+            cache=cache,
+        )
+        return _run_coroutine(coro_factory)
 
-        if "ipykernel" in sys.modules and sys.version_info >= (3, 14, 0):
-            return coro
-        else:
-            result = asyncio.run(coro)
-            return result
+    async def aexec(
+        self,
+        batch_size: int = None,
+        progress_bar: bool = False,
+        max_retries: int = None,
+        retry_backoff: int = None,
+        max_concurrency: int = None,
+        checkpoint_file: Optional[str] = None,
+        allow_partial: bool = False,
+        bisect_errors: bool = False,
+        cache: Optional[DataCache] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        rate_limiter: Optional[AsyncRateLimiter] = None,
+    ) -> Dict[str, Any]:
+        """Asynchronously POST a GraphQL query and get response, in the caller's running event loop.
+
+        Unlike `exec()`, this never starts its own event loop, so it can be awaited from async applications
+        (e.g., web servers) and run alongside other I/O.
+
+        Args:
+            client (httpx.AsyncClient, optional): client to send requests with. The client is not closed afterwards.
+                Defaults to the client opened by `async with`, or else a new client for the duration of the call.
+            rate_limiter (AsyncRateLimiter, optional): rate limiter to count requests against, e.g., to share a
+                single rate limit between several queries. Defaults to this query's own limiter.
+            All other arguments are the same as for `exec()`.
+
+        Returns:
+            Dict[str, Any]: JSON object containing the compiled query result (aggregated across all sub-requests)
+        """
+        return await self._async_exec(
+            batch_size=batch_size,
+            progress_bar=progress_bar,
+            max_retries=max_retries,
+            retry_backoff=retry_backoff,
+            max_concurrency=max_concurrency,
+            checkpoint_file=checkpoint_file,
+            allow_partial=allow_partial,
+            bisect_errors=bisect_errors,
+            cache=cache,
+            client=client if client is not None else self._client,
+            rate_limiter=rate_limiter,
+        )
+
+    async def __aenter__(self) -> "DataQuery":
+        """Open a client that is reused by every `aexec()` call until the context exits"""
+        self._client = async_client()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def retry_failed(
+        self,
+        progress_bar: bool = False,
+        max_retries: int = None,
+        retry_backoff: int = None,
+        max_concurrency: int = None,
+    ) -> Union[Dict[str, Any], Coroutine[Any, Any, Dict[str, Any]]]:
+        """Re-request the batches that failed during the last execution and merge them into the response.
+
+        Batches are requested with the `bisect_errors` and `cache` settings of the last execution, and retrieved
+        records are merged in input ID order (if the query requests `rcsb_id`). Batches that fail again remain
+        available from `get_failed_batches()`.
+
+        Args:
+            progress_bar (bool, optional): display a progress bar when executing query. Defaults to False.
+            max_retries (int, optional): maximum number of retries to attempt for each sub-request. Defaults to `config.MAX_RETRIES`.
+            retry_backoff (int, optional): delay in seconds to wait for each retry. Defaults to `config.RETRY_BACKOFF`.
+            max_concurrency (int, optional): maximum number of sub-requests to run concurrently. Defaults to `config.DATA_API_MAX_CONCURRENT_REQUESTS`.
+
+        Returns:
+            Dict[str, Any]: JSON object containing the compiled query result, including newly retrieved data
+            OR:
+            Coroutine: If this is run via Jupyter with Python 3.14+, a coroutine is returned which must be awaited
+        """
+        coro_factory = functools.partial(
+            self._async_retry_failed,
+            progress_bar=progress_bar,
+            max_retries=max_retries,
+            retry_backoff=retry_backoff,
+            max_concurrency=max_concurrency,
+        )
+        return _run_coroutine(coro_factory)
 
-    async def _async_exec(self, batch_size: int = None, progress_bar: bool = False, max_concurrency: int = None, max_retries: int = None, retry_backoff: int = None) -> Dict[str, Any]:
+    async def _async_exec(
+        self,
+        batch_size: int = None,
+        progress_bar: bool = False,
+        max_concurrency: int = None,
+        max_retries: int = None,
+        retry_backoff: int = None,
+        checkpoint_file: Optional[str] = None,
+        allow_partial: bool = False,
+        bisect_errors: bool = False,
+        cache: Optional[DataCache] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        rate_limiter: Optional[AsyncRateLimiter] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ) -> Dict[str, Any]:
         """Run the asynchronous batch of requests.
+
+        If `semaphore` is given, it bounds the requests in flight instead of `max_concurrency`, e.g., to share
+        a single concurrency budget between several queries.
         """
         batch_size = batch_size if batch_size else config.DATA_API_BATCH_ID_SIZE
         if batch_size > const.DATA_API_MAX_BATCH_ID_SIZE:
             raise ValueError(f"Max value for Data API `batch_size` is {const.DATA_API_MAX_BATCH_ID_SIZE} (currently set to {batch_size})")
-        max_concurrency = max_concurrency if max_concurrency else config.DATA_API_MAX_CONCURRENT_REQUESTS
-        max_retries = max_retries if max_retries else config.MAX_RETRIES
-        retry_backoff = retry_backoff if retry_backoff else config.RETRY_BACKOFF
 
-        if len(self._input_ids) > batch_size:
-            batched_ids: Union[List[List[str]]] = self._batch_ids(batch_size)
+        if self._is_streaming():
+            return await self._async_exec_stream(
+                batch_size=batch_size,
+                progress_bar=progress_bar,
+                max_concurrency=max_concurrency,
+                max_retries=max_retries,
+                retry_backoff=retry_backoff,
+                checkpoint_file=checkpoint_file,
+                allow_partial=allow_partial,
+                bisect_errors=bisect_errors,
+                cache=cache,
+                client=client,
+                rate_limiter=rate_limiter,
+                semaphore=semaphore,
+            )
+
+        # Only request IDs that aren't already cached
+        input_ids = self._input_ids
+        cached_records: Dict[str, Dict[str, Any]] = {}
+        shape = ""
+        if cache is not None:
+            if self._supports_cache():
+                shape = cache.query_shape(self._query["query"])
+                # The cache is a blocking SQLite database, so keep it off the event loop
+                # Records are cached under the rcsb_id the API returns, which is shorter than an extended PDB ID
+                cached_records = await asyncio.get_running_loop().run_in_executor(None, cache.get_many, shape, [record_id(str(input_id)) for input_id in self._input_ids])
+                input_ids = [input_id for input_id in self._input_ids if record_id(str(input_id)) not in cached_records]
+                logger.info("Found %d of %d input IDs in cache", len(self._input_ids) - len(input_ids), len(self._input_ids))
+            else:
+                logger.warning("WARNING: Cache can only be used with plural input types and queries that request rcsb_id. Ignoring cache.")
+                cache = None
+
+        if len(input_ids) > batch_size:
+            batched_ids: Union[List[List[str]]] = self._batch_ids(batch_size, input_ids)
+        elif input_ids:
+            batched_ids = [input_ids]
         else:
-            batched_ids = [self._input_ids]
+            batched_ids = []
 
-        semaphores = asyncio.Semaphore(max_concurrency)
+        checkpoint = BatchCheckpoint(checkpoint_file, self._query["query"], batch_size) if checkpoint_file else None
+        self._quarantined_ids = {}
+        self._bisect_errors, self._cache = bisect_errors, cache
 
-        async with httpx.AsyncClient(timeout=config.API_TIMEOUT) as client:
-            tasks = []
-            for id_batch in batched_ids:
-                query_body = re.sub(r"\[([^]]+)\]", f"{id_batch}".replace("'", '"'), self._query["query"])
-                tasks.append(
-                    self._submit_request(client, query_body, semaphores, max_retries, retry_backoff)
-                )
-            if progress_bar:
-                results = []
-                with tqdm(total=len(tasks)) as pbar:
-                    for coro in asyncio.as_completed(tasks):
-                        result = await coro
-                        results.append(result)
-                        pbar.update(1)
-            else:
-                results = await asyncio.gather(*tasks)
+        results = await self._exec_batches(
+            batched_ids,
+            progress_bar=progress_bar,
+            max_concurrency=max_concurrency,
+            max_retries=max_retries,
+            retry_backoff=retry_backoff,
+            checkpoint=checkpoint,
+            allow_partial=allow_partial,
+            bisect_errors=bisect_errors,
+            client=client,
+            rate_limiter=rate_limiter,
+            semaphore=semaphore,
+        )
 
-        # Merge results
+        response_json = self._merge_results(results, has_records=bool(cached_records))
+        if cache is not None:
+            response_json = await self._splice_cached_records(response_json, cache, shape, cached_records)
+        return self._finish_response(response_json)
+
+    async def _async_exec_stream(
+        self,
+        batch_size: int,
+        progress_bar: bool = False,
+        max_concurrency: int = None,
+        max_retries: int = None,
+        retry_backoff: int = None,
+        checkpoint_file: Optional[str] = None,
+        allow_partial: bool = False,
+        bisect_errors: bool = False,
+        cache: Optional[DataCache] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        rate_limiter: Optional[AsyncRateLimiter] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ) -> Dict[str, Any]:
+        """Run the requests for lazily consumed input_ids, batching them as they are pulled by the executor.
+        """
+        if self._stream_consumed:
+            raise ValueError("Iterable input_ids have already been consumed by a previous execution. Create a new DataQuery to run the query again.")
+        if cache is not None:
+            raise ValueError("`cache` can't be used with iterable input_ids. Pass a list of input_ids instead.")
+        self._stream_consumed = True
+
+        checkpoint = BatchCheckpoint(checkpoint_file, self._query["query"], batch_size) if checkpoint_file else None
+        self._quarantined_ids = {}
+        self._bisect_errors, self._cache = bisect_errors, None
+
+        results = await self._exec_batches(
+            _aiter_id_batches(self._input_ids, batch_size),
+            progress_bar=progress_bar,
+            max_concurrency=max_concurrency,
+            max_retries=max_retries,
+            retry_backoff=retry_backoff,
+            checkpoint=checkpoint,
+            allow_partial=allow_partial,
+            bisect_errors=bisect_errors,
+            client=client,
+            rate_limiter=rate_limiter,
+            semaphore=semaphore,
+        )
+        return self._finish_response(self._merge_results(results))
+
+    def _is_streaming(self) -> bool:
+        return not isinstance(self._input_ids, list)
+
+    def _merge_results(self, results: List[Optional[Dict[str, Any]]], has_records: bool = False) -> Dict[str, Any]:
+        """Merge the responses of all batches (skipping batches without a response)"""
         response_json: Dict[str, Any] = {}
         for part_response in results:
+            if part_response is None:
+                continue
             if response_json:
                 response_json = self._merge_response(response_json, part_response)
             else:
                 response_json = part_response
+        if not response_json and (self._failed_batches or self._quarantined_ids or has_records):
+            response_json = {"data": {self._input_type: []}}
+        return response_json
 
-        # Validate data
+    def _finish_response(self, response_json: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate and store the final response"""
+        if self._is_streaming() and self._invalid_ids:
+            logger.warning("WARNING: Skipped %d invalid input IDs. Run <query object name>.get_invalid_ids() for details.", len(self._invalid_ids))
         if "data" in response_json:
             query_response = response_json["data"][self._input_type]
-            if query_response is None or (isinstance(query_response, list) and len(query_response) == 0):
+            if (query_response is None or (isinstance(query_response, list) and len(query_response) == 0)) and not (self._failed_batches or self._quarantined_ids):
                 logger.warning("WARNING: Input produced no results. Check that input IDs are valid.")
 
         self._response = response_json
         return response_json
 
-    async def _submit_request(self, client: httpx.AsyncClient, query_body: str, semaphores: asyncio.Semaphore, max_retries: int, retry_backoff: int):
+    async def _async_retry_failed(
+        self,
+        progress_bar: bool = False,
+        max_concurrency: int = None,
+        max_retries: int = None,
+        retry_backoff: int = None,
+        client: Optional[httpx.AsyncClient] = None,
+        rate_limiter: Optional[AsyncRateLimiter] = None,
+    ) -> Dict[str, Any]:
+        """Re-run failed batches and merge their results into the existing response.
+
+        Batches are requested with the `bisect_errors` and `cache` settings of the last execution. If records can be
+        matched to input IDs (see `_supports_cache`), the merged records are put back in input ID order.
+        """
+        if self._response is None:
+            raise ValueError("Query has not been executed yet. Run <query object name>.exec() first.")
+        batched_ids = [failed_batch.ids for failed_batch in self._failed_batches]
+        if not batched_ids:
+            return self._response
+
+        results = await self._exec_batches(
+            batched_ids,
+            progress_bar=progress_bar,
+            max_concurrency=max_concurrency,
+            max_retries=max_retries,
+            retry_backoff=retry_backoff,
+            allow_partial=True,
+            bisect_errors=self._bisect_errors,
+            client=client,
+            rate_limiter=rate_limiter,
+        )
+        recovered = self._merge_results(results)
+        if not recovered.get("data", {}).get(self._input_type):
+            return self._response
+
+        if self._cache is not None:
+            shape = self._cache.query_shape(self._query["query"])
+            await asyncio.get_running_loop().run_in_executor(None, self._cache.put_many, shape, self._match_records(recovered)[0])
+        response_json = self._merge_response(self._response, recovered)
+        if not self._is_streaming() and self._supports_cache():
+            response_json = await self._splice_cached_records(response_json, None, "", {})
+        self._response = response_json
+        return self._response
+
+    async def _exec_batches(
+        self,
+        batched_ids: Union[List[List[str]], AsyncIterator[List[str]]],
+        progress_bar: bool = False,
+        max_concurrency: int = None,
+        max_retries: int = None,
+        retry_backoff: int = None,
+        checkpoint: Optional[BatchCheckpoint] = None,
+        allow_partial: bool = False,
+        bisect_errors: bool = False,
+        client: Optional[httpx.AsyncClient] = None,
+        rate_limiter: Optional[AsyncRateLimiter] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Request each batch of IDs concurrently.
+
+        A fixed pool of `max_concurrency` workers pulls batches from `batched_ids` one at a time, so batches
+        from an async iterator are only produced as fast as they are requested.
+        If `client` is given it is used (and left open); otherwise a client is created for the duration of the call.
+        If `semaphore` is given, requests wait for it rather than for a new semaphore of `max_concurrency` slots.
+
+        Returns:
+            List[Optional[Dict[str, Any]]]: response of each batch, in batch order
+                (None for failed batches if `allow_partial`, or for batches whose IDs were all quarantined if `bisect_errors`)
+        """
+        max_concurrency = max_concurrency if max_concurrency else config.DATA_API_MAX_CONCURRENT_REQUESTS
+        max_retries = max_retries if max_retries else config.MAX_RETRIES
+        retry_backoff = retry_backoff if retry_backoff else config.RETRY_BACKOFF
+
+        semaphores = semaphore if semaphore is not None else asyncio.Semaphore(max_concurrency)
+        failures: Dict[int, FailedBatch] = {}
+        errors: List[BaseException] = []
+        # Responses are kept in batch order, regardless of completion order
+        results: Dict[int, Optional[Dict[str, Any]]] = {}
+        batch_count = 0
+        resumed_count = 0
+
+        async def iter_list(id_batches: List[List[str]]) -> AsyncIterator[List[str]]:
+            for id_batch in id_batches:
+                yield id_batch
+
+        total = len(batched_ids) if isinstance(batched_ids, list) else None
+        batch_source = iter_list(batched_ids) if isinstance(batched_ids, list) else batched_ids
+        source_lock = asyncio.Lock()
+
+        # With a checkpoint, let every batch run to completion so that a re-run only repeats the failed ones
+        return_exceptions = checkpoint is not None
+
+        async def next_batch() -> Optional[Tuple[int, List[str]]]:
+            nonlocal batch_count
+            async with source_lock:
+                try:
+                    id_batch = await batch_source.__anext__()
+                except StopAsyncIteration:
+                    return None
+                batch_count += 1
+                return (batch_count - 1, id_batch)
+
+        async def run_batch(idx: int, id_batch: List[str]) -> None:
+            attempt_times: List[float] = []
+            started_at = time.time()
+            try:
+                results[idx] = await self._request_ids(http_client, id_batch, semaphores, max_retries, retry_backoff, attempt_times, bisect_errors, rate_limiter)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                if not allow_partial:
+                    raise
+                failures[idx] = FailedBatch(ids=list(id_batch), error=e, attempts=len(attempt_times), started_at=started_at, attempt_times=attempt_times)
+                return
+            if checkpoint is not None and results[idx] is not None:
+                # Appending and syncing to disk blocks, so keep it off the event loop
+                await asyncio.get_running_loop().run_in_executor(None, checkpoint.save, batch_key(id_batch), results[idx])
+
+        async def worker(pbar: Optional[tqdm]) -> None:
+            nonlocal resumed_count
+            while True:
+                pulled = await next_batch()
+                if pulled is None:
+                    return
+                idx, id_batch = pulled
+                saved = checkpoint.get(batch_key(id_batch)) if checkpoint is not None else None
+                if saved is not None:
+                    results[idx] = saved
+                    resumed_count += 1
+                else:
+                    try:
+                        await run_batch(idx, id_batch)
+                    except Exception as e:  # pylint: disable=broad-exception-caught
+                        if not return_exceptions:
+                            raise
+                        errors.append(e)
+                if pbar is not None:
+                    pbar.update(1)
+
+        async with contextlib.AsyncExitStack() as stack:
+            http_client = client if client is not None else await stack.enter_async_context(async_client())
+            pbar = stack.enter_context(tqdm(total=total)) if progress_bar else None
+            workers = [asyncio.ensure_future(worker(pbar)) for _ in range(max_concurrency)]
+            try:
+                await asyncio.gather(*workers)
+            except BaseException:
+                # Stop the remaining workers instead of leaving them running in the background
+                for worker_task in workers:
+                    worker_task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+                raise
+            if resumed_count:
+                logger.info("Resumed from checkpoint: %d of %d batches were already completed", resumed_count, batch_count)
+            if errors:
+                logger.error(
+                    "%d of %d batches failed. Completed batches were saved to checkpoint file %r; re-run the query with the same file to retry the failed batches.",
+                    len(errors),
+                    batch_count,
+                    checkpoint.path,  # type: ignore[union-attr]
+                )
+                raise errors[0]
+
+        # Report failures in batch order
+        self._failed_batches = [failures[idx] for idx in sorted(failures)]
+        if self._failed_batches:
+            logger.warning(
+                "WARNING: %d of %d batches failed (%d IDs). Run <query object name>.get_failed_batches() for details, "
+                "or <query object name>.retry_failed() to request them again.",
+                len(self._failed_batches),
+                batch_count,
+                sum(len(failed_batch.ids) for failed_batch in self._failed_batches),
+            )
+        return [results.get(idx) for idx in range(batch_count)]
+
+    async def _request_ids(
+        self,
+        client: httpx.AsyncClient,
+        id_batch: List[str],
+        semaphores: asyncio.Semaphore,
+        max_retries: int,
+        retry_backoff: int,
+        attempt_times: List[float],
+        bisect_errors: bool = False,
+        rate_limiter: Optional[AsyncRateLimiter] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Request data for a batch of IDs.
+
+        If `bisect_errors` is set and the request fails with an error that retrying can't fix (e.g., a GraphQL error
+        caused by an invalid ID), the batch is split in half and each half is requested separately, recursively,
+        until the offending IDs are isolated. These are added to `self._quarantined_ids` and the rest of the batch completes.
+
+        Returns:
+            Optional[Dict[str, Any]]: JSON response for the batch, or None if every ID in the batch was quarantined
+        """
+        query_body = re.sub(r"\[([^]]+)\]", f"{id_batch}".replace("'", '"'), self._query["query"])
+        try:
+            return await self._submit_request(client, query_body, semaphores, max_retries, retry_backoff, attempt_times=attempt_times, rate_limiter=rate_limiter)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            if not (bisect_errors and _is_non_transient_error(e)):
+                raise
+            if len(id_batch) == 1:
+                self._quarantined_ids[id_batch[0]] = str(e)
+                logger.warning("WARNING: Quarantined input ID %r, which failed with error: %s", id_batch[0], e)
+                return None
+
+        logger.info("Batch of %d IDs failed with a non-transient error. Splitting batch to isolate the failing IDs.", len(id_batch))
+        half = len(id_batch) // 2
+        part_responses = await asyncio.gather(
+            self._request_ids(client, id_batch[:half], semaphores, max_retries, retry_backoff, attempt_times, bisect_errors, rate_limiter),
+            self._request_ids(client, id_batch[half:], semaphores, max_retries, retry_backoff, attempt_times, bisect_errors, rate_limiter),
+        )
+        response_json: Optional[Dict[str, Any]] = None
+        for part_response in part_responses:
+            if part_response is None:
+                continue
+            response_json = self._merge_response(response_json, part_response) if response_json else part_response
+        return response_json
+
+    async def _submit_request(
+        self,
+        client: httpx.AsyncClient,
+        query_body: str,
+        semaphores: asyncio.Semaphore,
+        max_retries: int,
+        retry_backoff: int,
+        attempt_times: Optional[List[float]] = None,
+        rate_limiter: Optional[AsyncRateLimiter] = None,
+    ):
         """Submit one batch sub-request, with retry behavior and rate limiting.
+
+        Identical requests already in flight (from any `DataQuery` in this process) are coalesced
+        into a single network call, unless `config.DATA_API_COALESCE_REQUESTS` is False.
+        If `attempt_times` is given, the duration in seconds of each attempt is appended to it
+        (for a coalesced request, the time waited for the identical request, counted as one attempt).
+        Requests are counted against `rate_limiter` (defaults to this query's own limiter).
+        If `config.DATA_API_HEDGE_PERCENTILE` is set, an attempt still running after that percentile of recent
+        request latencies is duplicated, and whichever response arrives first is used.
         """
+        if not config.DATA_API_COALESCE_REQUESTS:
+            return await self._send_request(client, query_body, semaphores, max_retries, retry_backoff, attempt_times, rate_limiter)
+
+        def on_coalesced(waited: float) -> None:
+            if attempt_times is not None:
+                attempt_times.append(waited)
+            INSTRUMENTATION.emit(COALESCED, "data", url=const.DATA_API_ENDPOINT, duration=waited)
+
+        return await DATA_API_SINGLE_FLIGHT.do(
+            (const.DATA_API_ENDPOINT, query_body),
+            lambda: self._send_request(client, query_body, semaphores, max_retries, retry_backoff, attempt_times, rate_limiter),
+            on_coalesced,
+        )
+
+    async def _send_request(
+        self,
+        client: httpx.AsyncClient,
+        query_body: str,
+        semaphores: asyncio.Semaphore,
+        max_retries: int,
+        retry_backoff: int,
+        attempt_times: Optional[List[float]] = None,
+        rate_limiter: Optional[AsyncRateLimiter] = None,
+    ):
+        """Send one batch sub-request over the network (see `_submit_request`)."""
+        rate_limiter = rate_limiter if rate_limiter is not None else self._rate_limiter
+
+        async def post() -> httpx.Response:
+            with INSTRUMENTATION.request("data", const.DATA_API_ENDPOINT, batch_size=count_ids(query_body) if INSTRUMENTATION.enabled else None) as trace:
+                trace.response = await client.post(
+                    url=const.DATA_API_ENDPOINT,
+                    headers={"Content-Type": "application/json", "User-Agent": const.USER_AGENT},
+                    json={"query": query_body}
+                )
+            # Raise an error for bad responses here, so that a hedged request doesn't win with one
+            trace.response.raise_for_status()
+            return trace.response
+
+        async def post_hedge() -> httpx.Response:
+            # Hedged requests count against the rate limit like any other request
+            await rate_limiter.acquire()
+            return await post()
+
+        async def send() -> Dict[str, Any]:
+            # First check if request rate-limit reached
+            await rate_limiter.acquire()
+            #
+            # Now perform the actual request (hedged, if enabled and enough latencies have been recorded)
+            hedge_delay = DATA_API_LATENCY_TRACKER.percentile(config.DATA_API_HEDGE_PERCENTILE) if config.DATA_API_HEDGE_PERCENTILE else None
+            attempt_start = time.monotonic()
+            try:
+                response = await (hedged(post, post_hedge, hedge_delay) if hedge_delay is not None else post())
+            except httpx.HTTPStatusError:
+                DATA_API_LATENCY_TRACKER.record(time.monotonic() - attempt_start)
+                raise
+            finally:
+                if attempt_times is not None:
+                    attempt_times.append(time.monotonic() - attempt_start)
+            # Record one latency per request, measured from the start of the first request. A request overtaken by a hedged
+            # request is cancelled, so this is the time it had taken by then: recording only the hedged request's own duration
+            # would drop the slowest requests from the window, lowering the hedging percentile until many more requests are hedged.
+            DATA_API_LATENCY_TRACKER.record(time.monotonic() - attempt_start)
+
+            response_json = response.json()
+            self._parse_gql_error(response_json)
+            DATA_API_TIMING_STATS.record(query_body, time.monotonic() - attempt_start, len(response.content))
+            return response_json
+
         async with semaphores:
-            for attempt in range(1, max_retries + 1):
-                try:
-                    # First check if request rate-limit reached
-                    await self._rate_limiter()
-                    #
-                    # Now perform the actual request
-                    response = await client.post(
-                        url=const.DATA_API_ENDPOINT,
-                        headers={"Content-Type": "application/json", "User-Agent": const.USER_AGENT},
-                        json={"query": query_body}
-                    )
-                    response.raise_for_status()  # Raise an error for bad responses
-
-                    response_json = response.json()
-                    self._parse_gql_error(response_json)
-                    return response_json
-
-                except (httpx.RequestError, httpx.HTTPStatusError) as e:
-                    if attempt == max_retries:
-                        logger.error(
-                            "Final retry attempt %r failed with exception:\n    %r\n"
-                            "Check query and parameters. If issue persists, try reducing 'config.DATA_API_BATCH_ID_SIZE' and/or 'config.DATA_API_MAX_CONCURRENT_REQUESTS'.",
-                            attempt,
-                            e
-                        )
-                        raise
-                    logger.info("Attempt %r failed: %r. Retrying in %r seconds...", attempt, e, retry_backoff)
-                    await asyncio.sleep(retry_backoff)
-                    retry_backoff *= 2  # exponential backoff
-
-    async def _rate_limiter(self):
-        """Check if request rate-limit has been reached, and if so, sleep until it can be reset.
-        """
-        lock = await self._get_rate_limit_lock()
-        async with lock:
-            now = time.monotonic()
-            elapsed = now - self._last_request_time
-            if elapsed >= self._request_limit_time_interval:
-                self._last_request_time = now
-                self._request_count = 0
-            if self._request_count >= self._requests_per_window_limit:
-                sleep_time = self._request_limit_time_interval - elapsed
-                if sleep_time > 0:
-                    logger.info(
-                        "Request rate limit reached (%r requests/ %r seconds). Sleeping for %.1f seconds...",
-                        self._requests_per_window_limit,
-                        self._request_limit_time_interval,
-                        sleep_time
-                    )
-                    await asyncio.sleep(sleep_time)
-                self._last_request_time = time.monotonic()
-                self._request_count = 0
-            self._request_count += 1
-
-    async def _get_rate_limit_lock(self):
-        if self._rate_limit_lock is None:
-            self._rate_limit_lock = asyncio.Lock()
-        return self._rate_limit_lock
+            return await RetryPolicy(max_retries, retry_backoff, api="data").acall(
+                send,
+                const.DATA_API_ENDPOINT,
+                hint="Check query and parameters. If issue persists, try reducing 'config.DATA_API_BATCH_ID_SIZE' and/or 'config.DATA_API_MAX_CONCURRENT_REQUESTS'.",
+            )
 
     def _parse_gql_error(self, response_json: Dict[str, Any]) -> None:
         if "errors" in response_json.keys():
@@ -348,29 +1094,63 @@ class DataQuery:
                 combined_error_msg: str = ""
                 for i, error_msg in enumerate(error_msg_list):
                     combined_error_msg += f"{i + 1}. {error_msg}\n"
-                raise ValueError(f"{combined_error_msg}.\n\nRun <query object name>.get_editor_link() to get a link to GraphiQL editor with query")
+                raise GraphQLError(f"{combined_error_msg}.\n\nRun <query object name>.get_editor_link() to get a link to GraphiQL editor with query")
 
-    def _batch_ids(self, batch_size: int) -> List[List[str]]:  # assumes that plural types have only one arg, which is true right now
+    def _batch_ids(self, batch_size: int, input_ids: Optional[List[str]] = None) -> List[List[str]]:  # assumes that plural types have only one arg, which is true right now
         """Split queries with large numbers of input_ids into smaller batches
 
         Args:
             batch_size (int): max size of batches
+            input_ids (List[str], optional): ids to split. Defaults to the query's input_ids.
 
         Returns:
             List[List[str]]: nested list where each list is a batch of ids
         """
-        batched_ids: List[List[str]] = []
-        i = 0
-        while i < len(self._input_ids):
-            count = 0
-            batch_list: List[str] = []
-            while count < batch_size and i < len(self._input_ids):
-                batch_list.append(self._input_ids[i])
-                count += 1
-                i += 1
-            if len(batch_list) > 0:
-                batched_ids.append(batch_list)
-        return batched_ids
+        input_ids = self._input_ids if input_ids is None else input_ids
+        return list(_iter_id_batches(input_ids, batch_size))
+
+    def _supports_cache(self) -> bool:
+        """Whether records in the response can be matched to input IDs (requires a plural input type and rcsb_id)"""
+        if DATA_SCHEMA._root_dict[self._input_type][0]["ofKind"] != "LIST":
+            return False
+        return ("rcsb_id",) in query_leaf_paths(self._query["query"])
+
+    def _match_records(self, response_json: Dict[str, Any]) -> Tuple[Dict[str, Dict[str, Any]], List[Any]]:
+        """Split the records of a response into records keyed by their rcsb_id, and records without one"""
+        matched: Dict[str, Dict[str, Any]] = {}
+        unmatched: List[Any] = []
+        for record in response_json.get("data", {}).get(self._input_type) or []:
+            if isinstance(record, dict) and record.get("rcsb_id") is not None:
+                matched[str(record["rcsb_id"]).upper()] = record
+            else:
+                unmatched.append(record)
+        return matched, unmatched
+
+    async def _splice_cached_records(
+        self,
+        response_json: Dict[str, Any],
+        cache: Optional[DataCache],
+        shape: str,
+        cached_records: Dict[str, Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """Add newly retrieved records to the cache (if given), and combine them with cached records in input ID order"""
+        fetched_records, unmatched = self._match_records(response_json)
+        if cache is not None:
+            await asyncio.get_running_loop().run_in_executor(None, cache.put_many, shape, fetched_records)
+
+        ordered: List[Dict[str, Any]] = []
+        for rcsb_id in dict.fromkeys(record_id(str(input_id)) for input_id in self._input_ids):
+            record = cached_records.get(rcsb_id)
+            if record is None:
+                record = fetched_records.pop(rcsb_id, None)
+            if record is not None:
+                ordered.append(record)
+        # Keep any records whose rcsb_id didn't match an input ID exactly
+        ordered.extend(fetched_records.values())
+        ordered.extend(unmatched)
+
+        response_json.setdefault("data", {})[self._input_type] = ordered
+        return response_json
 
     def _merge_response(self, merge_into_response: Dict[str, Any], to_merge_response: Dict[str, Any]) -> Dict[str, Any]:
         """merge two JSON responses. Used after batching ids to merge responses from each batch.
@@ -389,30 +1169,64 @@ class DataQuery:
 
 class AllStructures:
     """Class for representing all structures of different `input_types`
+
+    ID lists are cached locally (see `config.DATA_API_HOLDINGS_CACHE_FILE`) and only re-downloaded once the cache is
+    older than `config.DATA_API_HOLDINGS_MAX_AGE` seconds.
     """
-    def __init__(self):
+    def __init__(self, cache: Optional[HoldingsCache] = None):
         """initialize AllStructures object
+
+        Args:
+            cache (HoldingsCache, optional): holdings cache to use. Defaults to the cache at `config.DATA_API_HOLDINGS_CACHE_FILE`.
         """
-        self.ALL_STRUCTURES = self.reload()
+        self._cache = cache if cache is not None else HoldingsCache()
+        self._changes: Dict[str, HoldingsDiff] = {}
+        if self._cache.is_fresh(config.DATA_API_HOLDINGS_MAX_AGE):
+            logger.debug("Using cached holdings from %r", self._cache.path)
+            self.ALL_STRUCTURES = self._cache.get_all_ids()
+        else:
+            self.ALL_STRUCTURES = self.reload(incremental=True)
 
-    def reload(self) -> Dict[str, List[str]]:
-        """Build dictionary of IDs based on endpoints defined in const
+    def reload(self, incremental: bool = False) -> Dict[str, List[str]]:
+        """Build dictionary of IDs based on endpoints defined in const, downloading all endpoints in parallel
+
+        Args:
+            incremental (bool, optional): only download ID lists that changed since the cached snapshot, and apply their
+                additions and removals (see `get_changes()`). Defaults to False.
 
         Returns:
             Dict[str, List[str]]: ALL_STRUCTURES object
         """
-        ALL_STRUCTURES = {}
-        for input_type, endpoints in const.INPUT_TYPE_TO_ALL_STRUCTURES_ENDPOINT.items():
-            all_ids: List[str] = []
-            for endpoint in endpoints:
-                response = httpx.get(endpoint, timeout=60, headers={"User-Agent": const.USER_AGENT}, follow_redirects=True)
-                if response.status_code == 200:
-                    all_ids.extend(json.loads(response.text))
-                else:
-                    response.raise_for_status()
-                ALL_STRUCTURES[input_type] = all_ids
+        try:
+            self._changes = DATA_API_BACKGROUND_LOOP.run(lambda client, rate_limiter: self._cache.refresh(client=client, incremental=incremental))
+        except httpx.HTTPError as e:
+            if self._cache.timestamp is None:
+                raise
+            logger.warning("WARNING: Failed to refresh holdings (%r). Using cached holdings from %s.", e, time.ctime(self._cache.timestamp))
+        self.ALL_STRUCTURES = self._cache.get_all_ids()
+        return self.ALL_STRUCTURES
+
+    async def areload(self, incremental: bool = False, client: Optional[httpx.AsyncClient] = None) -> Dict[str, List[str]]:
+        """Asynchronous version of `reload()`, run in the caller's event loop
+
+        Args:
+            incremental (bool, optional): only download ID lists that changed since the cached snapshot. Defaults to False.
+            client (httpx.AsyncClient, optional): client to send requests with. Defaults to a new client for the duration of the call.
 
-        return ALL_STRUCTURES
+        Returns:
+            Dict[str, List[str]]: ALL_STRUCTURES object
+        """
+        self._changes = await self._cache.refresh(client=client, incremental=incremental)
+        self.ALL_STRUCTURES = self._cache.get_all_ids()
+        return self.ALL_STRUCTURES
+
+    def get_changes(self) -> Dict[str, HoldingsDiff]:
+        """Get the IDs added and removed by the last reload, compared to the previously cached snapshot
+
+        Returns:
+            Dict[str, HoldingsDiff]: dictionary mapping input types to their added and removed IDs
+        """
+        return dict(self._changes)
 
     def get_all_ids(self, input_type: str) -> List[str]:
         """Get all ids of a certain `input_type`
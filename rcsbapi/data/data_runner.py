@@ -0,0 +1,140 @@
+"""Long-lived background event loop used to run synchronous Data API queries."""
+
+import asyncio
+import atexit
+import concurrent.futures
+import logging
+import threading
+from typing import Any, Callable, Coroutine, Dict, Optional, Set
+import httpx
+from rcsbapi.config import config
+from rcsbapi.rate_limiter import AsyncRateLimiter
+from rcsbapi.transport import Transport, async_client, get_transport
+
+logger = logging.getLogger(__name__)
+
+# Called with `client` and `rate_limiter` keyword arguments
+CoroutineFactory = Callable[..., Coroutine[Any, Any, Any]]
+
+
+class BackgroundLoop:
+    """Event loop running in a daemon thread, shared by all synchronous `DataQuery.exec()` calls.
+
+    Reusing one loop avoids creating and tearing down an event loop for every query, and lets all queries
+    share one pooled `httpx.AsyncClient` (keeping connections alive between queries) and one rate limiter.
+    Coroutines can be submitted from any number of threads at once.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        # Only accessed from within the loop
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_timeout: Optional[int] = None
+        self._client_transport: Optional[Transport] = None
+        # Number of coroutines using each client, and events set when a replaced client is no longer in use
+        self._client_users: Dict[httpx.AsyncClient, int] = {}
+        self._client_idle: Dict[httpx.AsyncClient, asyncio.Event] = {}
+        self._closing: Set["asyncio.Task[None]"] = set()
+        self._rate_limiter: Optional[AsyncRateLimiter] = None
+        self._rate_limit: Optional[int] = None
+
+    def _start(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="rcsbapi-data-loop", daemon=True)
+                thread.start()
+                self._loop, self._thread = loop, thread
+                atexit.register(self.close)
+            return self._loop
+
+    def run(self, coro_factory: CoroutineFactory) -> Any:
+        """Run a coroutine on the background loop and wait for its result.
+
+        Args:
+            coro_factory (CoroutineFactory): function taking the shared client and rate limiter and returning the coroutine to run
+
+        Raises:
+            RuntimeError: if called from the background loop itself (which would deadlock)
+
+        Returns:
+            Any: result of the coroutine
+        """
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("Synchronous Data API queries can't be run from the background event loop; use `await <query>.aexec()` instead.")
+        loop = self._start()
+        future = asyncio.run_coroutine_threadsafe(self._run_with_resources(coro_factory), loop)
+        try:
+            return future.result()
+        except BaseException:
+            # e.g., KeyboardInterrupt while waiting; stop the work running in the background too
+            future.cancel()
+            raise
+
+    async def _run_with_resources(self, coro_factory: CoroutineFactory) -> Any:
+        # Recreate the shared client/limiter if the relevant config settings (or transport) changed since they were created
+        if self._client is None or self._client_timeout != config.API_TIMEOUT or self._client_transport is not get_transport():
+            if self._client is not None:
+                # Coroutines from other threads may still be using the old client, so it is closed once they finish
+                task = asyncio.ensure_future(self._retire_client(self._client))
+                self._closing.add(task)
+                task.add_done_callback(self._closing.discard)
+            self._client = async_client()
+            self._client_timeout = config.API_TIMEOUT
+            self._client_transport = get_transport()
+        if self._rate_limiter is None or self._rate_limit != config.DATA_API_REQUESTS_PER_SECOND:
+            self._rate_limiter = AsyncRateLimiter(config.DATA_API_REQUESTS_PER_SECOND)
+            self._rate_limit = config.DATA_API_REQUESTS_PER_SECOND
+        client = self._client
+        self._client_users[client] = self._client_users.get(client, 0) + 1
+        try:
+            return await coro_factory(client=client, rate_limiter=self._rate_limiter)
+        finally:
+            self._client_users[client] -= 1
+            if self._client_users[client] == 0:
+                del self._client_users[client]
+                if client in self._client_idle:
+                    self._client_idle.pop(client).set()
+
+    async def _retire_client(self, client: httpx.AsyncClient) -> None:
+        """Close a client that has been replaced, once no coroutines are using it."""
+        if self._client_users.get(client):
+            idle = self._client_idle[client] = asyncio.Event()
+            await idle.wait()
+        await client.aclose()
+
+    async def _close_clients(self) -> None:
+        client, self._client = self._client, None
+        if client is not None:
+            await self._retire_client(client)
+        if self._closing:
+            await asyncio.gather(*self._closing)
+
+    def close(self) -> None:
+        """Close the shared client and stop the background loop (it is restarted on next use).
+
+        Queries still running on the loop are given up to 5 seconds to finish before it is stopped.
+        """
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None or thread is None:
+            return
+        try:
+            # Waits for queries still running on the loop to finish with the client(s) first
+            asyncio.run_coroutine_threadsafe(self._close_clients(), loop).result(timeout=5)
+        except (concurrent.futures.TimeoutError, RuntimeError) as e:
+            logger.debug("Could not close shared Data API client: %r", e)
+        self._client = None
+        self._client_users.clear()
+        self._client_idle.clear()
+        self._rate_limiter = None
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        loop.close()
+        atexit.unregister(self.close)
+
+
+DATA_API_BACKGROUND_LOOP = BackgroundLoop()
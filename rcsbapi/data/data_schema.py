@@ -7,6 +7,7 @@ import re
 from rcsbapi.const import const
 from rcsbapi.config import config
 from rcsbapi.graphql_schema import GQLSchema, SchemaEnum
+from rcsbapi.data.data_ids import ID_PATTERNS
 
 
 class DataAPIEnums(SchemaEnum):
@@ -82,42 +83,31 @@ class DataSchema(GQLSchema):
             # Will throw error if invalid typing, missing keys etc
             return input_ids
 
-        plural_types = [key for key, value in self._root_dict.items() for item in value if item["ofKind"] == "LIST"]
-        entities = ["polymer_entities", "branched_entities", "nonpolymer_entities", "nonpolymer_entity", "polymer_entity", "branched_entity"]
-        instances = [
-            "polymer_entity_instances",
-            "branched_entity_instances",
-            "nonpolymer_entity_instances",
-            "polymer_entity_instance",
-            "nonpolymer_entity_instance",
-            "branched_entity_instance",
-        ]
+        # Should be catching almost everything since most input_types will be converted to plural input_types automatically
+        if any(item["ofKind"] == "LIST" for item in self._root_dict[input_type]):
+            attr = self._root_dict[input_type][0]["name"]
+            return {attr: input_ids}
+
+        entities = ["nonpolymer_entity", "polymer_entity", "branched_entity"]
+        instances = ["polymer_entity_instance", "nonpolymer_entity_instance", "branched_entity_instance"]
         input_dict: Dict[str, Any] = {}
 
         for single_id in input_ids:
-            # Should be catching almost everything since most input_types will be converted to plural input_types automatically
-            if input_type in plural_types:
-                attr_list = self._root_dict[input_type]
-                attr = attr_list[0]["name"]
-                input_dict[attr] = input_ids
-            elif (input_type in entities) and re.match("|".join(const.DATA_API_INPUT_TYPE_TO_REGEX["entity"]), single_id):
+            if (input_type in entities) and ID_PATTERNS["entity"].match(single_id):
                 if len(input_ids) == 1:
-                    input_dict["entry_id"] = str(re.findall(r"^[^_]+", input_ids[0])[0])
-                    input_dict["entity_id"] = str(re.findall(r"[^_]+$", input_ids[0])[0])
-            elif (input_type in instances) and re.match("|".join(const.DATA_API_INPUT_TYPE_TO_REGEX["instance"]), single_id):
+                    # Split on the last separator, since extended and computed model entry IDs contain "_" (e.g., "PDB_00004HHB_1")
+                    input_dict["entry_id"], input_dict["entity_id"] = str(input_ids[0]).rsplit("_", 1)
+            elif (input_type in instances) and ID_PATTERNS["instance"].match(single_id):
                 if len(input_ids) == 1:
-                    input_dict["entry_id"] = str(re.findall(r"^[^.]+", input_ids[0])[0])
-                    input_dict["asym_id"] = str(re.findall(r"(?<=\.).*", input_ids[0])[0])
-            elif (input_type in ["assemblies", "assembly"]) and re.match("|".join(const.DATA_API_INPUT_TYPE_TO_REGEX["assembly"]), single_id):
+                    input_dict["entry_id"], input_dict["asym_id"] = str(input_ids[0]).rsplit(".", 1)
+            elif (input_type in ["assemblies", "assembly"]) and ID_PATTERNS["assembly"].match(single_id):
                 if len(input_ids) == 1:
-                    input_dict["entry_id"] = str(re.findall(r"^[^-]+", input_ids[0])[0])
-                    input_dict["assembly_id"] = str(re.findall(r"[^-]+$", input_ids[0])[0])
-            elif (input_type in ["interfaces", "interface"]) and re.match("|".join(const.DATA_API_INPUT_TYPE_TO_REGEX["interface"]), single_id):
+                    input_dict["entry_id"], input_dict["assembly_id"] = str(input_ids[0]).rsplit("-", 1)
+            elif (input_type in ["interfaces", "interface"]) and ID_PATTERNS["interface"].match(single_id):
                 if len(input_ids) == 1:
-                    input_dict["entry_id"] = str(re.findall(r"^[^-]+", input_ids[0])[0])
-                    input_dict["assembly_id"] = str(re.findall(r"-(.*)\.", input_ids[0])[0])
-                    input_dict["interface_id"] = str(re.findall(r"[^.]+$", input_ids[0])[0])
-            elif (input_type in ["entries", "entry"]) and re.match("|".join(const.DATA_API_INPUT_TYPE_TO_REGEX["entry"]), single_id):
+                    input_dict["entry_id"], interface = str(input_ids[0]).rsplit("-", 1)
+                    input_dict["assembly_id"], input_dict["interface_id"] = interface.split(".", 1)
+            elif (input_type in ["entries", "entry"]) and ID_PATTERNS["entry"].match(single_id):
                 if len(input_ids) == 1:
                     input_dict["entry_id"] = str(input_ids[0])
             elif input_type in ["chem_comp", "chem_comps"]:
@@ -129,7 +119,7 @@ class DataSchema(GQLSchema):
             elif input_type in ["polymer_entity_group", "polymer_entity_groups"]:
                 if len(input_ids) == 1:
                     input_dict["group_id"] = str(input_ids[0])
-            elif (input_type == "uniprot") and re.match("|".join(const.DATA_API_INPUT_TYPE_TO_REGEX["uniprot"]), single_id):
+            elif (input_type == "uniprot") and ID_PATTERNS["uniprot"].match(single_id):
                 if len(input_ids) == 1:
                     input_dict["uniprot_id"] = str(input_ids[0])
                 else:
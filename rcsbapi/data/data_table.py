@@ -0,0 +1,173 @@
+"""Flatten nested Data API responses into columnar tables."""
+
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple
+from graphql import parse
+from graphql.language import FieldNode, OperationDefinitionNode
+
+ListPolicy = Literal["list", "first", "join"]
+
+
+def query_leaf_paths(query: str) -> List[Tuple[str, ...]]:
+    """Get the paths to all leaf fields requested by a Data API query, relative to the root field.
+
+    Args:
+        query (str): query in GraphQL syntax (e.g., output of `DataQuery.get_query()`)
+
+    Returns:
+        List[Tuple[str, ...]]: leaf field paths, in query order
+            (e.g., [("rcsb_id",), ("exptl", "method")])
+    """
+    paths: List[Tuple[str, ...]] = []
+
+    def visit(node: FieldNode, prefix: Tuple[str, ...]) -> None:
+        assert node.selection_set is not None  # for mypy
+        for selection in node.selection_set.selections:
+            assert isinstance(selection, FieldNode)  # for mypy
+            path = prefix + (selection.name.value,)
+            if selection.selection_set is None:
+                paths.append(path)
+            else:
+                visit(selection, path)
+
+    operation = parse(query).definitions[0]
+    assert isinstance(operation, OperationDefinitionNode)  # for mypy
+    root_field = operation.selection_set.selections[0]
+    assert isinstance(root_field, FieldNode)  # for mypy
+    visit(root_field, ())
+    return paths
+
+
+def _compile_getter(path: Tuple[str, ...]) -> Callable[[Any], Any]:
+    """Build an accessor for a field path.
+
+    The accessor returns the scalar at `path`, or a flat list of scalars if the path passes through
+    any list-valued fields. Missing values resolve to None.
+    """
+    def get(node: Any, depth: int = 0) -> Any:
+        while depth < len(path):
+            if node is None:
+                return None
+            if isinstance(node, list):
+                values: List[Any] = []
+                for item in node:
+                    value = get(item, depth)
+                    if isinstance(value, list):
+                        values.extend(value)
+                    elif value is not None:
+                        values.append(value)
+                return values
+            node = node.get(path[depth])
+            depth += 1
+        return node
+
+    if len(path) == 1:
+        key = path[0]
+        return lambda node: None if node is None else node.get(key)
+    return get
+
+
+def _apply_list_policy(policy: ListPolicy, separator: str) -> Callable[[Any], Any]:
+    if policy == "list":
+        return lambda value: value
+    if policy == "first":
+        return lambda value: (value[0] if value else None) if isinstance(value, list) else value
+    if policy == "join":
+        return lambda value: separator.join(str(v) for v in value) if isinstance(value, list) else value
+    raise ValueError(f"Unknown list_policy: {policy!r} (must be one of 'list', 'first', 'join')")
+
+
+def flatten_response(
+    response: Dict[str, Any],
+    input_type: str,
+    query: str,
+    explode: Optional[str] = None,
+    list_policy: ListPolicy = "list",
+    separator: str = ";",
+) -> Dict[str, List[Any]]:
+    """Flatten a Data API JSON response into a dictionary of column lists.
+
+    Each record under `response["data"][input_type]` becomes one row, and each leaf field requested in the
+    query becomes a column named by its dot-separated path (e.g., "exptl.method").
+
+    Args:
+        response (Dict[str, Any]): JSON response returned by `DataQuery.exec()`
+        input_type (str): root field of the query (e.g., "entries")
+        query (str): query in GraphQL syntax that produced the response
+        explode (str, optional): dot-separated path to a list-valued field (e.g., "polymer_entities").
+            If given, one row is produced per element of that list, and parent fields are repeated. Defaults to None.
+        list_policy (str, optional): how to represent any remaining list-valued columns:
+            "list" (keep a list of values), "first" (keep only the first value), or "join" (join values into one string).
+            Defaults to "list".
+        separator (str, optional): separator used when `list_policy` is "join". Defaults to ";".
+
+    Returns:
+        Dict[str, List[Any]]: dictionary mapping column names to equal-length lists of values
+    """
+    paths = query_leaf_paths(query)
+    names = [".".join(path) for path in paths]
+    policy = _apply_list_policy(list_policy, separator)
+
+    records = response.get("data", {}).get(input_type) or []
+    if isinstance(records, dict):
+        records = [records]
+
+    columns: Dict[str, List[Any]] = {name: [] for name in names}
+
+    if explode is None:
+        getters = [(columns[name], _compile_getter(path)) for name, path in zip(names, paths)]
+        for column, getter in getters:
+            column.extend(policy(getter(record)) for record in records)
+        return columns
+
+    explode_path = tuple(explode.split("."))
+    if not any(path[:len(explode_path)] == explode_path for path in paths):
+        raise ValueError(f"explode path {explode!r} is not part of the query. Available columns: {names}")
+    explode_getter = _compile_getter(explode_path)
+
+    # Columns under the exploded path are resolved relative to each list element; all others relative to the record
+    inner: List[Tuple[List[Any], Callable[[Any], Any]]] = []
+    outer: List[Tuple[List[Any], Callable[[Any], Any]]] = []
+    for name, path in zip(names, paths):
+        if path[:len(explode_path)] == explode_path:
+            sub_path = path[len(explode_path):]
+            inner.append((columns[name], _compile_getter(sub_path) if sub_path else (lambda node: node)))
+        else:
+            outer.append((columns[name], _compile_getter(path)))
+
+    # Resolve the list elements for each record once, then fill columns one at a time
+    elements_per_record: List[List[Any]] = []
+    for record in records:
+        elements = explode_getter(record)
+        if elements is None or elements == []:
+            elements = [None]  # keep one row for records with nothing to explode
+        elif not isinstance(elements, list):
+            elements = [elements]
+        elements_per_record.append(elements)
+
+    for column, getter in outer:
+        for record, elements in zip(records, elements_per_record):
+            value = policy(getter(record))
+            column.extend([value] * len(elements))
+    for column, getter in inner:
+        for elements in elements_per_record:
+            column.extend(policy(getter(element)) for element in elements)
+    return columns
+
+
+def to_arrow_table(columns: Dict[str, List[Any]]) -> Any:
+    """Convert flattened columns into a `pyarrow.Table`.
+
+    Args:
+        columns (Dict[str, List[Any]]): output of `flatten_response`
+
+    Raises:
+        ImportError: if pyarrow is not installed
+
+    Returns:
+        pyarrow.Table: columnar table
+    """
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ImportError("pyarrow is required to build Arrow tables. Install it with `pip install pyarrow`.") from e
+    return pa.table(columns)
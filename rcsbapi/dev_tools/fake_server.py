@@ -0,0 +1,123 @@
+"""Local stand-in for the RCSB API services; for developer use only
+
+Like the other developer tools, this module is not included in the installed wheel: run it from a source checkout
+(it is used by the tests and the benchmarks in `tests/` and `benchmarks/`).
+
+Serves responses recorded with `rcsbapi.transport.RecordTransport` (Data and Sequence GraphQL, Search and
+ModelServer responses alike) over HTTP, with configurable latency, error rate and rate limit, so that
+throughput can be benchmarked and regression-tested deterministically on an isolated machine.
+
+Start the server:
+    python -m rcsbapi.dev_tools.fake_server responses.json --port 8080 --latency 0.05 --error-rate 0.01 --rate-limit 20
+
+Then send all requests to it:
+    from rcsbapi.transport import RedirectTransport, set_transport
+    set_transport(RedirectTransport("http://127.0.0.1:8080"))
+"""
+
+import argparse
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Type
+import httpx
+from rcsbapi.transport import Cassette, ReplayTransport
+
+logger = logging.getLogger(__name__)
+
+
+def make_handler(replay: ReplayTransport) -> Type[BaseHTTPRequestHandler]:
+    """Create a request handler class answering requests from a replay transport"""
+
+    class FakeServerHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _handle(self) -> None:
+            original_url = self.headers.get("X-Original-URL")
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if original_url is None:
+                self._send(httpx.Response(400, text="Missing X-Original-URL header (send requests through rcsbapi.transport.RedirectTransport)"))
+                return
+            headers = [(name, value) for name, value in self.headers.items() if name.lower() not in ("host", "x-original-url")]
+            request = httpx.Request(self.command, original_url, headers=headers, content=body)
+            try:
+                response, delay = replay.respond(request)
+            except ValueError as e:
+                self._send(httpx.Response(404, text=str(e)))
+                return
+            if delay:
+                time.sleep(delay)
+            self._send(response)
+
+        def _send(self, response: httpx.Response) -> None:
+            content = response.content
+            self.send_response(response.status_code)
+            for name, value in response.headers.items():
+                if name.lower() not in ("content-length", "content-encoding", "transfer-encoding", "connection"):
+                    self.send_header(name, value)
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        do_GET = _handle
+        do_POST = _handle
+
+        def log_message(self, format: str, *args) -> None:  # pylint: disable=redefined-builtin
+            logger.debug("%s - %s", self.address_string(), format % args)
+
+    return FakeServerHandler
+
+
+def start_server(
+    cassette: Cassette,
+    host: str = "127.0.0.1",
+    port: int = 0,
+    latency: float = 0.0,
+    error_rate: float = 0.0,
+    requests_per_second: Optional[float] = None,
+    seed: Optional[int] = None,
+) -> ThreadingHTTPServer:
+    """Start the server in a daemon thread.
+
+    Args:
+        cassette (Cassette): recorded responses to serve
+        host (str, optional): address to listen on. Defaults to "127.0.0.1".
+        port (int, optional): port to listen on. Defaults to 0 (any free port; see `server.server_address`).
+        latency (float, optional): seconds to wait before each response. Defaults to 0.
+        error_rate (float, optional): fraction of requests answered with a 503 error. Defaults to 0.
+        requests_per_second (float, optional): rate limit, above which requests are answered with a 429 error. Defaults to None (no limit).
+        seed (int, optional): seed for the random errors. Defaults to None.
+
+    Returns:
+        ThreadingHTTPServer: running server (stop it with `shutdown()`)
+    """
+    replay = ReplayTransport(cassette, latency=latency, error_rate=error_rate, requests_per_second=requests_per_second, seed=seed)
+    server = ThreadingHTTPServer((host, port), make_handler(replay))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="rcsbapi-fake-server", daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve recorded RCSB API responses locally")
+    parser.add_argument("cassette", help="JSON file of responses recorded with rcsbapi.transport.RecordTransport")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to wait before each response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with a 503 error")
+    parser.add_argument("--rate-limit", type=float, default=None, help="requests per second above which 429 errors are returned")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the random errors")
+    args = parser.parse_args()
+
+    server = start_server(Cassette(args.cassette), args.host, args.port, args.latency, args.error_rate, args.rate_limit, args.seed)
+    print(f"Serving {args.cassette} on http://{args.host}:{server.server_address[1]} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,415 @@
+"""Request-level instrumentation shared between API clients: events, listeners, in-memory histograms and an OpenTelemetry adapter
+
+Example:
+    from rcsbapi.instrumentation import INSTRUMENTATION, MetricsRecorder
+
+    metrics = MetricsRecorder()
+    INSTRUMENTATION.add_listener(metrics)
+    ...  # run queries
+    print(metrics.summary())
+"""
+
+import bisect
+import contextlib
+import itertools
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Event kinds
+REQUEST_START = "request_start"
+REQUEST_END = "request_end"
+RETRY = "retry"
+THROTTLE = "throttle"
+COALESCED = "coalesced"
+
+
+@dataclass
+class RequestEvent:
+    """Something that happened while sending a request.
+
+    Attrs:
+        kind (str): one of `REQUEST_START`, `REQUEST_END`, `RETRY`, `THROTTLE` or `COALESCED` (a request answered by
+            an identical request already in flight)
+        api (str): API the request was sent to ("data", "search", "sequence" or "model")
+        request_id (Optional[int]): identifier shared by the start and end events of one request
+        url (Optional[str]): request URL
+        timestamp (float): time of the event (seconds since the epoch)
+        duration (Optional[float]): request duration (`REQUEST_END`), delay before the next attempt (`RETRY`)
+            time spent sleeping (`THROTTLE`) or waiting for the identical request (`COALESCED`), in seconds
+        status_code (Optional[int]): response status code (`REQUEST_END`, `RETRY`)
+        bytes (Optional[int]): response size in bytes (`REQUEST_END`)
+        batch_size (Optional[int]): number of input IDs in the request, for batched Data API requests
+        attempt (Optional[int]): number of the attempt that failed (`RETRY`)
+        error (Optional[BaseException]): error raised by the request, if any
+    """
+    kind: str
+    api: str
+    request_id: Optional[int] = None
+    url: Optional[str] = None
+    timestamp: float = 0.0
+    duration: Optional[float] = None
+    status_code: Optional[int] = None
+    bytes: Optional[int] = None
+    batch_size: Optional[int] = None
+    attempt: Optional[int] = None
+    error: Optional[BaseException] = None
+
+
+Listener = Callable[[RequestEvent], None]
+
+
+class Instrumentation:
+    """Dispatches request events to registered listeners (thread-safe).
+
+    Listeners are called synchronously in the thread (and event loop) that sent the request, so they should be fast.
+    Errors raised by listeners are logged and otherwise ignored. When no listeners are registered, no events are built.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._listeners: Tuple[Listener, ...] = ()
+        self._request_ids = itertools.count(1)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any listeners are registered"""
+        return bool(self._listeners)
+
+    def add_listener(self, listener: Listener) -> None:
+        """Register a function to be called with every `RequestEvent`."""
+        with self._lock:
+            self._listeners = self._listeners + (listener,)
+
+    def remove_listener(self, listener: Listener) -> None:
+        """Unregister a listener (no error if it isn't registered)."""
+        with self._lock:
+            self._listeners = tuple(registered for registered in self._listeners if registered != listener)
+
+    def emit(self, kind: str, api: str, **kwargs: Any) -> None:
+        """Send an event to all listeners.
+
+        Args:
+            kind (str): event kind
+            api (str): API the event concerns
+            **kwargs: other `RequestEvent` attributes
+        """
+        listeners = self._listeners
+        if not listeners:
+            return
+        event = RequestEvent(kind=kind, api=api, timestamp=time.time(), **kwargs)
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception as e:  # pylint: disable=broad-except
+                logger.warning("Instrumentation listener %r failed: %r", listener, e)
+
+    @contextlib.contextmanager
+    def request(self, api: str, url: str, batch_size: Optional[int] = None) -> Iterator["RequestTrace"]:
+        """Emit start and end events around sending a request.
+
+        Example:
+            with INSTRUMENTATION.request("search", url) as trace:
+                trace.response = httpx.post(url, ...)
+
+        Args:
+            api (str): API the request is sent to
+            url (str): request URL
+            batch_size (int, optional): number of input IDs in the request
+
+        Yields:
+            RequestTrace: object to attach the response to (for its status code and size)
+        """
+        trace = RequestTrace()
+        if not self._listeners:
+            yield trace
+            return
+        request_id = next(self._request_ids)
+        self.emit(REQUEST_START, api, request_id=request_id, url=url, batch_size=batch_size)
+        start = time.monotonic()
+        error: Optional[BaseException] = None
+        try:
+            yield trace
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            response = trace.response
+            self.emit(
+                REQUEST_END,
+                api,
+                request_id=request_id,
+                url=url,
+                batch_size=batch_size,
+                duration=time.monotonic() - start,
+                status_code=response.status_code if response is not None else None,
+                bytes=len(response.content) if response is not None else None,
+                error=error,
+            )
+
+
+class RequestTrace:
+    """Response holder for `Instrumentation.request`"""
+
+    def __init__(self) -> None:
+        self.response: Optional[Any] = None
+
+
+INSTRUMENTATION = Instrumentation()
+
+
+# Bucket upper bounds: 1-2-5 steps from 1e-3 to 1e9 (covers both seconds and bytes)
+DEFAULT_BUCKETS: Tuple[float, ...] = tuple(base * 10.0 ** exponent for exponent in range(-3, 10) for base in (1, 2, 5))
+
+
+class Histogram:
+    """Thread-safe histogram of observed values, with fixed bucket boundaries."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """Create an empty histogram.
+
+        Args:
+            buckets (Sequence[float], optional): sorted upper bounds of the buckets (values above the last bound go into an overflow bucket).
+                Defaults to `DEFAULT_BUCKETS`.
+        """
+        self._lock = threading.Lock()
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def observe(self, value: float) -> None:
+        """Add a value."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.sum += value
+            self.min = min(self.min, value)
+            self.max = max(self.max, value)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        """Estimate a percentile (the upper bound of the bucket containing it, clamped to the observed range)
+
+        Args:
+            percentile (float): percentile between 0 and 100
+
+        Returns:
+            Optional[float]: estimated value, or None if no values were observed
+        """
+        with self._lock:
+            if not self.count:
+                return None
+            rank = max(math.ceil(percentile / 100 * self.count), 1)
+            cumulative = 0
+            index = len(self._counts) - 1
+            for bucket, count in enumerate(self._counts):
+                cumulative += count
+                if cumulative >= rank:
+                    index = bucket
+                    break
+            bound = self.buckets[index] if index < len(self.buckets) else self.max
+            return min(max(bound, self.min), self.max)
+
+    def snapshot(self) -> Dict[str, Optional[float]]:
+        """Get summary statistics
+
+        Returns:
+            Dict[str, Optional[float]]: count, sum, mean, min, max, and estimated p50, p90 and p99
+        """
+        with self._lock:
+            count, total = self.count, self.sum
+            minimum, maximum = (self.min, self.max) if count else (None, None)
+        return {
+            "count": count,
+            "sum": total,
+            "mean": total / count if count else None,
+            "min": minimum,
+            "max": maximum,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+        }
+
+
+class MetricsRecorder:
+    """Listener aggregating request events into in-memory histograms and counters, per API.
+
+    Histograms: "duration" (seconds per request), "bytes" (response size), "batch_size" (IDs per Data API request),
+    "retry_delay" (seconds waited before retrying) and "throttle" (seconds slept by rate limiters).
+    Counters: "requests", "errors", "retries", "throttles", "coalesced", and "status_<code>" for each response status.
+    """
+
+    HISTOGRAMS = ("duration", "bytes", "batch_size", "retry_delay", "throttle")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._counters: Dict[Tuple[str, str], int] = {}
+
+    def _observe(self, api: str, name: str, value: Optional[float]) -> None:
+        if value is None:
+            return
+        with self._lock:
+            histogram = self._histograms.get((api, name))
+            if histogram is None:
+                histogram = self._histograms[(api, name)] = Histogram()
+        histogram.observe(value)
+
+    def _increment(self, api: str, name: str) -> None:
+        with self._lock:
+            self._counters[(api, name)] = self._counters.get((api, name), 0) + 1
+
+    def __call__(self, event: RequestEvent) -> None:
+        if event.kind == REQUEST_END:
+            self._increment(event.api, "requests")
+            if event.error is not None:
+                self._increment(event.api, "errors")
+            if event.status_code is not None:
+                self._increment(event.api, f"status_{event.status_code}")
+            self._observe(event.api, "duration", event.duration)
+            self._observe(event.api, "bytes", event.bytes)
+            self._observe(event.api, "batch_size", event.batch_size)
+        elif event.kind == RETRY:
+            self._increment(event.api, "retries")
+            self._observe(event.api, "retry_delay", event.duration)
+        elif event.kind == THROTTLE:
+            self._increment(event.api, "throttles")
+            self._observe(event.api, "throttle", event.duration)
+        elif event.kind == COALESCED:
+            self._increment(event.api, "coalesced")
+
+    def get_histogram(self, api: str, name: str) -> Optional[Histogram]:
+        """Get a histogram (e.g., `get_histogram("data", "duration")`), or None if nothing was observed yet"""
+        with self._lock:
+            return self._histograms.get((api, name))
+
+    def get_counter(self, api: str, name: str) -> int:
+        """Get a counter (e.g., `get_counter("search", "retries")`)"""
+        with self._lock:
+            return self._counters.get((api, name), 0)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Get all metrics
+
+        Returns:
+            Dict[str, Dict[str, Any]]: dictionary mapping each API to its counters and histogram summaries
+        """
+        with self._lock:
+            histograms = dict(self._histograms)
+            counters = dict(self._counters)
+        metrics: Dict[str, Dict[str, Any]] = {}
+        for (api, name), count in counters.items():
+            metrics.setdefault(api, {})[name] = count
+        for (api, name), histogram in histograms.items():
+            metrics.setdefault(api, {})[name] = histogram.snapshot()
+        return metrics
+
+    def summary(self) -> str:
+        """Get a readable summary of the metrics of each API"""
+        lines: List[str] = []
+        for api, metrics in sorted(self.snapshot().items()):
+            counters = ", ".join(f"{name}={value}" for name, value in sorted(metrics.items()) if isinstance(value, int))
+            lines.append(f"{api}: {counters}")
+            for name in self.HISTOGRAMS:
+                stats = metrics.get(name)
+                if stats:
+                    lines.append(
+                        f"  {name}: count={stats['count']} mean={stats['mean']:.4g} p50={stats['p50']:.4g} "
+                        f"p90={stats['p90']:.4g} p99={stats['p99']:.4g} max={stats['max']:.4g}"
+                    )
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        """Clear all metrics."""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+class OpenTelemetryListener:
+    """Listener exporting request events to OpenTelemetry (requires the `opentelemetry-api` package).
+
+    Each request attempt becomes a client span. Retries and throttling happen between attempts, so they are recorded
+    as events ("rcsbapi.retry" and "rcsbapi.throttle") on the span that is current when they occur (e.g., a span
+    started by the application around a query), if any. Durations, response sizes, retries and throttle time are
+    also recorded with OpenTelemetry metric instruments.
+    """
+
+    def __init__(self, tracer_provider: Any = None, meter_provider: Any = None):
+        """Create the OpenTelemetry tracer and instruments.
+
+        Args:
+            tracer_provider (optional): OpenTelemetry tracer provider. Defaults to the global provider.
+            meter_provider (optional): OpenTelemetry meter provider. Defaults to the global provider.
+
+        Raises:
+            ImportError: if opentelemetry-api is not installed
+        """
+        try:
+            from opentelemetry import metrics, trace  # pylint: disable=import-outside-toplevel
+        except ImportError as e:
+            raise ImportError("opentelemetry-api is required for OpenTelemetry instrumentation. Install it with `pip install opentelemetry-api`.") from e
+        self._trace = trace
+        self._tracer = trace.get_tracer("rcsbapi", tracer_provider=tracer_provider)
+        meter = metrics.get_meter("rcsbapi", meter_provider=meter_provider)
+        self._duration = meter.create_histogram("rcsbapi.request.duration", unit="s", description="Duration of API requests")
+        self._bytes = meter.create_histogram("rcsbapi.response.size", unit="By", description="Size of API responses")
+        self._retries = meter.create_counter("rcsbapi.request.retries", description="Number of retried API requests")
+        self._throttle = meter.create_histogram("rcsbapi.throttle.duration", unit="s", description="Time spent waiting for the request rate limit")
+        self._lock = threading.Lock()
+        self._spans: Dict[int, Any] = {}
+
+    def __call__(self, event: RequestEvent) -> None:
+        attributes = {"rcsbapi.api": event.api}
+        if event.kind == REQUEST_START and event.request_id is not None:
+            span = self._tracer.start_span(f"rcsbapi.{event.api}", kind=self._trace.SpanKind.CLIENT)
+            span.set_attribute("rcsbapi.api", event.api)
+            if event.url:
+                span.set_attribute("url.full", event.url)
+            if event.batch_size is not None:
+                span.set_attribute("rcsbapi.batch_size", event.batch_size)
+            with self._lock:
+                self._spans[event.request_id] = span
+        elif event.kind == REQUEST_END:
+            if event.status_code is not None:
+                attributes["http.response.status_code"] = event.status_code
+            if event.duration is not None:
+                self._duration.record(event.duration, attributes)
+            if event.bytes is not None:
+                self._bytes.record(event.bytes, attributes)
+            with self._lock:
+                span = self._spans.pop(event.request_id, None) if event.request_id is not None else None
+            if span is not None:
+                if event.status_code is not None:
+                    span.set_attribute("http.response.status_code", event.status_code)
+                if event.error is not None:
+                    span.record_exception(event.error)
+                    span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, repr(event.error)))
+                span.end()
+        elif event.kind == RETRY:
+            self._retries.add(1, attributes)
+            retry_attributes: Dict[str, Any] = dict(attributes)
+            if event.attempt is not None:
+                retry_attributes["rcsbapi.attempt"] = event.attempt
+            if event.duration is not None:
+                retry_attributes["rcsbapi.retry.delay"] = event.duration
+            if event.status_code is not None:
+                retry_attributes["http.response.status_code"] = event.status_code
+            self._add_span_event("rcsbapi.retry", retry_attributes)
+        elif event.kind == THROTTLE and event.duration is not None:
+            self._throttle.record(event.duration, attributes)
+            self._add_span_event("rcsbapi.throttle", {**attributes, "rcsbapi.throttle.duration": event.duration})
+
+    def _add_span_event(self, name: str, attributes: Dict[str, Any]) -> None:
+        """Add an event to the current span, if it is recording"""
+        span = self._trace.get_current_span()
+        if span.is_recording():
+            span.add_event(name, attributes)
@@ -7,6 +7,9 @@ import gzip
 import httpx
 from rcsbapi.const import const
 from rcsbapi.config import config
+from rcsbapi.retry import RetryPolicy
+from rcsbapi import transport
+from rcsbapi.instrumentation import INSTRUMENTATION, THROTTLE
 
 logger = logging.getLogger(__name__)
 
@@ -191,38 +194,31 @@ class ModelQuery:
     def _submit_request(self, url):
         """Submit a single request, with retry behavior and rate limiting.
         """
-        retry_backoff = self._retry_backoff
-        for attempt in range(1, self._max_retries + 1):
-            try:
-                # First check if request rate-limit reached
-                self._rate_limiter()
-                #
-                # Now perform the actual request
-                response = httpx.get(url, timeout=config.API_TIMEOUT, headers={"Content-Type": "application/json", "User-Agent": const.USER_AGENT})
-                response.raise_for_status()  # Raise an error for bad responses
-                #
-                if response.status_code == httpx.codes.OK:
-                    return response
-                elif response.status_code == httpx.codes.NO_CONTENT:
-                    return None
-                else:
-                    raise httpx.HTTPStatusError(
-                        f"Unexpected status: {response.status_code}",
-                        request=response.request,
-                        response=response
-                    )
-            except (httpx.RequestError, httpx.HTTPStatusError) as e:
-                if attempt == self._max_retries:
-                    logger.error(
-                        "Final retry attempt %r failed with exception:\n    %r\n"
-                        "Check query and parameters. If issue persists, try reducing 'config.MODEL_API_REQUESTS_PER_SECOND' or increasing 'config.API_TIMEOUT'.",
-                        attempt,
-                        e
-                    )
-                    raise
-                logger.warning("Attempt %r failed: %r. Retrying in %r seconds...", attempt, e, retry_backoff)
-                time.sleep(retry_backoff)
-                retry_backoff *= 2  # exponential backoff
+        def send():
+            # First check if request rate-limit reached
+            self._rate_limiter()
+            #
+            # Now perform the actual request
+            with INSTRUMENTATION.request("model", url) as trace:
+                response = trace.response = transport.send_request("GET", url, timeout=config.API_TIMEOUT, headers={"Content-Type": "application/json", "User-Agent": const.USER_AGENT})
+            response.raise_for_status()  # Raise an error for bad responses
+            #
+            if response.status_code == httpx.codes.OK:
+                return response
+            elif response.status_code == httpx.codes.NO_CONTENT:
+                return None
+            else:
+                raise httpx.HTTPStatusError(
+                    f"Unexpected status: {response.status_code}",
+                    request=response.request,
+                    response=response
+                )
+
+        return RetryPolicy(self._max_retries, self._retry_backoff, api="model").call(
+            send,
+            url,
+            hint="Check query and parameters. If issue persists, try reducing 'config.MODEL_API_REQUESTS_PER_SECOND' or increasing 'config.API_TIMEOUT'.",
+        )
 
     def _rate_limiter(self):
         """Check if request rate-limit has been reached, and if so, sleep until it can be reset.
@@ -241,6 +237,7 @@ class ModelQuery:
                     self._request_limit_time_interval,
                     sleep_time
                 )
+                INSTRUMENTATION.emit(THROTTLE, "model", duration=sleep_time)
                 time.sleep(sleep_time)
             self._last_request_time = time.monotonic()
             self._request_count = 0
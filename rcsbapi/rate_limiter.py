@@ -0,0 +1,70 @@
+"""Request rate limiting shared between API clients"""
+
+import asyncio
+import logging
+import time
+from typing import Optional
+from rcsbapi.instrumentation import INSTRUMENTATION, THROTTLE
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRateLimiter:
+    """Limit the number of requests sent within a fixed time window.
+
+    A single limiter can be shared by any number of queries (and tasks) running in the same event loop,
+    so that their combined request rate stays within the API's limits.
+
+    Example:
+        import httpx
+        from rcsbapi.config import config
+        from rcsbapi.data import DataQuery
+        from rcsbapi.rate_limiter import AsyncRateLimiter
+
+        limiter = AsyncRateLimiter(config.DATA_API_REQUESTS_PER_SECOND)
+        async with httpx.AsyncClient(timeout=config.API_TIMEOUT) as client:
+            query = DataQuery(input_type="entries", input_ids=["4HHB"], return_data_list=["exptl.method"])
+            result_dict = await query.aexec(client=client, rate_limiter=limiter)
+    """
+
+    def __init__(self, requests_per_second: int, time_interval: int = 10, api: str = "data"):
+        """Create a rate limiter.
+
+        Args:
+            requests_per_second (int): maximum average number of requests per second
+            time_interval (int, optional): length in seconds of the window over which the limit is applied. Defaults to 10.
+            api (str, optional): API the requests are sent to, reported in instrumentation events. Defaults to "data".
+        """
+        self._request_limit_time_interval = time_interval
+        self._requests_per_window_limit = requests_per_second * time_interval
+        self._last_request_time = time.monotonic()
+        self._request_count = 0
+        self._lock: Optional[asyncio.Lock] = None
+        self._api = api
+
+    async def acquire(self) -> None:
+        """Check if request rate-limit has been reached, and if so, sleep until it can be reset.
+        """
+        if self._lock is None:
+            # Created lazily so that the lock belongs to the running event loop
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._last_request_time
+            if elapsed >= self._request_limit_time_interval:
+                self._last_request_time = now
+                self._request_count = 0
+            if self._request_count >= self._requests_per_window_limit:
+                sleep_time = self._request_limit_time_interval - elapsed
+                if sleep_time > 0:
+                    logger.info(
+                        "Request rate limit reached (%r requests/ %r seconds). Sleeping for %.1f seconds...",
+                        self._requests_per_window_limit,
+                        self._request_limit_time_interval,
+                        sleep_time
+                    )
+                    INSTRUMENTATION.emit(THROTTLE, self._api, duration=sleep_time)
+                    await asyncio.sleep(sleep_time)
+                self._last_request_time = time.monotonic()
+                self._request_count = 0
+            self._request_count += 1
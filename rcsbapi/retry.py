@@ -0,0 +1,268 @@
+"""Retry policy shared between API clients: jittered backoff, status-aware retries, Retry-After and circuit breaking"""
+
+import asyncio
+import email.utils
+import logging
+import random
+import threading
+import time
+import urllib.parse
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+import httpx
+from rcsbapi.config import config
+from rcsbapi.instrumentation import INSTRUMENTATION, RETRY
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Statuses that may succeed if the same request is sent again. Other 4xx errors (e.g., 400, 404) never will.
+RETRYABLE_STATUS_CODES = frozenset({
+    httpx.codes.REQUEST_TIMEOUT,
+    httpx.codes.TOO_EARLY,
+    httpx.codes.TOO_MANY_REQUESTS,
+    httpx.codes.INTERNAL_SERVER_ERROR,
+    httpx.codes.BAD_GATEWAY,
+    httpx.codes.SERVICE_UNAVAILABLE,
+    httpx.codes.GATEWAY_TIMEOUT,
+})
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised instead of sending a request to a host whose circuit is open (after repeated failures)."""
+
+
+class _Circuit:
+    def __init__(self) -> None:
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+
+
+class CircuitBreaker:
+    """Per-host circuit breaker shared by all API clients in the process (thread-safe).
+
+    After `config.CIRCUIT_BREAKER_THRESHOLD` consecutive failed requests to a host, its circuit opens and
+    requests to it fail immediately with `CircuitOpenError`. A request counts as failed once, after its last
+    attempt, however many times it was retried. After `config.CIRCUIT_BREAKER_RESET_TIMEOUT` seconds, one trial
+    request is let through: if it succeeds the circuit closes again, otherwise it reopens without being retried.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._circuits: Dict[str, _Circuit] = {}
+
+    def before_request(self, host: str) -> None:
+        """Check that a request to the host may be sent.
+
+        Args:
+            host (str): host name
+
+        Raises:
+            CircuitOpenError: if the host's circuit is open
+        """
+        with self._lock:
+            circuit = self._circuits.get(host)
+            if circuit is None or circuit.opened_at is None:
+                return
+            remaining = circuit.opened_at + config.CIRCUIT_BREAKER_RESET_TIMEOUT - time.monotonic()
+            if remaining > 0:
+                raise CircuitOpenError(
+                    f"Circuit for {host} is open after {circuit.failures} consecutive failed requests; "
+                    f"not sending requests for another {remaining:.0f} seconds"
+                )
+            # Let one trial request through. If it never reports back (e.g., it was cancelled), another is let through after the next timeout.
+            circuit.opened_at = time.monotonic()
+            circuit.trial_in_flight = True
+
+    def record_success(self, host: str) -> None:
+        """Close the host's circuit."""
+        with self._lock:
+            self._circuits.pop(host, None)
+
+    def record_failure(self, host: str, final: bool = True) -> bool:
+        """Report a failed attempt of a request to the host.
+
+        Only final attempts count towards the threshold, except for a trial request, whose first failure reopens the circuit.
+
+        Args:
+            host (str): host name
+            final (bool, optional): whether this was the request's last attempt. Defaults to True.
+
+        Returns:
+            bool: whether the failure opened the host's circuit
+        """
+        threshold = config.CIRCUIT_BREAKER_THRESHOLD
+        if threshold <= 0:
+            return False
+        with self._lock:
+            circuit = self._circuits.get(host)
+            trial = circuit is not None and circuit.trial_in_flight
+            if not final and not trial:
+                return False
+            if circuit is None:
+                circuit = self._circuits[host] = _Circuit()
+            circuit.failures += 1
+            if not trial and circuit.failures < threshold:
+                return False
+            if circuit.opened_at is None or trial:
+                logger.warning("Opening circuit for %s after %r consecutive failed requests", host, circuit.failures)
+            circuit.opened_at = time.monotonic()
+            circuit.trial_in_flight = False
+            return True
+
+    def reset(self) -> None:
+        """Close all circuits."""
+        with self._lock:
+            self._circuits.clear()
+
+
+CIRCUIT_BREAKER = CircuitBreaker()
+
+
+class RetryPolicy:
+    """Retry transient request failures with decorrelated jitter backoff.
+
+    - Only request errors (e.g., connection failures, timeouts or undecodable content) and statuses in
+      `RETRYABLE_STATUS_CODES` are retried.
+    - A `Retry-After` header on a failed response is used as the delay before the next attempt.
+    - Otherwise each delay is drawn uniformly between `retry_backoff` and three times the previous delay
+      (capped at `config.RETRY_MAX_BACKOFF`), so that clients that failed together don't retry together.
+    - Requests that still fail after `max_retries` attempts are reported to a per-host `CircuitBreaker`.
+
+    Example:
+        policy = RetryPolicy(max_retries=5, retry_backoff=1)
+        response = policy.call(lambda: httpx.get(url), url)
+    """
+
+    def __init__(
+        self,
+        max_retries: Optional[int] = None,
+        retry_backoff: Optional[float] = None,
+        max_backoff: Optional[float] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        api: str = "",
+    ):
+        """Create a retry policy.
+
+        Args:
+            max_retries (int, optional): maximum number of attempts per request. Defaults to `config.MAX_RETRIES`.
+            retry_backoff (float, optional): minimum delay in seconds between attempts. Defaults to `config.RETRY_BACKOFF`.
+            max_backoff (float, optional): maximum delay in seconds between attempts (unless the server asks for longer
+                with `Retry-After`). Defaults to `config.RETRY_MAX_BACKOFF`.
+            circuit_breaker (CircuitBreaker, optional): circuit breaker to report to. Defaults to the process-wide `CIRCUIT_BREAKER`.
+            api (str, optional): API the requests are sent to, reported in instrumentation events (e.g., "data")
+        """
+        self.max_retries = max_retries if max_retries else config.MAX_RETRIES
+        self.retry_backoff = retry_backoff if retry_backoff else config.RETRY_BACKOFF
+        self.max_backoff = max_backoff if max_backoff else config.RETRY_MAX_BACKOFF
+        self.circuit_breaker = circuit_breaker if circuit_breaker is not None else CIRCUIT_BREAKER
+        self.api = api
+
+    @staticmethod
+    def is_retryable(error: BaseException) -> bool:
+        """Whether a failed request may succeed if sent again"""
+        if isinstance(error, CircuitOpenError):
+            return False
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in RETRYABLE_STATUS_CODES
+        return isinstance(error, httpx.RequestError)
+
+    @staticmethod
+    def retry_after(error: BaseException) -> Optional[float]:
+        """Get the delay in seconds requested by the server with a `Retry-After` header, if any"""
+        if not isinstance(error, httpx.HTTPStatusError):
+            return None
+        value = error.response.headers.get("Retry-After")
+        if value is None:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            retry_at = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(retry_at.timestamp() - time.time(), 0.0)
+
+    def next_delay(self, previous_delay: float) -> float:
+        """Get a jittered delay before the next attempt, given the delay before the previous one (or 0 before the first retry)"""
+        upper = max(self.retry_backoff, previous_delay * 3)
+        return min(self.max_backoff, random.uniform(self.retry_backoff, upper))
+
+    def _on_failure(self, error: BaseException, host: str, attempt: int, delay: float, hint: str) -> Optional[float]:
+        """Report a failed attempt, and get the delay before the next one (None if the error should be raised)"""
+        if not self.is_retryable(error):
+            if not isinstance(error, CircuitOpenError):
+                # The host responded, so it's up (the request itself is at fault)
+                self.circuit_breaker.record_success(host)
+            if isinstance(error, httpx.HTTPError):
+                logger.error("Request failed with non-retryable exception:\n    %r", error)
+            return None
+        final = attempt == self.max_retries
+        if self.circuit_breaker.record_failure(host, final=final) and not final:
+            logger.error("Trial request to %s failed with exception:\n    %r", host, error)
+            return None
+        if final:
+            logger.error("Final retry attempt %r failed with exception:\n    %r\n%s", attempt, error, hint)
+            return None
+        retry_after = self.retry_after(error)
+        delay = retry_after if retry_after is not None else self.next_delay(delay)
+        logger.warning("Attempt %r failed: %r. Retrying in %.1f seconds...", attempt, error, delay)
+        INSTRUMENTATION.emit(
+            RETRY,
+            self.api,
+            attempt=attempt,
+            duration=delay,
+            status_code=error.response.status_code if isinstance(error, httpx.HTTPStatusError) else None,
+            error=error,
+        )
+        return delay
+
+    def call(self, send: Callable[[], T], url: str, hint: str = "") -> T:
+        """Send a request, retrying transient failures.
+
+        Args:
+            send (Callable[[], T]): function sending the request (and raising an error for bad responses)
+            url (str): URL the request is sent to (used to identify the host for circuit breaking)
+            hint (str, optional): advice logged along with the error when the final attempt fails
+
+        Returns:
+            T: result of `send`
+        """
+        host = urllib.parse.urlsplit(url).netloc
+        delay = 0.0
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                self.circuit_breaker.before_request(host)
+                result = send()
+            except Exception as e:
+                next_delay = self._on_failure(e, host, attempt, delay, hint)
+                if next_delay is None:
+                    raise
+                delay = next_delay
+                time.sleep(delay)
+                continue
+            self.circuit_breaker.record_success(host)
+            return result
+        raise AssertionError("unreachable")
+
+    async def acall(self, send: Callable[[], Awaitable[T]], url: str, hint: str = "") -> T:
+        """Asynchronously send a request, retrying transient failures (see `call`)."""
+        host = urllib.parse.urlsplit(url).netloc
+        delay = 0.0
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                self.circuit_breaker.before_request(host)
+                result = await send()
+            except Exception as e:
+                next_delay = self._on_failure(e, host, attempt, delay, hint)
+                if next_delay is None:
+                    raise
+                delay = next_delay
+                await asyncio.sleep(delay)
+                continue
+            self.circuit_breaker.record_success(host)
+            return result
+        raise AssertionError("unreachable")
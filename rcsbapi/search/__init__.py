@@ -6,6 +6,8 @@ from rcsbapi.search.search_query import Attr, AttributeQuery, TextQuery, NestedA
 from rcsbapi.search.search_query import SeqSimilarityQuery, SeqMotifQuery, ChemSimilarityQuery, StructSimilarityQuery, StructMotifResidue, StructMotifQuery
 from rcsbapi.search.search_query import Facet, FacetRange, TerminalFilter, GroupFilter, FilterFacet, Sort, GroupBy, RankingCriteriaType
 from rcsbapi.search.search_query import Group
+from rcsbapi.search.search_cache import SearchCache
+from rcsbapi.search.search_results import ResultSet
 
 search_attributes = SEARCH_SCHEMA.search_attributes
 group = Group.group
@@ -35,4 +37,6 @@ __all__ = [
     "Sort",  # Rename to prevent overlap?
     "GroupBy",
     "RankingCriteriaType",
+    "SearchCache",
+    "ResultSet",
 ]
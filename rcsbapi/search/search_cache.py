@@ -0,0 +1,157 @@
+"""Cache of Search API responses, with an in-memory tier and an optional persistent tier."""
+
+import collections
+import copy
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, OrderedDict, Tuple
+from rcsbapi.sqlite_lru import SqliteLruStore
+
+logger = logging.getLogger(__name__)
+
+
+class SearchCache:
+    """Cache of Search API responses, keyed by the canonical JSON of the request.
+
+    Requests are identified by their query and request options, independently of the random `query_id` of each
+    session, so repeated evaluations of the same query share cached responses. Sessions identify queries by their
+    canonical form (see `rcsbapi.search.search_optimizer`), so equivalent queries share cached responses too.
+    Each page of results (and the response of a `return_counts` request) is cached separately, along with its
+    total count, facets and explain metadata.
+
+    Responses are kept in memory, and also in an SQLite database if a `path` is given, so that they can be shared
+    between processes and survive restarts. Both tiers evict their least recently used responses when full.
+
+    Example:
+        from rcsbapi.search import AttributeQuery, SearchCache
+
+        cache = SearchCache("rcsb_search_cache.sqlite", ttl=3600)
+        query = AttributeQuery("exptl.method", operator="exact_match", value="electron microscopy")
+        session = query(cache=cache)  # later evaluations of the same query are answered from the cache
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: Optional[float] = 3600,
+        max_memory_size: Optional[int] = 64 * 1024**2,
+        max_disk_size: Optional[int] = 1024**3,
+    ):
+        """Create a cache.
+
+        Args:
+            path (str, optional): path to the SQLite database file of the persistent tier. Defaults to None (memory only).
+            ttl (float, optional): time in seconds after which cached responses expire. None to never expire. Defaults to 1 hour.
+            max_memory_size (int, optional): maximum total size in bytes of the responses kept in memory. None for no limit. Defaults to 64 MiB.
+            max_disk_size (int, optional): maximum total size in bytes of the responses kept on disk. None for no limit. Defaults to 1 GiB.
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_memory_size = max_memory_size
+        self.max_disk_size = max_disk_size
+        self._lock = threading.Lock()
+        # key -> (creation time, JSON text), from least to most recently used
+        self._memory: OrderedDict[str, Tuple[float, str]] = collections.OrderedDict()
+        self._memory_size = 0
+        self._store: Optional[SqliteLruStore] = None
+        if path is not None:
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._store = SqliteLruStore(path, "responses", ("key",))
+
+    @staticmethod
+    def query_key(params: Dict[str, Any]) -> str:
+        """Get the key identifying a query, independently of its `query_id` and paging.
+
+        Args:
+            params (Dict[str, Any]): Search API request (see `Session._make_params()`)
+
+        Returns:
+            str: hex digest of the canonical JSON of the request
+        """
+        canonical = copy.deepcopy(params)
+        canonical.pop("request_info", None)
+        canonical.get("request_options", {}).pop("paginate", None)
+        return hashlib.sha1(json.dumps(canonical, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+    @classmethod
+    def request_key(cls, params: Dict[str, Any]) -> str:
+        """Get the key identifying a request: its query key and page (or "count" for a `return_counts` request)"""
+        paginate = params.get("request_options", {}).get("paginate")
+        page = f"{paginate.get('start', 0)}:{paginate.get('rows', '')}" if paginate else "count"
+        return f"{cls.query_key(params)}/{page}"
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl is not None and now - created > self.ttl
+
+    def get(self, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Get the unexpired cached response to a request.
+
+        Args:
+            params (Dict[str, Any]): Search API request
+
+        Returns:
+            Optional[Dict[str, Any]]: cached response (a new copy each time), or None if it isn't cached
+        """
+        key = self.request_key(params)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[0], now):
+                    self._memory.move_to_end(key)
+                    return dict(json.loads(entry[1]))
+                self._remove_from_memory(key)
+            if self._store is None:
+                return None
+            found = self._store.get_many([(key,)], self.ttl).get((key,))
+            if found is None:
+                return None
+            # Keep it in memory for subsequent requests
+            self._add_to_memory(key, *found)
+        return dict(json.loads(found[1]))
+
+    def put(self, params: Dict[str, Any], response: Dict[str, Any]) -> None:
+        """Add or replace the cached response to a request, then evict responses if necessary.
+
+        Args:
+            params (Dict[str, Any]): Search API request
+            response (Dict[str, Any]): JSON response
+        """
+        key = self.request_key(params)
+        data = json.dumps(response, separators=(",", ":"))
+        now = time.time()
+        with self._lock:
+            self._add_to_memory(key, now, data)
+            if self._store is not None:
+                self._store.put_many({(key,): data}, self.ttl, self.max_disk_size)
+
+    def _add_to_memory(self, key: str, created: float, data: str) -> None:
+        self._remove_from_memory(key)
+        self._memory[key] = (created, data)
+        self._memory_size += len(data)
+        while self.max_memory_size is not None and self._memory_size > self.max_memory_size and self._memory:
+            self._remove_from_memory(next(iter(self._memory)))
+
+    def _remove_from_memory(self, key: str) -> None:
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_size -= len(entry[1])
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_size = 0
+            if self._store is not None:
+                self._store.clear()
+
+    def close(self) -> None:
+        """Close the underlying database connection (if any)."""
+        if self._store is not None:
+            self._store.close()
+            self._store = None
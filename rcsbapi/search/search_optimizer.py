@@ -0,0 +1,190 @@
+"""Logical optimization of Search API query trees before submission.
+
+The optimized query matches the same results as the original, with a smaller and canonical request:
+
+- nested groups with the same logical operator are flattened (`(a & b) & c` -> `a & b & c`)
+- duplicate nodes are removed (`a | a` -> `a`)
+- `exact_match` and `in` terminals on the same attribute are merged into a single `in` terminal, when combined
+  with OR (`a == 1 | a == 2` -> `a in [1, 2]`), or when negated and combined with AND (`a != 1 & a != 2` -> `a not in [1, 2]`)
+- negations are kept on terminals (the Search API has no negated groups, so negated groups are expanded with
+  De Morgan's laws when they are built with `~`)
+- empty groups are removed, and groups with a single node are replaced by that node
+- the nodes of each group, and the values of merged `in` terminals, are sorted, so that equivalent queries
+  produce the same request (see `canonical_key()`)
+
+Groups whose nodes must stay grouped (`NestedAttributeQuery` and groups marked with `group()`) are kept as they are.
+
+Queries with very long `in` value lists can also be split into smaller sub-queries (see `split_in_terminal()`),
+whose results are combined client-side.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Tuple
+from rcsbapi.search.search_query import AttributeQuery, Group, SearchQuery, Terminal
+
+# Operators that can be merged into a single "in" terminal
+_EQUALITY_OPERATORS = ("exact_match", "in")
+
+
+def optimize(query: SearchQuery) -> SearchQuery:
+    """Get a smaller query, in canonical form, matching the same results as `query`.
+
+    Args:
+        query (SearchQuery): query to optimize
+
+    Raises:
+        ValueError: if the query contains no terminals (e.g., only empty groups)
+
+    Returns:
+        SearchQuery: optimized query
+    """
+    optimized = _optimize(query)
+    if optimized is None:
+        raise ValueError("Query contains no terminals: nothing to search for")
+    return optimized
+
+
+def canonical_key(query: SearchQuery) -> str:
+    """Get a key identifying a query by its meaning rather than its construction (e.g., for caching)
+
+    Args:
+        query (SearchQuery): query to identify
+
+    Returns:
+        str: hex digest of the canonical JSON of the optimized query
+    """
+    return hashlib.sha1(_canonical_json(optimize(query)).encode("utf-8")).hexdigest()
+
+
+def canonical_dict(query: SearchQuery) -> Dict[str, Any]:
+    """Get the dictionary representing a query without its node IDs"""
+    return _strip_node_ids(query.to_dict())
+
+
+def _strip_node_ids(query_dict: Dict[str, Any]) -> Dict[str, Any]:
+    stripped = {key: value for key, value in query_dict.items() if key != "node_id"}
+    if "nodes" in stripped:
+        stripped["nodes"] = [_strip_node_ids(node) for node in stripped["nodes"]]
+    return stripped
+
+
+def _canonical_json(query: SearchQuery) -> str:
+    return json.dumps(canonical_dict(query), sort_keys=True, separators=(",", ":"))
+
+
+def _optimize(query: SearchQuery) -> Optional[SearchQuery]:
+    if not isinstance(query, Group) or query.keep_nested:
+        return query
+    nodes: List[SearchQuery] = []
+    for node in query.nodes:
+        optimized = _optimize(node)
+        if optimized is None:
+            continue
+        if isinstance(optimized, Group) and optimized.operator == query.operator and not optimized.keep_nested:
+            nodes.extend(optimized.nodes)
+        else:
+            nodes.append(optimized)
+    nodes = _merge_equality_terminals(query.operator, nodes)
+
+    # Deduplicate and sort by canonical JSON
+    unique: Dict[str, SearchQuery] = {}
+    for node in nodes:
+        unique.setdefault(_canonical_json(node), node)
+    nodes = [unique[key] for key in sorted(unique)]
+
+    if not nodes:
+        return None
+    if len(nodes) == 1:
+        return nodes[0]
+    return Group(query.operator, nodes)
+
+
+def _merge_key(node: SearchQuery, operator: str) -> Optional[Tuple[str, str, bool]]:
+    """Get the (service, attribute, negation) of a terminal that can be merged with others in a group, or None"""
+    if not isinstance(node, Terminal) or not isinstance(node.service, str):
+        return None
+    params = node.params
+    if params.get("operator") not in _EQUALITY_OPERATORS or "attribute" not in params or "value" not in params:
+        return None
+    if set(params) - {"attribute", "operator", "negation", "value"}:
+        return None  # e.g., case sensitivity, which "in" doesn't support
+    negation = bool(params.get("negation"))
+    # OR of equalities is membership, and AND of negated equalities is non-membership
+    if (operator == "or" and negation) or (operator == "and" and not negation):
+        return None
+    return (node.service, params["attribute"], negation)
+
+
+def _merge_equality_terminals(operator: str, nodes: List[SearchQuery]) -> List[SearchQuery]:
+    groups: Dict[Tuple[str, str, bool], List[Terminal]] = {}
+    for node in nodes:
+        key = _merge_key(node, operator)
+        if key is not None:
+            assert isinstance(node, Terminal)  # for mypy
+            groups.setdefault(key, []).append(node)
+
+    merged: List[SearchQuery] = []
+    done = set()
+    for node in nodes:
+        key = _merge_key(node, operator)
+        if key is None or len(groups[key]) == 1:
+            merged.append(node)
+            continue
+        if key in done:
+            continue
+        done.add(key)
+        values: Dict[str, Any] = {}
+        for terminal in groups[key]:
+            value = terminal.params["value"]
+            for item in (value if isinstance(value, list) else [value]):
+                values.setdefault(json.dumps(item, sort_keys=True), item)
+        service, attribute, negation = key
+        merged.append(AttributeQuery(attribute, "in", [values[item] for item in sorted(values)], service=service, negation=negation))
+    return merged
+
+
+def split_in_terminal(query: SearchQuery, max_values: int) -> Optional[Tuple[str, List[SearchQuery]]]:
+    """Split the largest `in` terminal with more than `max_values` values into sub-queries with chunks of its values.
+
+    Every other node of the query is the same in each sub-query. As the Search API only negates terminals, a query
+    matches a result if any sub-query matches it, or, if the terminal is negated, if every sub-query matches it.
+
+    Args:
+        query (SearchQuery): query to split
+        max_values (int): maximum number of values in each chunk
+
+    Returns:
+        Optional[Tuple[str, List[SearchQuery]]]: logical operator ("or" or "and") to combine the results of the
+            sub-queries with, and the sub-queries, or None if no `in` terminal has more than `max_values` values
+    """
+    largest: Optional[Terminal] = None
+    for terminal in _terminals(query):
+        value = terminal.params.get("value")
+        if terminal.params.get("operator") == "in" and isinstance(value, list) and len(value) > max_values:
+            if largest is None or len(value) > len(largest.params["value"]):
+                largest = terminal
+    if largest is None:
+        return None
+    values = largest.params["value"]
+    sub_queries = [
+        _replace(query, largest, Terminal(largest.service, {**largest.params, "value": values[i:i + max_values]}, largest.node_id))
+        for i in range(0, len(values), max_values)
+    ]
+    return ("and" if largest.params.get("negation") else "or", sub_queries)
+
+
+def _terminals(query: SearchQuery) -> List[Terminal]:
+    if isinstance(query, Terminal):
+        return [query]
+    if isinstance(query, Group):
+        return [terminal for node in query.nodes for terminal in _terminals(node)]
+    return []
+
+
+def _replace(query: SearchQuery, target: Terminal, replacement: SearchQuery) -> SearchQuery:
+    if query is target:
+        return replacement
+    if isinstance(query, Group):
+        return Group(query.operator, [_replace(node, target, replacement) for node in query.nodes], keep_nested=query.keep_nested)
+    return query
@@ -2,11 +2,17 @@
 """
 
 from __future__ import annotations
+import asyncio
+import collections
+import concurrent.futures
+import copy
 import functools
+import itertools
 import json
 import logging
 import math
 import sys
+import threading
 import urllib.parse
 import uuid
 import time
@@ -15,13 +21,18 @@ from dataclasses import dataclass, fields, is_dataclass
 from datetime import date
 from typing import (
     Any,
+    AsyncGenerator,
+    AsyncIterator,
     Callable,
+    Deque,
     Dict,
     Generic,
     Iterable,
     Iterator,
     List,
     Optional,
+    Sequence,
+    Set,
     Tuple,
     TypeVar,
     Union,
@@ -31,14 +42,20 @@ from warnings import warn
 import httpx
 from rcsbapi.const import const
 from rcsbapi.config import config
+from rcsbapi.retry import RetryPolicy
+from rcsbapi import transport
+from rcsbapi.instrumentation import INSTRUMENTATION, THROTTLE
+from rcsbapi.rate_limiter import AsyncRateLimiter
 from rcsbapi.search.search_schema import SearchSchema
+from rcsbapi.search.search_cache import SearchCache
+from rcsbapi.search.search_results import ResultSet
 
 if sys.version_info > (3, 8):
     from typing import Literal
 else:
     from typing_extensions import Literal
 
-from tqdm import trange
+from tqdm import tqdm
 
 logger = logging.getLogger(__name__)
 
@@ -131,7 +148,7 @@ def fileUpload(filepath: str, fmt: str = "cif") -> str:
     should then be passed through as part of the value parameter,
     along with the format of the file."""
     with open(filepath, mode="rb") as f:
-        res = httpx.post(const.UPLOAD_URL, files={"file": f}, data={"format": fmt}, timeout=config.API_TIMEOUT)
+        res = transport.send_request("POST", const.UPLOAD_URL, files={"file": f}, data={"format": fmt}, timeout=config.API_TIMEOUT)
         try:
             spec = res.json()["key"]
         except KeyError:
@@ -166,6 +183,18 @@ class SearchQuery(ABC):
         """Get JSON string of this query"""
         return json.dumps(self.to_dict(), separators=(",", ":"))
 
+    def optimize(self) -> "SearchQuery":
+        """Get a smaller query, in canonical form, matching the same results as this query
+        (see `rcsbapi.search.search_optimizer`). Queries are also optimized before submission if
+        `config.SEARCH_API_OPTIMIZE_QUERIES` is True.
+
+        Example:
+            >>> (AttributeQuery("exptl.method", "exact_match", "X-RAY DIFFRACTION") | AttributeQuery("exptl.method", "exact_match", "ELECTRON MICROSCOPY")).optimize()
+            AttributeQuery(service='text', params={'attribute': 'exptl.method', 'operator': 'in', 'negation': False, 'value': ['ELECTRON MICROSCOPY', 'X-RAY DIFFRACTION']}, node_id=0)
+        """
+        from rcsbapi.search.search_optimizer import optimize  # pylint: disable=import-outside-toplevel
+        return optimize(self)
+
     @abstractmethod
     def _assign_ids(self, node_id=0) -> Tuple["SearchQuery", int]:
         """Assign node_ids sequentially for all terminal nodes
@@ -226,6 +255,8 @@ class SearchQuery(ABC):
         scoring_strategy: Optional[ScoringStrategy] = None,
         max_retries: int = None,
         retry_backoff: int = None,
+        max_concurrency: int = None,
+        cache: Optional[SearchCache] = None,
     ) -> Union["Session", int]:
         # pylint: disable=dangerous-default-value
         """Evaluate this query and return an iterator of all result IDs"""
@@ -247,9 +278,12 @@ class SearchQuery(ABC):
             scoring_strategy=scoring_strategy,
             max_retries=max_retries,
             retry_backoff=retry_backoff,
+            max_concurrency=max_concurrency,
+            cache=cache,
         )
 
-        response = session.to_dict()
+        # The stored response is only read here, so it doesn't need to be copied like `to_dict()` does
+        response = session._get_first_page() or {}
 
         # If return_counts exists, return only the total count
         if return_counts:
@@ -257,18 +291,81 @@ class SearchQuery(ABC):
                 return 0
             return response["total_count"]
 
-        if "total_count" in response:
-            total_count = response["total_count"]
-            setattr(session, "count", total_count)
+        session._set_request_option_results(response)
+        return session
 
-        if "explain_metadata" in response:
-            explain_metadata = response["explain_metadata"]
-            setattr(session, "explain_metadata", explain_metadata)
+    async def aexec(
+        self,
+        return_type: ReturnType = "entry",
+        rows: int = 10000,
+        return_content_type: List[ReturnContentType] = ["experimental"],
+        results_verbosity: VerbosityLevel = "compact",
+        return_counts: bool = False,
+        facets: Optional[List[Union[Facet, FilterFacet]]] = None,
+        group_by: Optional[GroupBy] = None,
+        group_by_return_type: Optional[Literal["groups", "representatives"]] = None,
+        sort: Optional[List[Sort]] = None,
+        return_explain_metadata: bool = False,
+        scoring_strategy: Optional[ScoringStrategy] = None,
+        max_retries: int = None,
+        retry_backoff: int = None,
+        max_concurrency: int = None,
+        cache: Optional[SearchCache] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        rate_limiter: Optional[AsyncRateLimiter] = None,
+    ) -> Union["AsyncSession", int]:
+        # pylint: disable=dangerous-default-value
+        """Asynchronously evaluate this query in the caller's running event loop, and return an `AsyncSession`
+        to iterate over all result IDs with `async for`.
 
-        if "facets" in response:
-            facets = response["facets"]
-            setattr(session, "facets", facets)
+        Args:
+            client (httpx.AsyncClient, optional): client to send requests with (e.g., to share a connection pool
+                between queries). The client is not closed afterwards. Defaults to a client owned by the returned
+                session, which stays open until the session is closed with `aclose()` or by using it as an async
+                context manager (`async with await query.aexec(...) as session:`).
+            rate_limiter (AsyncRateLimiter, optional): rate limiter to count requests against, e.g., to share a
+                single rate limit between several queries. Defaults to the session's own limiter.
+            All other arguments are the same as for `exec()`.
+        """
+
+        NestedAttributeQueryChecker(self).validate()
 
+        session = AsyncSession(
+            query=self,
+            return_type=return_type,
+            rows=rows,
+            return_content_type=return_content_type,
+            results_verbosity=results_verbosity,
+            return_counts=return_counts,
+            facets=facets,
+            group_by=group_by,
+            group_by_return_type=group_by_return_type,
+            sort=sort,
+            return_explain_metadata=return_explain_metadata,
+            scoring_strategy=scoring_strategy,
+            max_retries=max_retries,
+            retry_backoff=retry_backoff,
+            max_concurrency=max_concurrency,
+            cache=cache,
+            client=client,
+            rate_limiter=rate_limiter,
+        )
+
+        if return_counts:
+            # The session isn't returned, so release its client right away
+            async with session:
+                response = await session._aget_first_page(session._get_client()) or {}
+            if not response:
+                return 0
+            return response["total_count"]
+
+        try:
+            response = await session._aget_first_page(session._get_client()) or {}
+        except BaseException:
+            await session.aclose()
+            raise
+
+        session._set_request_option_results(response)
         return session
 
     def __call__(
@@ -288,6 +385,8 @@ class SearchQuery(ABC):
         scoring_strategy: Optional[ScoringStrategy] = None,
         max_retries: int = None,
         retry_backoff: int = None,
+        max_concurrency: int = None,
+        cache: Optional[SearchCache] = None,
     ) -> Union["Session", int]:
         # pylint: disable=dangerous-default-value
         """Evaluate this query and return an iterator of all result IDs"""
@@ -305,6 +404,8 @@ class SearchQuery(ABC):
             scoring_strategy=scoring_strategy,
             max_retries=max_retries,
             retry_backoff=retry_backoff,
+            max_concurrency=max_concurrency,
+            cache=cache,
         )
 
     @overload
@@ -544,11 +645,14 @@ class Attr:
             "Value[Tuple[int, ...]]",
             "Value[Tuple[float, ...]]",
             "Value[Tuple[date, ...]]",
+            ResultSet,
         ],
     ) -> "AttributeQuery":
-        """Attribute is contained in the list of values"""
+        """Attribute is contained in the list of values (or the identifiers of a `ResultSet`)"""
         if isinstance(value, Value):
             value = value.value
+        if isinstance(value, ResultSet):
+            value = value.ids
         return AttributeQuery(self.attribute, operator="in", value=value)
 
     # Need ignore[override] because typeshed restricts __eq__ return value
@@ -1927,8 +2031,13 @@ class Session(Iterable[str]):
         scoring_strategy: Optional[ScoringStrategy] = None,
         max_retries: int = None,
         retry_backoff: int = None,
+        max_concurrency: int = None,
+        cache: Optional[SearchCache] = None,
+        rate_limiter: Optional[Callable[[], None]] = None,
     ):
         self.query_id = Session.make_uuid()
+        if config.SEARCH_API_OPTIMIZE_QUERIES:
+            query = query.optimize()
         self.query = query.assign_ids()
         self.return_type = return_type
         self.start = 0
@@ -1952,12 +2061,27 @@ class Session(Iterable[str]):
         self._request_count = 0
         self._request_limit_time_interval = 10  # request rate limits are applied over 10s window
         self._requests_per_window_limit = config.SEARCH_API_REQUESTS_PER_SECOND * self._request_limit_time_interval
+        self._rate_limit_lock = threading.Lock()  # pages may be requested from several threads
+        # Called before each request to wait for the rate limit (another session's, to share its limit)
+        self._wait_for_rate_limit = rate_limiter if rate_limiter is not None else self._rate_limiter
+        self._max_concurrency = max_concurrency if max_concurrency else config.SEARCH_API_MAX_CONCURRENT_REQUESTS
+        self._cache = cache
+        self._canonical_query: Optional[Dict] = None  # query used to identify cached responses
+
+        # Queries with oversized "in" terminals are split into sub-queries, whose results are combined client-side
+        self._combine_operator = "or"
+        self._sub_queries: Optional[List[SearchQuery]] = self._split_query()
 
         # request_option results
         self.facets: Optional[Dict] = None
         self.count: Optional[int] = None
         self.explain_metadata: Optional[Dict] = None
 
+        # First page of results, kept to avoid requesting it again when iterating (see `refresh()`)
+        self._first_page: Optional[Dict] = None
+        self._first_page_fetched = False
+        self._refreshing = False  # whether the next first page must be requested rather than read from the cache
+
     @staticmethod
     def make_uuid() -> str:
         "Create a new UUID to identify a query"
@@ -2035,53 +2159,95 @@ class Session(Iterable[str]):
         )
         return query_dict
 
-    def _single_query(self, start: int = 0) -> Optional[Dict]:
-        """Fires a single query, with retry behavior and rate limiting.
+    def _single_query(self, start: int = 0, bypass_cache: bool = False) -> Optional[Dict]:
+        """Fires a single query, with retry behavior and rate limiting (or gets its response from the cache, if any).
+        If `bypass_cache` is True, the query is sent even if its response is cached (and the cached response is replaced).
         """
-        retry_backoff = self._retry_backoff
-        for attempt in range(1, self._max_retries + 1):
-            try:
-                # First check if request rate-limit reached
-                self._rate_limiter()
-                #
-                # Now perform the actual request
-                params = self._make_params(start)
-                logger.debug("Querying %s for results %s-%s", self.url, start, start + self.rows - 1)
-                response = httpx.post(self.url, json=params, timeout=config.API_TIMEOUT, headers={"Content-Type": "application/json", "User-Agent": const.USER_AGENT})
-                response.raise_for_status()
-                if response.status_code == httpx.codes.OK:
-                    return response.json()
-                elif response.status_code == httpx.codes.NO_CONTENT:
-                    return None
-                else:
-                    raise httpx.HTTPStatusError(
-                        f"Unexpected status: {response.status_code}",
-                        request=response.request,
-                        response=response
-                    )
-            except (httpx.RequestError, httpx.HTTPStatusError) as e:
-                if attempt == self._max_retries:
-                    logger.error(
-                        "Final retry attempt %r failed with exception:\n    %r\n"
-                        "Check query and parameters. If issue persists, try reducing 'config.SEARCH_API_REQUESTS_PER_SECOND'.",
-                        attempt,
-                        e
-                    )
-                    raise
-                logger.warning("Attempt %r failed: %r. Retrying in %r seconds...", attempt, e, retry_backoff)
-                time.sleep(retry_backoff)
-                retry_backoff *= 2  # exponential backoff
+        cached = self._get_cached(start) if not bypass_cache else None
+        if cached is not None:
+            return cached
+
+        def send() -> Optional[Dict]:
+            # First check if request rate-limit reached
+            self._wait_for_rate_limit()
+            #
+            # Now perform the actual request
+            params = self._make_params(start)
+            logger.debug("Querying %s for results %s-%s", self.url, start, start + self.rows - 1)
+            with INSTRUMENTATION.request("search", self.url) as trace:
+                response = trace.response = transport.send_request(
+                    "POST", self.url, json=params, timeout=config.API_TIMEOUT, headers={"Content-Type": "application/json", "User-Agent": const.USER_AGENT}
+                )
+            return self._parse_response(response)
+
+        response = RetryPolicy(self._max_retries, self._retry_backoff, api="search").call(
+            send,
+            self.url,
+            hint="Check query and parameters. If issue persists, try reducing 'config.SEARCH_API_REQUESTS_PER_SECOND'.",
+        )
+        self._cache_response(start, response)
+        return response
+
+    def _cache_params(self, start: int) -> Dict:
+        """Get the request parameters identifying a response in the cache, with the query in canonical form
+        so that equivalent queries share cached responses"""
+        from rcsbapi.search.search_optimizer import canonical_dict  # pylint: disable=import-outside-toplevel
+        if self._canonical_query is None:
+            self._canonical_query = canonical_dict(self.query.optimize())
+        params = self._make_params(start)
+        params["query"] = self._canonical_query
+        return params
+
+    def _get_cached(self, start: int) -> Optional[Dict]:
+        if self._cache is None:
+            return None
+        response = self._cache.get(self._cache_params(start))
+        if response is not None:
+            logger.debug("Using cached response for results %s-%s", start, start + self.rows - 1)
+        return response
+
+    def _cache_response(self, start: int, response: Optional[Dict]) -> None:
+        if self._cache is not None and response is not None:
+            self._cache.put(self._cache_params(start), response)
+
+    @staticmethod
+    def _parse_response(response: httpx.Response) -> Optional[Dict]:
+        """Get the JSON content of a response (None if there are no results), raising an error for unexpected statuses"""
+        response.raise_for_status()
+        if response.status_code == httpx.codes.OK:
+            return response.json()
+        elif response.status_code == httpx.codes.NO_CONTENT:
+            return None
+        else:
+            raise httpx.HTTPStatusError(
+                f"Unexpected status: {response.status_code}",
+                request=response.request,
+                response=response
+            )
+
+    def _set_request_option_results(self, response: Dict) -> None:
+        """Set the count, explain metadata and facets of the session from the response for the first page"""
+        if "total_count" in response:
+            self.count = response["total_count"]
+        if "explain_metadata" in response:
+            self.explain_metadata = response["explain_metadata"]
+        if "facets" in response:
+            self.facets = response["facets"]
 
     def _rate_limiter(self):
         """Check if request rate-limit has been reached, and if so, sleep until it can be reset.
         """
+        with self._rate_limit_lock:
+            self._check_rate_limit()
+
+    def _check_rate_limit(self):
         now = time.monotonic()
         elapsed = now - self._last_request_time
         if elapsed >= self._request_limit_time_interval:
             self._last_request_time = now
             self._request_count = 0
         if self._request_count >= self._requests_per_window_limit:
-            sleep_time = self._requests_per_window_limit - elapsed
+            sleep_time = self._request_limit_time_interval - elapsed
             if sleep_time > 0:
                 logger.info(
                     "Request rate limit reached (%r requests/ %r seconds). Sleeping for %.1f seconds...",
@@ -2089,76 +2255,223 @@ class Session(Iterable[str]):
                     self._request_limit_time_interval,
                     sleep_time
                 )
+                INSTRUMENTATION.emit(THROTTLE, "search", duration=sleep_time)
                 time.sleep(sleep_time)
             self._last_request_time = time.monotonic()
             self._request_count = 0
         self._request_count += 1
 
+    def _get_first_page(self, refresh: bool = False) -> Optional[Dict]:
+        """Get the response for the first page of results, requesting it only once unless `refresh` is True
+        (for a split query, the combined response with all results)"""
+        if refresh:
+            self.refresh()
+        if not self._first_page_fetched:
+            if self._sub_queries is not None:
+                self._first_page = self._combine_sub_queries(refresh=self._refreshing)
+            else:
+                self._first_page = self._single_query(start=0, bypass_cache=self._refreshing)
+            self._first_page_fetched = True
+            self._refreshing = False
+        return self._first_page
+
+    def _split_query(self) -> Optional[List[SearchQuery]]:
+        """Split the query into sub-queries if it has an `in` terminal with more than `config.SEARCH_API_MAX_IN_VALUES` values"""
+        from rcsbapi.search.search_optimizer import split_in_terminal  # pylint: disable=import-outside-toplevel
+        if not config.SEARCH_API_MAX_IN_VALUES:
+            return None
+        split = split_in_terminal(self.query, config.SEARCH_API_MAX_IN_VALUES)
+        if split is None:
+            return None
+        if self._facets or self._group_by:
+            raise ValueError(
+                f"Facets and grouping can't be used with more than {config.SEARCH_API_MAX_IN_VALUES} values in an 'in' query "
+                "(the results of split queries are combined client-side). Reduce the number of values or increase 'config.SEARCH_API_MAX_IN_VALUES'."
+            )
+        sorts = self._sort if isinstance(self._sort, list) else [self._sort] if self._sort else []
+        if any(sort.sort_by != "score" or sort.filter is not None for sort in sorts):
+            raise ValueError(
+                f"Results can only be sorted by score with more than {config.SEARCH_API_MAX_IN_VALUES} values in an 'in' query "
+                "(the results of split queries are combined client-side). Reduce the number of values or increase 'config.SEARCH_API_MAX_IN_VALUES'."
+            )
+        if self._return_explain_metadata:
+            logger.warning("WARNING: Explain metadata isn't returned for queries split into sub-queries")
+        self._combine_operator, sub_queries = split
+        logger.info("Splitting query into %d sub-queries of up to %d 'in' values", len(sub_queries), config.SEARCH_API_MAX_IN_VALUES)
+        return [sub_query.assign_ids() for sub_query in sub_queries]
+
+    def _combine_sub_queries(self, refresh: bool = False) -> Dict:
+        """Evaluate the sub-queries concurrently (within the rate limit of this session) and combine their results
+        (bypassing the cache for their first pages if `refresh` is True)
+
+        Returns:
+            Dict: response with the total count and all combined results, ordered by score
+        """
+        assert self._sub_queries is not None  # for mypy
+        # Scores are needed to order the combined results
+        verbosity: VerbosityLevel = "minimal" if self._results_verbosity == "compact" else self._results_verbosity
+        sessions = []
+        for sub_query in self._sub_queries:
+            session = Session(
+                sub_query,
+                return_type=self.return_type,
+                rows=self.rows,
+                return_content_type=self._return_content_type,
+                results_verbosity=verbosity,
+                sort=self._sort,
+                scoring_strategy=self._scoring_strategy,
+                max_retries=self._max_retries,
+                retry_backoff=self._retry_backoff,
+                max_concurrency=self._max_concurrency,
+                cache=self._cache,
+                rate_limiter=self._wait_for_rate_limit,  # share this session's rate limit
+            )
+            if refresh:
+                session.refresh()
+            sessions.append(session)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(sessions), max(self._max_concurrency, 4)), thread_name_prefix="rcsbapi-search") as executor:
+            result_lists = list(executor.map(list, sessions))
+
+        combined: Dict[str, Dict] = {}
+        matches: Dict[str, int] = collections.defaultdict(int)
+        for results in result_lists:
+            for result in results:
+                identifier = result["identifier"]
+                matches[identifier] += 1
+                if identifier not in combined or result.get("score", 0) > combined[identifier].get("score", 0):
+                    combined[identifier] = result
+        if self._combine_operator == "and":
+            combined = {identifier: result for identifier, result in combined.items() if matches[identifier] == len(result_lists)}
+
+        sorts = self._sort if isinstance(self._sort, list) else [self._sort] if self._sort else []
+        ascending = bool(sorts) and sorts[0].direction == "asc"
+        result_set: List[Any] = sorted(combined.values(), key=lambda result: result.get("score", 0), reverse=not ascending)
+        if self._results_verbosity == "compact":
+            result_set = [result["identifier"] for result in result_set]
+        return {"result_type": self.return_type, "total_count": len(result_set), "result_set": result_set}
+
+    def refresh(self) -> None:
+        """Discard the stored first page of results, so that the next evaluation requests it again
+        (e.g., to get up-to-date results from a long-lived session). The request is sent even if a cached
+        response exists, and the new response replaces it in the cache."""
+        self._first_page = None
+        self._first_page_fetched = False
+        self._refreshing = True
+
     def __iter__(self) -> Union[Iterator[str], Iterator]:
         "Generator for all results as a list of identifiers"
         start = 0
-        response = self._single_query(start=start)
+        response = self._get_first_page()
         if response is None:
             return  # be explicit for mypy
-        if "result_set" in response:
-            result_set = response["result_set"]
-        elif "group_set" in response:
-            result_set = response["group_set"]
-        else:
-            result_set = []
+        result_set = self._page_results(response)
         start += self.rows
-        logger.debug("Got %s ids", len(result_set))
 
         if len(result_set) == 0:
             return
         yield from result_set
+        if self._sub_queries is not None:
+            return  # all results were combined in the first response
 
         total = response["total_count"]
 
-        while start < total:
+        for response in self._iter_pages(range(start, total, self.rows)):
             # If no grouping is applied, check that result_set = rows
             # If grouping is applied, result set could be lower than rows
             if not self._group_by:
                 assert len(result_set) == self.rows
-            response = self._single_query(start=start)
             assert isinstance(response, dict)
-            if "result_set" in response:
-                result_set = response["result_set"]
-            elif "group_set" in response:
-                result_set = response["group_set"]
-            else:
-                result_set = []
-            logger.debug("Got %s ids", len(result_set))
-            start += self.rows
+            result_set = self._page_results(response)
             yield from result_set
 
-    def to_dict(self) -> Dict:
-        """return full json response"""
-        response = self._single_query()
+    @staticmethod
+    def _page_results(response: Dict) -> List:
+        """Get the results (or groups) in the response for a page"""
+        if "result_set" in response:
+            result_set = response["result_set"]
+        elif "group_set" in response:
+            result_set = response["group_set"]
+        else:
+            result_set = []
+        logger.debug("Got %s ids", len(result_set))
+        return result_set
+
+    def _iter_pages(self, starts: Sequence[int]) -> Iterator[Optional[Dict]]:
+        """Request the pages of results starting at the given offsets, and yield the responses in order.
+
+        If `max_concurrency` is above 1, up to that many pages are requested concurrently (within the rate limit of
+        the session) ahead of the consumer, so that waiting for the network overlaps with processing earlier pages.
+        """
+        if self._max_concurrency <= 1 or len(starts) <= 1:
+            for start in starts:
+                yield self._single_query(start=start)
+            return
+        remaining_starts = iter(starts)
+        pending: Deque[concurrent.futures.Future] = collections.deque()
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=min(self._max_concurrency, len(starts)), thread_name_prefix="rcsbapi-search")
+        try:
+            for start in itertools.islice(remaining_starts, self._max_concurrency):
+                pending.append(executor.submit(self._single_query, start))
+            while pending:
+                response = pending.popleft().result()
+                for start in itertools.islice(remaining_starts, 1):
+                    pending.append(executor.submit(self._single_query, start))
+                yield response
+        finally:
+            # Stop requesting pages if the consumer stopped early or a request failed
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def to_dict(self, refresh: bool = False) -> Dict:
+        """return full json response (of the first page of results)
+
+        The response is a copy, so changing it doesn't affect later iteration over the session.
+
+        Args:
+            refresh (bool, optional): request the first page again instead of reusing the stored response. Defaults to False.
+        """
+        response = self._get_first_page(refresh)
         if not isinstance(response, Dict):
             return {}
-        return response
+        return copy.deepcopy(response)
 
-    def iquery(self, limit: Optional[int] = None) -> List[str]:
+    def iquery(self, limit: Optional[int] = None, refresh: bool = False) -> List[str]:
         """Evaluate the query and display an interactive progress bar.
+
+        Args:
+            limit (int, optional): maximum number of results to return. Defaults to None (all results).
+            refresh (bool, optional): request the first page again instead of reusing the stored response. Defaults to False.
         """
-        response = self._single_query(start=0)
+        response = self._get_first_page(refresh)
         if response is None:
             return []
         total = response["total_count"]
-        result_set = response["result_set"] if response else []
-        if limit is not None and len(result_set) >= limit:
+        result_set = list(response["result_set"]) if response else []
+        if (limit is not None and len(result_set) >= limit) or self._sub_queries is not None:
             return result_set[:limit]
 
         pages = math.ceil((total if limit is None else min(total, limit)) / self.rows)
 
-        for page in trange(1, pages, initial=1, total=pages):
-            response = self._single_query(page * self.rows)
+        for response in tqdm(self._iter_pages(range(self.rows, pages * self.rows, self.rows)), initial=1, total=pages):
             next_results = response["result_set"] if response else []
             result_set.extend(next_results)
 
         return result_set[:limit]
 
+    def result_set(self) -> ResultSet:
+        """Evaluate the query and get all of its results as a `ResultSet`, to combine with the results of other
+        queries locally (e.g., `session_a.result_set() & session_b.result_set()`).
+
+        Results have scores unless `results_verbosity` is "compact".
+
+        Raises:
+            ValueError: if results are grouped (`group_by`)
+        """
+        if self._group_by:
+            raise ValueError("Grouped results can't be used as a result set")
+        return ResultSet(self, return_type=self.return_type)
+
     def get_editor_link(self) -> str:
         """URL to edit this query in the RCSB PDB query editor"""
         data = json.dumps(self._make_params(), separators=(",", ":"))
@@ -2178,3 +2491,213 @@ class Session(Iterable[str]):
             _ = params["request_options"].pop("results_verbosity")
         data = json.dumps(params, separators=(",", ":"))
         return f"https://www.rcsb.org/search?request={urllib.parse.quote(data)}"
+
+
+class AsyncSession(Session):
+    """A single query session evaluated in the caller's running event loop (see `SearchQuery.aexec()`).
+
+    Iterate over all results with `async for`. After the first page, the remaining pages are requested with a
+    pooled `httpx.AsyncClient`, up to `max_concurrency` at a time, and results are returned in order.
+    Unless a client is given, the session opens one client on first use and reuses it for every request, until
+    it is closed with `aclose()` (or by using the session as an async context manager).
+
+    Example:
+        query = AttributeQuery("exptl.method", operator="exact_match", value="electron microscopy")
+        async with await query.aexec(rows=1000, max_concurrency=4) as session:
+            print(session.count)
+            async for rcsb_id in session:
+                ...
+    """
+
+    def __init__(  # pylint: disable=dangerous-default-value
+        self,
+        query: SearchQuery,
+        *args: Any,
+        client: Optional[httpx.AsyncClient] = None,
+        rate_limiter: Optional[AsyncRateLimiter] = None,
+        **kwargs: Any,
+    ):
+        """Create an async session.
+
+        Args:
+            query (SearchQuery): query to evaluate
+            client (httpx.AsyncClient, optional): client to send requests with. The client is not closed afterwards.
+                Defaults to a client owned by the session (see `aclose()`).
+            rate_limiter (AsyncRateLimiter, optional): rate limiter to count requests against. Defaults to a limiter
+                of `config.SEARCH_API_REQUESTS_PER_SECOND` for this session. (Queries split into sub-queries are
+                evaluated synchronously, within this session's own limit.)
+            All other arguments are the same as for `Session`.
+        """
+        super().__init__(query, *args, **kwargs)
+        self._client = client
+        self._own_client: Optional[httpx.AsyncClient] = None
+        self._own_client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closing: Set["asyncio.Task[None]"] = set()
+        self._async_rate_limiter = rate_limiter if rate_limiter is not None else AsyncRateLimiter(config.SEARCH_API_REQUESTS_PER_SECOND, api="search")
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the client given to the session, or else the session's own client (opened on first use)"""
+        if self._client is not None:
+            return self._client
+        loop = asyncio.get_running_loop()
+        if self._own_client is None or self._own_client.is_closed or self._own_client_loop is not loop:
+            # Connections can't be shared between event loops, so a session used in another loop gets a new client
+            if self._own_client is not None and not self._own_client.is_closed:
+                task = asyncio.ensure_future(self._close_client(self._own_client, self._own_client_loop))
+                self._closing.add(task)
+                task.add_done_callback(self._closing.discard)
+            self._own_client = transport.async_client()
+            self._own_client_loop = loop
+        return self._own_client
+
+    async def aclose(self) -> None:
+        """Close the session's own client (a client given to the session is left open)"""
+        if self._own_client is not None:
+            client, self._own_client = self._own_client, None
+            await self._close_client(client, self._own_client_loop)
+        loop = asyncio.get_running_loop()
+        closing = [task for task in self._closing if task.get_loop() is loop]
+        if closing:
+            await asyncio.gather(*closing)
+
+    @staticmethod
+    async def _close_client(client: httpx.AsyncClient, client_loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        """Close a client in the event loop it was opened in if that loop is still running in another thread,
+        or else in the current loop"""
+        if client_loop is not None and client_loop is not asyncio.get_running_loop() and client_loop.is_running():
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(client.aclose(), client_loop))
+            return
+        try:
+            await client.aclose()
+        except RuntimeError as e:
+            # e.g., its connections belonged to an event loop that is already closed
+            logger.debug("Could not close Search API client: %r", e)
+
+    async def __aenter__(self) -> "AsyncSession":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def _asingle_query(self, client: httpx.AsyncClient, start: int = 0, bypass_cache: bool = False) -> Optional[Dict]:
+        """Asynchronously fire a single query, with retry behavior and rate limiting (or get its response from the cache, if any).
+        If `bypass_cache` is True, the query is sent even if its response is cached (and the cached response is replaced)."""
+        if self._cache is not None and not bypass_cache:
+            # The cache may read from and write to disk, so keep it off the event loop
+            cached = await asyncio.to_thread(self._get_cached, start)
+            if cached is not None:
+                return cached
+
+        async def send() -> Optional[Dict]:
+            await self._async_rate_limiter.acquire()
+            params = self._make_params(start)
+            logger.debug("Querying %s for results %s-%s", self.url, start, start + self.rows - 1)
+            with INSTRUMENTATION.request("search", self.url) as trace:
+                response = trace.response = await client.post(
+                    self.url, json=params, headers={"Content-Type": "application/json", "User-Agent": const.USER_AGENT}
+                )
+            return self._parse_response(response)
+
+        response = await RetryPolicy(self._max_retries, self._retry_backoff, api="search").acall(
+            send,
+            self.url,
+            hint="Check query and parameters. If issue persists, try reducing 'config.SEARCH_API_REQUESTS_PER_SECOND'.",
+        )
+        if self._cache is not None:
+            await asyncio.to_thread(self._cache_response, start, response)
+        return response
+
+    async def _aget_first_page(self, client: httpx.AsyncClient, refresh: bool = False) -> Optional[Dict]:
+        if self._sub_queries is not None:
+            # Sub-queries are evaluated concurrently in threads
+            return await asyncio.to_thread(self._get_first_page, refresh)
+        if refresh:
+            self.refresh()
+        if not self._first_page_fetched:
+            self._first_page = await self._asingle_query(client, start=0, bypass_cache=self._refreshing)
+            self._first_page_fetched = True
+            self._refreshing = False
+        return self._first_page
+
+    async def ato_dict(self, refresh: bool = False) -> Dict:
+        """return full json response (of the first page of results), as a copy like `Session.to_dict()`
+
+        Args:
+            refresh (bool, optional): request the first page again instead of reusing the stored response. Defaults to False.
+        """
+        response = await self._aget_first_page(self._get_client(), refresh)
+        if not isinstance(response, Dict):
+            return {}
+        return copy.deepcopy(response)
+
+    async def acount(self, refresh: bool = False) -> int:
+        """Get the total number of results (also set as `count`, along with `facets` and `explain_metadata`)
+
+        Args:
+            refresh (bool, optional): request the first page again instead of reusing the stored response. Defaults to False.
+        """
+        response = await self._aget_first_page(self._get_client(), refresh) or {}
+        self._set_request_option_results(response)
+        return response.get("total_count", 0)
+
+    async def aresult_set(self) -> ResultSet:
+        """Evaluate the query and get all of its results as a `ResultSet` (see `Session.result_set()`)"""
+        if self._group_by:
+            raise ValueError("Grouped results can't be used as a result set")
+        return ResultSet([result async for result in self], return_type=self.return_type)
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        """Asynchronous generator for all results as a list of identifiers
+
+        If iteration may stop early (e.g., with `break`), close the generator to cancel pending page requests
+        right away, instead of when it is garbage-collected:
+
+            async with contextlib.aclosing(aiter(session)) as results:  # Python 3.10+
+                async for rcsb_id in results:
+                    ...
+        """
+        client = self._get_client()
+        pages: Optional[AsyncGenerator[Optional[Dict], None]] = None
+        try:
+            response = await self._aget_first_page(client)
+            if response is None:
+                return
+            result_set = self._page_results(response)
+            if len(result_set) == 0:
+                return
+            for result in result_set:
+                yield result
+            if self._sub_queries is not None:
+                return  # all results were combined in the first response
+
+            total = response["total_count"]
+            pages = self._aiter_pages(client, range(self.rows, total, self.rows))
+            async for page in pages:
+                if not self._group_by:
+                    assert len(result_set) == self.rows
+                assert isinstance(page, dict)
+                result_set = self._page_results(page)
+                for result in result_set:
+                    yield result
+        finally:
+            if pages is not None:
+                await pages.aclose()  # cancels requests for pages that won't be used
+
+    async def _aiter_pages(self, client: httpx.AsyncClient, starts: Sequence[int]) -> AsyncGenerator[Optional[Dict], None]:
+        """Request the pages of results starting at the given offsets, and yield the responses in order
+        (up to `max_concurrency` pages are requested ahead of the consumer, as in `Session._iter_pages()`)."""
+        remaining_starts = iter(starts)
+        pending: Deque[asyncio.Task] = collections.deque()
+        try:
+            for start in itertools.islice(remaining_starts, self._max_concurrency):
+                pending.append(asyncio.ensure_future(self._asingle_query(client, start)))
+            while pending:
+                response = await pending.popleft()
+                for start in itertools.islice(remaining_starts, 1):
+                    pending.append(asyncio.ensure_future(self._asingle_query(client, start)))
+                yield response
+        finally:
+            # Stop requesting pages if the consumer stopped early or a request failed
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
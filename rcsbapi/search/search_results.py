@@ -0,0 +1,235 @@
+"""Materialized Search API result sets, combined client-side with set operators.
+
+A `ResultSet` holds the identifiers of the results of a query (see `Session.result_set()`) as a sorted array of
+unique identifiers, with their scores if the results were requested with scores. Result sets of queries that were
+already evaluated can be combined locally with the operators that `SearchQuery` overloads, without sending a
+new query to the Search API:
+
+- `a & b`: results in both sets
+- `a | b`: results in either set
+- `a - b`: results in `a` but not in `b`
+- `a ^ b`: results in exactly one of the sets
+
+Operations keep the identifiers sorted, merging the sorted arrays rather than sorting them from scratch. When both
+operands have scores, a result in both sets gets the highest of its scores.
+
+Result sets can be used wherever a list of identifiers is expected, e.g., as the values of an `in` query
+(`attr.in_(result_set)`, or `result_set.to_query()`) or as the `input_ids` of a `DataQuery`.
+"""
+
+import bisect
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union, overload
+
+# Attribute identifying each type of result, to search for a result set with an "in" query
+RETURN_TYPE_ID_ATTRIBUTES = {
+    "entry": "rcsb_entry_container_identifiers.entry_id",
+    "assembly": "rcsb_assembly_container_identifiers.rcsb_id",
+    "polymer_entity": "rcsb_polymer_entity_container_identifiers.rcsb_id",
+    "non_polymer_entity": "rcsb_nonpolymer_entity_container_identifiers.rcsb_id",
+    "polymer_instance": "rcsb_polymer_entity_instance_container_identifiers.rcsb_id",
+    "mol_definition": "rcsb_chem_comp_container_identifiers.rcsb_id",
+}
+
+
+class ResultSet(Sequence[str]):
+    """Sorted set of result identifiers, with optional scores.
+
+    Example:
+        from rcsbapi.search import AttributeQuery
+
+        cryo_em = AttributeQuery("exptl.method", operator="exact_match", value="electron microscopy")().result_set()
+        human = AttributeQuery("rcsb_entity_source_organism.scientific_name", operator="exact_match", value="Homo sapiens")().result_set()
+        both = cryo_em & human  # computed locally
+    """
+
+    def __init__(
+        self,
+        results: Iterable[Union[str, Dict[str, Any]]] = (),
+        scores: Optional[Iterable[float]] = None,
+        return_type: Optional[str] = None,
+    ):
+        """Create a result set.
+
+        Args:
+            results (Iterable[Union[str, Dict[str, Any]]], optional): result identifiers, or results with an "identifier"
+                and a "score" (as returned with a `results_verbosity` other than "compact"). Defaults to no results.
+            scores (Iterable[float], optional): score of each identifier in `results`, if they are identifiers. Defaults to None.
+            return_type (str, optional): type of the results (e.g., "entry"), checked when combining result sets. Defaults to None.
+
+        Raises:
+            ValueError: if both results with scores and `scores` are given, or if there is not one score per result
+        """
+        results = list(results)
+        if results and isinstance(results[0], dict):
+            if scores is not None:
+                raise ValueError("scores can't be given for results that already have scores")
+            identifiers = [result["identifier"] for result in results]  # type: ignore[index]
+            scores = [result["score"] for result in results] if all("score" in result for result in results) else None  # type: ignore[operator, index]
+        else:
+            identifiers = results  # type: ignore[assignment]
+        self.return_type = return_type
+
+        if scores is None:
+            self._ids: List[str] = sorted(set(identifiers))
+            self._scores: Optional[List[float]] = None
+            return
+        scores = list(scores)
+        if len(scores) != len(identifiers):
+            raise ValueError(f"Got {len(scores)} scores for {len(identifiers)} results")
+        best: Dict[str, float] = {}
+        for identifier, score in zip(identifiers, scores):
+            if identifier not in best or score > best[identifier]:
+                best[identifier] = score
+        self._ids = sorted(best)
+        self._scores = [best[identifier] for identifier in self._ids]
+
+    @classmethod
+    def _from_sorted(cls, ids: List[str], scores: Optional[List[float]], return_type: Optional[str]) -> "ResultSet":
+        """Create a result set from identifiers that are already sorted and unique"""
+        result_set = cls.__new__(cls)
+        result_set._ids = ids
+        result_set._scores = scores
+        result_set.return_type = return_type
+        return result_set
+
+    @property
+    def ids(self) -> List[str]:
+        """Sorted list of the result identifiers"""
+        return list(self._ids)
+
+    @property
+    def scores(self) -> Optional[List[float]]:
+        """Score of each identifier (in the order of `ids`), or None if the results have no scores"""
+        return None if self._scores is None else list(self._scores)
+
+    def score(self, identifier: str) -> Optional[float]:
+        """Get the score of a result, or None if the results have no scores
+
+        Raises:
+            KeyError: if the identifier isn't in the result set
+        """
+        index = self._index(identifier)
+        if index is None:
+            raise KeyError(identifier)
+        return None if self._scores is None else self._scores[index]
+
+    def ranked(self) -> List[str]:
+        """Get the identifiers from highest to lowest score (sorted by identifier if the results have no scores)"""
+        if self._scores is None:
+            return self.ids
+        scores = self._scores
+        return [self._ids[i] for i in sorted(range(len(self._ids)), key=lambda i: scores[i], reverse=True)]
+
+    def to_query(self, attribute: Optional[str] = None, service: Optional[str] = None) -> Any:
+        """Get a query for the results in this set, to combine with other queries on the server.
+
+        Args:
+            attribute (str, optional): attribute matching the identifiers. Defaults to the identifier attribute of the return type.
+            service (str, optional): search service of the attribute (e.g., "text_chem"). Defaults to None (looked up in the schema).
+
+        Raises:
+            ValueError: if the result set is empty, or no attribute is given and the result set has no known return type
+
+        Returns:
+            AttributeQuery: query with an "in" operator and the identifiers as values
+        """
+        from rcsbapi.search.search_query import AttributeQuery  # pylint: disable=import-outside-toplevel
+
+        if not self._ids:
+            raise ValueError("Can't construct a query from an empty result set")
+        if attribute is None:
+            if self.return_type not in RETURN_TYPE_ID_ATTRIBUTES:
+                raise ValueError(f"Unknown return type {self.return_type!r}: specify the attribute matching the identifiers")
+            attribute = RETURN_TYPE_ID_ATTRIBUTES[self.return_type]  # type: ignore[index]
+        return AttributeQuery(attribute, operator="in", value=self.ids, service=service)
+
+    def _index(self, identifier: Any) -> Optional[int]:
+        index = bisect.bisect_left(self._ids, identifier)
+        if index < len(self._ids) and self._ids[index] == identifier:
+            return index
+        return None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._ids)
+
+    def __contains__(self, identifier: object) -> bool:
+        return isinstance(identifier, str) and self._index(identifier) is not None
+
+    @overload
+    def __getitem__(self, index: int) -> str:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "ResultSet":
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, "ResultSet"]:
+        if isinstance(index, slice):
+            if index.step is not None and index.step < 0:
+                raise ValueError("Result sets can't be reversed")
+            return ResultSet._from_sorted(self._ids[index], None if self._scores is None else self._scores[index], self.return_type)
+        return self._ids[index]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ResultSet):
+            return NotImplemented
+        return self._ids == other._ids and self._scores == other._scores and self.return_type == other.return_type
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        preview = ", ".join(repr(identifier) for identifier in self._ids[:5]) + (", ..." if len(self._ids) > 5 else "")
+        return f"ResultSet([{preview}], size={len(self._ids)}, return_type={self.return_type!r}, scored={self._scores is not None})"
+
+    def _combine(self, other: "ResultSet", keep_left: bool, keep_both: bool, keep_right: bool) -> "ResultSet":
+        """Combine two result sets, keeping the identifiers only in `self`, in both sets and/or only in `other`"""
+        if self.return_type is not None and other.return_type is not None and self.return_type != other.return_type:
+            raise ValueError(f"Can't combine results of return type {self.return_type!r} with results of return type {other.return_type!r}")
+        return_type = self.return_type if self.return_type is not None else other.return_type
+        # Hash lookups and sorting (which merges two sorted runs in linear time) are faster than a Python merge loop
+        right = set(other._ids)
+        if keep_left and keep_both:
+            left_ids = list(self._ids)
+        elif keep_left or keep_both:
+            left_ids = [identifier for identifier in self._ids if (identifier in right) == keep_both]
+        else:
+            left_ids = []
+        right_ids: List[str] = []
+        if keep_right:
+            left = set(self._ids)
+            right_ids = [identifier for identifier in other._ids if identifier not in left]
+        ids = left_ids + right_ids
+        if left_ids and right_ids:
+            ids.sort()
+
+        if self._scores is None or (other._scores is None and (keep_both or keep_right)):
+            return ResultSet._from_sorted(ids, None, return_type)
+        scores = dict(zip(self._ids, self._scores))
+        if other._scores is not None:
+            for identifier, score in zip(other._ids, other._scores):
+                if identifier not in scores or score > scores[identifier]:
+                    scores[identifier] = score
+        return ResultSet._from_sorted(ids, [scores[identifier] for identifier in ids], return_type)
+
+    def __and__(self, other: "ResultSet") -> "ResultSet":
+        if not isinstance(other, ResultSet):
+            return NotImplemented
+        return self._combine(other, keep_left=False, keep_both=True, keep_right=False)
+
+    def __or__(self, other: "ResultSet") -> "ResultSet":
+        if not isinstance(other, ResultSet):
+            return NotImplemented
+        return self._combine(other, keep_left=True, keep_both=True, keep_right=True)
+
+    def __sub__(self, other: "ResultSet") -> "ResultSet":
+        if not isinstance(other, ResultSet):
+            return NotImplemented
+        return self._combine(other, keep_left=True, keep_both=False, keep_right=False)
+
+    def __xor__(self, other: "ResultSet") -> "ResultSet":
+        if not isinstance(other, ResultSet):
+            return NotImplemented
+        return self._combine(other, keep_left=True, keep_both=False, keep_right=True)
@@ -1,4 +1,3 @@
-import time
 import logging
 from typing import Dict, List, Any, Optional, Union
 from types import MappingProxyType
@@ -10,6 +9,9 @@ import httpx
 
 from rcsbapi.const import const
 from rcsbapi.config import config
+from rcsbapi.retry import RetryPolicy
+from rcsbapi import transport
+from rcsbapi.instrumentation import INSTRUMENTATION
 from rcsbapi.sequence import SEQ_SCHEMA
 from rcsbapi.graphql_schema import SchemaEnum
 
@@ -114,40 +116,35 @@ class SeqQuery(ABC):
     def _submit_request(self, max_retries, retry_backoff):
         """Submit a single request, with retry behavior.
         """
-        for attempt in range(1, max_retries + 1):
-            try:
-                response = httpx.post(
+        def send():
+            with INSTRUMENTATION.request("sequence", const.SEQUENCE_API_GRAPHQL_ENDPOINT) as trace:
+                response = trace.response = transport.send_request(
+                    "POST",
                     url=const.SEQUENCE_API_GRAPHQL_ENDPOINT,
                     json=dict(self._query),
                     timeout=config.API_TIMEOUT,
                     headers={"Content-Type": "application/json", "User-Agent": const.USER_AGENT}
                 )
-                response.raise_for_status()  # Raise an error for bad responses
-                response_json = response.json()
-                self._parse_gql_error(response_json)
-                #
-                if response.status_code == httpx.codes.OK:
-                    return response_json
-                elif response.status_code == httpx.codes.NO_CONTENT:
-                    return None
-                else:
-                    raise httpx.HTTPStatusError(
-                        f"Unexpected status: {response.status_code}",
-                        request=response.request,
-                        response=response
-                    )
-            except (httpx.RequestError, httpx.HTTPStatusError) as e:
-                if attempt == max_retries:
-                    logger.error(
-                        "Final retry attempt %r failed with exception:\n    %r\n"
-                        "Check query and parameters. If issue persists, try limiting your query using the 'range' option, or increasing 'config.API_TIMEOUT'.",
-                        attempt,
-                        e
-                    )
-                    raise
-                logger.warning("Attempt %r failed: %r. Retrying in %r seconds...", attempt, e, retry_backoff)
-                time.sleep(retry_backoff)
-                retry_backoff *= 2  # exponential backoff
+            response.raise_for_status()  # Raise an error for bad responses
+            response_json = response.json()
+            self._parse_gql_error(response_json)
+            #
+            if response.status_code == httpx.codes.OK:
+                return response_json
+            elif response.status_code == httpx.codes.NO_CONTENT:
+                return None
+            else:
+                raise httpx.HTTPStatusError(
+                    f"Unexpected status: {response.status_code}",
+                    request=response.request,
+                    response=response
+                )
+
+        return RetryPolicy(max_retries, retry_backoff, api="sequence").call(
+            send,
+            const.SEQUENCE_API_GRAPHQL_ENDPOINT,
+            hint="Check query and parameters. If issue persists, try limiting your query using the 'range' option, or increasing 'config.API_TIMEOUT'.",
+        )
 
     def get_editor_link(self) -> str:
         """Get link to GraphiQL editor with given query populated"""
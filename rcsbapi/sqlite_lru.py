@@ -0,0 +1,153 @@
+"""SQLite storage with expiry and least recently used eviction, shared between the response caches"""
+
+import itertools
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+Key = Tuple[str, ...]
+
+# Stay well below SQLite's limit on the number of query parameters
+_CHUNK_SIZE = 500
+# The running total size only tracks writes made through this connection, so it is recounted periodically
+# to pick up writes from other processes sharing the same file
+_RECOUNT_INTERVAL = 1000
+
+
+class SqliteLruStore:
+    """Table of text values keyed by one or more columns, with their size, creation and last access times.
+
+    The total size of the stored values is counted once and then kept up to date as values are added and removed,
+    so that checking it after every write doesn't scan the whole table. Expired values are found through an index
+    on their creation time, and least recently used values through an index on their access time.
+    """
+
+    def __init__(self, path: str, table: str, key_columns: Sequence[str]):
+        """Open (or create) a table.
+
+        Args:
+            path (str): path to the SQLite database file (":memory:" for a non-persistent store)
+            table (str): name of the table
+            key_columns (Sequence[str]): names of the columns that together identify a value
+        """
+        self.path = path
+        self._table = table
+        self._key_columns = tuple(key_columns)
+        self._lock = threading.Lock()
+        self._total_size: Optional[int] = None
+        self._writes = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        columns = ", ".join(f"{column} TEXT NOT NULL" for column in self._key_columns)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                f"{columns}, data TEXT NOT NULL, size INTEGER NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL, "
+                f"PRIMARY KEY ({', '.join(self._key_columns)}))"
+            )
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed ON {table} (accessed)")
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_created ON {table} (created)")
+
+    def get_many(self, keys: Iterable[Key], ttl: Optional[float]) -> Dict[Key, Tuple[float, str]]:
+        """Get unexpired values, and mark them as recently used.
+
+        Args:
+            keys (Iterable[Key]): keys to look up
+            ttl (float, optional): time in seconds after which values expire. None if they never expire.
+
+        Returns:
+            Dict[Key, Tuple[float, str]]: dictionary mapping each stored key to its creation time and value (missing keys are omitted)
+        """
+        now = time.time()
+        found: Dict[Key, Tuple[float, str]] = {}
+        with self._lock, self._conn:
+            for key, created, data in self._select(keys, "created, data"):
+                if ttl is not None and now - created > ttl:
+                    continue
+                found[key] = (created, data)
+            if found:
+                self._conn.executemany(f"UPDATE {self._table} SET accessed = ? WHERE {self._key_condition()}", [(now, *key) for key in found])
+        return found
+
+    def put_many(self, values: Dict[Key, str], ttl: Optional[float], max_size: Optional[int]) -> None:
+        """Add or replace values, then evict expired and least recently used values if necessary.
+
+        Args:
+            values (Dict[Key, str]): dictionary mapping keys to values
+            ttl (float, optional): time in seconds after which values expire. None if they never expire.
+            max_size (int, optional): maximum total size in bytes of the stored values. None for no limit.
+        """
+        if not values:
+            return
+        now = time.time()
+        with self._lock, self._conn:
+            total_size = self._get_total_size()
+            total_size -= sum(size for _, size in self._select(values, "size"))
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {self._table} ({', '.join(self._key_columns)}, data, size, created, accessed) "
+                f"VALUES ({', '.join('?' * len(self._key_columns))}, ?, ?, ?, ?)",
+                [(*key, data, len(data), now, now) for key, data in values.items()],
+            )
+            self._total_size = total_size + sum(len(data) for data in values.values())
+            self._evict(now, ttl, max_size)
+            self._writes += 1
+            if self._writes % _RECOUNT_INTERVAL == 0:
+                self._total_size = None
+
+    def clear(self) -> None:
+        """Remove all values."""
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self._table}")
+            self._total_size = 0
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._conn.close()
+
+    def _key_condition(self) -> str:
+        return " AND ".join(f"{column} = ?" for column in self._key_columns)
+
+    def _select(self, keys: Iterable[Key], columns: str) -> Iterable[Tuple]:
+        """Select columns of the rows with the given keys, as (key, *columns) tuples"""
+        *prefix_columns, last_column = self._key_columns
+        prefix_condition = "".join(f"{column} = ? AND " for column in prefix_columns)
+        # Group keys by all but their last column, so that each group is looked up with a single IN clause
+        unique_keys = sorted(dict.fromkeys(keys))
+        for prefix, group in itertools.groupby(unique_keys, key=lambda key: key[:-1]):
+            last_values = [key[-1] for key in group]
+            for i in range(0, len(last_values), _CHUNK_SIZE):
+                chunk = last_values[i:i + _CHUNK_SIZE]
+                rows = self._conn.execute(
+                    f"SELECT {last_column}, {columns} FROM {self._table} WHERE {prefix_condition}{last_column} IN ({','.join('?' * len(chunk))})",
+                    [*prefix, *chunk],
+                ).fetchall()
+                for last_value, *selected in rows:
+                    yield ((*prefix, last_value), *selected)
+
+    def _get_total_size(self) -> int:
+        if self._total_size is None:
+            self._total_size = self._conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self._table}").fetchone()[0]
+        return self._total_size
+
+    def _evict(self, now: float, ttl: Optional[float], max_size: Optional[int]) -> None:
+        total_size = self._get_total_size()
+        if ttl is not None:
+            expired_size, expired_count = self._conn.execute(f"SELECT COALESCE(SUM(size), 0), COUNT(*) FROM {self._table} WHERE created < ?", (now - ttl,)).fetchone()
+            if expired_count:
+                self._conn.execute(f"DELETE FROM {self._table} WHERE created < ?", (now - ttl,))
+                total_size -= expired_size
+        if max_size is not None and total_size > max_size:
+            # Delete least recently used values until the store fits
+            to_delete: List[Key] = []
+            for *key, size in self._conn.execute(f"SELECT {', '.join(self._key_columns)}, size FROM {self._table} ORDER BY accessed"):
+                to_delete.append(tuple(key))
+                total_size -= size
+                if total_size <= max_size:
+                    break
+            self._conn.executemany(f"DELETE FROM {self._table} WHERE {self._key_condition()}", to_delete)
+            logger.debug("Evicted %d entries from table %r of %r", len(to_delete), self._table, self.path)
+        self._total_size = total_size
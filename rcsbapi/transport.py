@@ -0,0 +1,382 @@
+"""Pluggable HTTP transport shared between API clients, with record/replay transports for offline testing and benchmarking
+
+By default, requests are sent over the network. Any httpx transport supporting both synchronous and asynchronous
+requests (e.g., `httpx.MockTransport`, or the `RecordTransport` and `ReplayTransport` classes below) can be
+installed instead, and is then used by all query classes (`DataQuery`, Search API queries, `SeqQuery` and `ModelQuery`).
+
+Example:
+    from rcsbapi.transport import Cassette, RecordTransport, ReplayTransport, use_transport
+
+    # Record the responses of a workload once...
+    cassette = Cassette("responses.json")
+    with use_transport(RecordTransport(cassette)):
+        run_workload()
+    cassette.save()
+
+    # ...then replay it offline, with simulated latency, errors and rate limits
+    with use_transport(ReplayTransport(Cassette("responses.json"), latency=0.05, error_rate=0.01, requests_per_second=20)):
+        run_workload()
+"""
+
+import asyncio
+import base64
+import collections
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple, Union
+import httpx
+from rcsbapi.config import config
+
+logger = logging.getLogger(__name__)
+
+Transport = Union[httpx.BaseTransport, httpx.AsyncBaseTransport]
+
+_transport: Optional[Transport] = None
+
+# Synchronous client reused by `send_request`, and the transport it was created for
+_sync_client: Optional[Tuple[Optional[Transport], httpx.Client]] = None
+_sync_client_lock = threading.Lock()
+
+# Headers describing the encoding of the original body, which no longer apply to the decoded body that is stored
+_DROPPED_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding", "connection"})
+
+
+def get_transport() -> Optional[Transport]:
+    """Get the transport used by all query classes (None if requests are sent over the network)"""
+    return _transport
+
+
+def set_transport(transport: Optional[Transport]) -> None:
+    """Use a transport for all requests made by query classes.
+
+    Args:
+        transport (Transport, optional): transport handling both synchronous and asynchronous requests,
+            or None to send requests over the network
+    """
+    global _transport  # pylint: disable=global-statement
+    _transport = transport
+
+
+@contextlib.contextmanager
+def use_transport(transport: Optional[Transport]) -> Iterator[Optional[Transport]]:
+    """Use a transport for all requests made by query classes within a `with` block (see `set_transport`)."""
+    previous = get_transport()
+    set_transport(transport)
+    try:
+        yield transport
+    finally:
+        set_transport(previous)
+
+
+def send_request(method: str, url: str, **kwargs: Any) -> httpx.Response:
+    """Send a synchronous request through the current transport (same arguments as `httpx.request`).
+
+    Requests share one client (and its connection pool) until a different transport is installed.
+    """
+    global _sync_client  # pylint: disable=global-statement
+    transport = get_transport()
+    with _sync_client_lock:
+        if _sync_client is None or _sync_client[0] is not transport:
+            # The previous client isn't closed, since requests from other threads may still be using it
+            _sync_client = (transport, httpx.Client(transport=_shared(transport)))  # type: ignore[arg-type]
+        client = _sync_client[1]
+    return client.request(method, url, **kwargs)
+
+
+def async_client(**kwargs: Any) -> httpx.AsyncClient:
+    """Create an async client using the current transport (defaults to a timeout of `config.API_TIMEOUT`).
+
+    Closing the client doesn't close an installed transport, which other clients may still be using.
+    """
+    kwargs.setdefault("timeout", config.API_TIMEOUT)
+    return httpx.AsyncClient(transport=_shared(get_transport()), **kwargs)  # type: ignore[arg-type]
+
+
+def _shared(transport: Optional[Transport]) -> Optional[Transport]:
+    """Wrap an installed transport so that the clients using it don't close it"""
+    return _SharedTransport(transport) if transport is not None else None
+
+
+class _SharedTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """Proxy to a transport shared by many clients, ignoring their close (the transport is closed by its owner)."""
+
+    def __init__(self, transport: Transport):
+        self._transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        return self._transport.handle_request(request)  # type: ignore[union-attr]
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport.handle_async_request(request)  # type: ignore[union-attr]
+
+    def close(self) -> None:
+        pass
+
+    async def aclose(self) -> None:
+        pass
+
+
+def request_key(method: str, url: str, body: bytes) -> str:
+    """Get the key identifying a request in a `Cassette` (JSON bodies are compared without their random parts)"""
+    return f"{method.upper()} {url} {hashlib.sha256(_normalize_body(body)).hexdigest()}"
+
+
+def _normalize_body(body: bytes) -> bytes:
+    """Get the canonical JSON of a JSON body, without the random `query_id` of Search API requests"""
+    try:
+        data = json.loads(body)
+    except ValueError:  # not JSON (or not UTF-8)
+        return body
+    if not isinstance(data, dict):
+        return body
+    request_info = data.get("request_info")
+    if isinstance(request_info, dict) and "query_id" in request_info:
+        data["request_info"] = {key: value for key, value in request_info.items() if key != "query_id"}
+    return json.dumps(data, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+class Cassette:
+    """Recorded responses, keyed by request method, URL and body, persisted as a JSON file.
+
+    If the same request was recorded several times, its responses are replayed in turn.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """Load recorded responses (if the file exists).
+
+        Args:
+            path (str, optional): path to the JSON file. Defaults to None (in-memory only).
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._interactions: Dict[str, List[Dict[str, Any]]] = {}
+        self._replay_counts: Dict[str, int] = collections.defaultdict(int)
+        if path is not None and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as file:
+                self._interactions = json.load(file)["interactions"]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(responses) for responses in self._interactions.values())
+
+    def add(self, request: httpx.Request, response: httpx.Response) -> None:
+        """Record a response (its body must have been read)."""
+        content = response.content
+        try:
+            body: Dict[str, str] = {"text": content.decode("utf-8")}
+        except UnicodeDecodeError:
+            body = {"base64": base64.b64encode(content).decode("ascii")}
+        recorded = {
+            "status_code": response.status_code,
+            "headers": [[name, value] for name, value in response.headers.items() if name.lower() not in _DROPPED_HEADERS],
+            **body,
+        }
+        key = request_key(request.method, str(request.url), request.content)
+        with self._lock:
+            self._interactions.setdefault(key, []).append(recorded)
+
+    def get(self, request: httpx.Request) -> Optional[httpx.Response]:
+        """Get the recorded response to a request (its body must have been read), or None if it wasn't recorded"""
+        key = request_key(request.method, str(request.url), request.content)
+        with self._lock:
+            responses = self._interactions.get(key)
+            if not responses:
+                return None
+            recorded = responses[self._replay_counts[key] % len(responses)]
+            self._replay_counts[key] += 1
+        content = recorded["text"].encode("utf-8") if "text" in recorded else base64.b64decode(recorded["base64"])
+        return httpx.Response(recorded["status_code"], headers=recorded["headers"], content=content, request=request)
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Write the recorded responses to a JSON file.
+
+        Args:
+            path (str, optional): path to write to. Defaults to the path the cassette was loaded from.
+        """
+        path = path if path is not None else self.path
+        if path is None:
+            raise ValueError("No path given to save the cassette to")
+        with self._lock:
+            interactions = dict(self._interactions)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"interactions": interactions}, file, indent=1)
+
+
+class RecordTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """Transport sending requests over the network (or through another transport) and recording their responses in a `Cassette`."""
+
+    def __init__(self, cassette: Cassette, transport: Optional[Transport] = None):
+        """Create a recording transport.
+
+        Args:
+            cassette (Cassette): cassette to record responses in
+            transport (Transport, optional): transport to send requests through (e.g., a `httpx.MockTransport`
+                generating synthetic responses). Defaults to sending requests over the network.
+        """
+        self.cassette = cassette
+        self._transport = transport
+        self._sync_transport: Optional[httpx.BaseTransport] = None
+        self._async_transport: Optional[httpx.AsyncBaseTransport] = None
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if self._sync_transport is None:
+            self._sync_transport = self._transport if self._transport is not None else httpx.HTTPTransport()  # type: ignore[assignment]
+        assert self._sync_transport is not None  # for mypy
+        request.read()
+        response = self._sync_transport.handle_request(request)
+        try:
+            content = response.read()
+        finally:
+            response.close()
+        return self._record(request, response, content)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self._async_transport is None:
+            self._async_transport = self._transport if self._transport is not None else httpx.AsyncHTTPTransport()  # type: ignore[assignment]
+        assert self._async_transport is not None  # for mypy
+        await request.aread()
+        response = await self._async_transport.handle_async_request(request)
+        try:
+            content = await response.aread()
+        finally:
+            await response.aclose()
+        return self._record(request, response, content)
+
+    def _record(self, request: httpx.Request, response: httpx.Response, content: bytes) -> httpx.Response:
+        # The body is decoded now, so drop the headers describing its original encoding
+        headers = [(name, value) for name, value in response.headers.items() if name.lower() not in _DROPPED_HEADERS]
+        recorded = httpx.Response(response.status_code, headers=headers, content=content, request=request)
+        self.cassette.add(request, recorded)
+        return recorded
+
+    # Closed by the owner of the transport (clients don't close an installed transport); the network transports are recreated on next use
+    def close(self) -> None:
+        if self._sync_transport is not None and self._transport is None:
+            self._sync_transport.close()
+        self._sync_transport = None
+
+    async def aclose(self) -> None:
+        if self._async_transport is not None and self._transport is None:
+            await self._async_transport.aclose()
+        self._async_transport = None
+
+
+class ReplayTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """Transport serving responses from a `Cassette`, without network access.
+
+    Latency, transient errors and a server-side rate limit can be simulated to reproduce performance behavior
+    deterministically (given a `seed`).
+    """
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        requests_per_second: Optional[float] = None,
+        seed: Optional[int] = None,
+    ):
+        """Create a replay transport.
+
+        Args:
+            cassette (Cassette): recorded responses
+            latency (float, optional): seconds to wait before each response. Defaults to 0.
+            error_rate (float, optional): fraction of requests answered with a 503 error. Defaults to 0.
+            requests_per_second (float, optional): rate limit, above which requests are answered with a 429 error
+                (with a Retry-After header). Defaults to None (no limit).
+            seed (int, optional): seed for the random errors. Defaults to None.
+        """
+        self.cassette = cassette
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests_per_second = requests_per_second
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._request_times: Deque[float] = collections.deque()
+
+    def respond(self, request: httpx.Request) -> Tuple[httpx.Response, float]:
+        """Get the response to a request, and the delay before sending it"""
+        with self._lock:
+            now = time.monotonic()
+            if self.requests_per_second is not None:
+                while self._request_times and now - self._request_times[0] >= 1:
+                    self._request_times.popleft()
+                if len(self._request_times) >= self.requests_per_second:
+                    retry_after = 1 - (now - self._request_times[0])
+                    return (httpx.Response(429, headers={"Retry-After": f"{retry_after:.3f}"}, request=request), 0.0)
+                self._request_times.append(now)
+            fail = self.error_rate > 0 and self._random.random() < self.error_rate
+        if fail:
+            return (httpx.Response(503, text="Simulated error", request=request), self.latency)
+        response = self.cassette.get(request)
+        if response is None:
+            raise ValueError(f"No recorded response for {request.method} {request.url}")
+        return (response, self.latency)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        response, delay = self.respond(request)
+        if delay:
+            time.sleep(delay)
+        return response
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        response, delay = self.respond(request)
+        if delay:
+            await asyncio.sleep(delay)
+        return response
+
+
+class RedirectTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """Transport sending all requests to another server (e.g., the local stand-in server in `rcsbapi.dev_tools.fake_server`,
+    available in source checkouts only).
+
+    The path and query of each request are kept, and the original URL is sent in an `X-Original-URL` header.
+    """
+
+    def __init__(self, base_url: str):
+        """Create a redirecting transport.
+
+        Args:
+            base_url (str): scheme, host and port of the server to send requests to (e.g., "http://127.0.0.1:8080")
+        """
+        self.base_url = httpx.URL(base_url)
+        self._sync_transport: Optional[httpx.HTTPTransport] = None
+        self._async_transport: Optional[httpx.AsyncHTTPTransport] = None
+
+    def _redirect(self, request: httpx.Request) -> httpx.Request:
+        url = request.url.copy_with(scheme=self.base_url.scheme, host=self.base_url.host, port=self.base_url.port)
+        headers = httpx.Headers(request.headers)
+        headers["X-Original-URL"] = str(request.url)
+        headers["Host"] = url.netloc.decode("ascii")
+        return httpx.Request(request.method, url, headers=headers, content=request.content, extensions=request.extensions)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if self._sync_transport is None:
+            self._sync_transport = httpx.HTTPTransport()
+        request.read()
+        return self._sync_transport.handle_request(self._redirect(request))
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self._async_transport is None:
+            self._async_transport = httpx.AsyncHTTPTransport()
+        await request.aread()
+        return await self._async_transport.handle_async_request(self._redirect(request))
+
+    # Closed by the owner of the transport (clients don't close an installed transport)
+    def close(self) -> None:
+        if self._sync_transport is not None:
+            self._sync_transport.close()
+            self._sync_transport = None
+
+    async def aclose(self) -> None:
+        if self._async_transport is not None:
+            await self._async_transport.aclose()
+            self._async_transport = None
@@ -11,15 +11,35 @@
 Tests for all functions of the Data API module.
 """
 
+import asyncio
+import concurrent.futures
 import logging
+import math
+import os
+import random
+import re
+import tempfile
+import threading
 import time
 import unittest
+from unittest import mock
 import httpx
 
 from rcsbapi.search import search_attributes as attrs
 from rcsbapi.search import NestedAttributeQuery, AttributeQuery
-from rcsbapi.data import DataSchema, DataQuery
+from rcsbapi.data import DataSchema, DataQuery, DataCache, MixedIdQuery, normalize_ids
+from rcsbapi.data import data_runner
+from rcsbapi.data.data_holdings import HoldingsCache
+from rcsbapi.data.data_query import AllStructures, GraphQLError
+from rcsbapi.data.data_plan import TimingStats
+from rcsbapi.data.data_hedge import LatencyTracker, hedged
+from rcsbapi.data.data_coalesce import SingleFlight
 from rcsbapi.config import config
+from rcsbapi.rate_limiter import AsyncRateLimiter
+from rcsbapi.retry import CircuitBreaker, CircuitOpenError, RetryPolicy
+from rcsbapi.instrumentation import COALESCED, INSTRUMENTATION, REQUEST_END, REQUEST_START, RETRY, Histogram, MetricsRecorder
+from rcsbapi.transport import Cassette, RecordTransport, RedirectTransport, ReplayTransport, async_client, send_request, use_transport
+from rcsbapi.dev_tools.fake_server import start_server
 from rcsbapi.const import const
 
 logging.basicConfig(level=logging.WARNING, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
@@ -37,6 +57,35 @@ class QueryTests(unittest.TestCase):
         endTime = time.time()
         logger.info("Completed %s at %s (%.4f seconds)", self.id(), time.strftime("%Y %m %d %H:%M:%S", time.localtime()), endTime - self.__startTime)
 
+    @staticmethod
+    def fake_submit(requested=None, failing=None, fields=None, on_request=None, delay=None):
+        """Get a stand-in for `DataQuery._submit_request` that answers with an "entries" record per requested ID.
+
+        Args:
+            requested (list, optional): list to append the IDs of each request to
+            failing (dict, optional): IDs whose requests raise an error, mapped to the error (the first failing ID of a batch wins)
+            fields (dict, optional): fields added to every record besides rcsb_id
+            on_request (Callable, optional): called with the client and rate limiter of each request
+            delay (float, optional): seconds to sleep before answering
+        """
+        async def submit(client, query_body, semaphores, max_retries, retry_backoff, attempt_times=None, rate_limiter=None):  # pylint: disable=unused-argument
+            id_batch = re.findall(r'"(\w+)"', query_body.split(")")[0])
+            if requested is not None:
+                requested.append(id_batch)
+            if on_request is not None:
+                on_request(client, rate_limiter)
+            if attempt_times is not None:
+                attempt_times.append(0.01)
+            if delay is not None:
+                await asyncio.sleep(delay)
+            for entry_id in id_batch:
+                if failing and entry_id in failing:
+                    raise failing[entry_id]
+            # The API returns extended PDB IDs in their short form
+            return {"data": {"entries": [{"rcsb_id": re.sub(r"^PDB_0000", "", entry_id), **(fields or {})} for entry_id in id_batch]}}
+
+        return submit
+
     def testGetEditorLink(self) -> None:
         # query_str = '{ entries(entry_ids: ["4HHB", "1IYE"]) {\n  exptl {\n     method_details\n     method\n     details\n     crystals_number\n  }\n}}'
         query_obj = DataQuery(input_type="entries", input_ids={"entry_ids": ["4HHB", "1IYE"]}, return_data_list=["exptl"])
@@ -622,6 +671,1047 @@ class QueryTests(unittest.TestCase):
             except Exception as error:
                 self.fail(f"Failed unexpectedly: {error}")
 
+    def testToColumns(self) -> None:
+        query_obj = DataQuery(
+            input_type="entries",
+            input_ids=["4HHB", "1IYE"],
+            return_data_list=["exptl.method", "polymer_entities.rcsb_polymer_entity_container_identifiers.auth_asym_ids"],
+        )
+        query_obj._response = {
+            "data": {
+                "entries": [
+                    {
+                        "rcsb_id": "4HHB",
+                        "exptl": [{"method": "X-RAY DIFFRACTION"}],
+                        "polymer_entities": [
+                            {"rcsb_polymer_entity_container_identifiers": {"auth_asym_ids": ["A", "C"]}},
+                            {"rcsb_polymer_entity_container_identifiers": {"auth_asym_ids": ["B", "D"]}},
+                        ],
+                    },
+                    {"rcsb_id": "1IYE", "exptl": [{"method": "X-RAY DIFFRACTION"}], "polymer_entities": None},
+                ]
+            }
+        }
+        asym_col = "polymer_entities.rcsb_polymer_entity_container_identifiers.auth_asym_ids"
+        msg = "1. One row per input ID"
+        with self.subTest(msg=msg):
+            columns = query_obj.to_columns()
+            self.assertEqual(list(columns.keys()), ["rcsb_id", "exptl.method", asym_col])
+            self.assertEqual(columns["rcsb_id"], ["4HHB", "1IYE"])
+            self.assertEqual(columns[asym_col], [["A", "C", "B", "D"], None])
+        msg = "2. List policies"
+        with self.subTest(msg=msg):
+            self.assertEqual(query_obj.to_columns(list_policy="first")["exptl.method"], ["X-RAY DIFFRACTION", "X-RAY DIFFRACTION"])
+            self.assertEqual(query_obj.to_columns(list_policy="join")[asym_col], ["A;C;B;D", None])
+            with self.assertRaises(ValueError):
+                query_obj.to_columns(list_policy="sum")  # type: ignore[arg-type]
+        msg = "3. Exploding a list-valued field"
+        with self.subTest(msg=msg):
+            columns = query_obj.to_columns(explode="polymer_entities")
+            self.assertEqual(columns["rcsb_id"], ["4HHB", "4HHB", "1IYE"])
+            self.assertEqual(columns[asym_col], [["A", "C"], ["B", "D"], None])
+            columns = query_obj.to_columns(explode=asym_col)
+            self.assertEqual(columns["rcsb_id"], ["4HHB"] * 4 + ["1IYE"])
+            self.assertEqual(columns[asym_col], ["A", "C", "B", "D", None])
+            with self.assertRaises(ValueError):
+                query_obj.to_columns(explode="struct")
+
+    def testCheckpoint(self) -> None:
+        input_ids = ["4HHB", "1IYE", "2LGI", "1STP", "2JEF", "1CDG", "6M0J"]
+        failing = {"1STP": httpx.ConnectError("Simulated failure")}
+        requested = []
+        submit = self.fake_submit(requested=requested, failing=failing)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            checkpoint_file = os.path.join(tmp_dir, "checkpoint.jsonl")
+            query_obj = DataQuery(input_type="entries", input_ids=input_ids, return_data_list=["exptl.method"])
+            with mock.patch.object(query_obj, "_submit_request", side_effect=submit):
+                msg = "1. Failed batch doesn't discard completed batches"
+                with self.subTest(msg=msg):
+                    with self.assertRaises(httpx.ConnectError):
+                        query_obj.exec(batch_size=2, checkpoint_file=checkpoint_file)
+                    self.assertEqual(len(requested), 4)
+
+                msg = "2. Re-run only requests the failed batch"
+                with self.subTest(msg=msg):
+                    requested.clear()
+                    failing.clear()
+                    resD = query_obj.exec(batch_size=2, checkpoint_file=checkpoint_file)
+                    self.assertEqual(requested, [["2LGI", "1STP"]])
+                    self.assertEqual([entry["rcsb_id"] for entry in resD["data"]["entries"]], input_ids)
+
+            msg = "3. Checkpoint file can't be reused for a different query"
+            with self.subTest(msg=msg):
+                other_query = DataQuery(input_type="entries", input_ids=input_ids, return_data_list=["struct.title"])
+                with self.assertRaises(ValueError):
+                    other_query.exec(batch_size=2, checkpoint_file=checkpoint_file)
+
+            msg = "4. A line truncated by a crash is removed before new batches are appended"
+            with self.subTest(msg=msg), mock.patch.object(query_obj, "_submit_request", side_effect=submit):
+                checkpoint_file = os.path.join(tmp_dir, "truncated.jsonl")
+                failing["1STP"] = httpx.ConnectError("Simulated failure")
+                with self.assertRaises(httpx.ConnectError):
+                    query_obj.exec(batch_size=2, checkpoint_file=checkpoint_file)
+                with open(checkpoint_file, "a", encoding="utf-8") as file:
+                    file.write('{"key": "0123')
+                failing.clear()
+                query_obj.exec(batch_size=2, checkpoint_file=checkpoint_file)
+                with open(checkpoint_file, "r", encoding="utf-8") as file:
+                    lines = file.read().splitlines()
+                self.assertEqual(len(lines), 5)
+                # Every batch is loaded back from the file
+                requested.clear()
+                query_obj.exec(batch_size=2, checkpoint_file=checkpoint_file)
+                self.assertEqual(requested, [])
+
+            msg = "5. A header truncated by a crash is rewritten"
+            with self.subTest(msg=msg), mock.patch.object(query_obj, "_submit_request", side_effect=submit):
+                checkpoint_file = os.path.join(tmp_dir, "truncated_header.jsonl")
+                with open(checkpoint_file, "w", encoding="utf-8") as file:
+                    file.write('{"query": "0123')
+                requested.clear()
+                resD = query_obj.exec(batch_size=2, checkpoint_file=checkpoint_file)
+                self.assertEqual(len(requested), 4)
+                self.assertEqual([entry["rcsb_id"] for entry in resD["data"]["entries"]], input_ids)
+                requested.clear()
+                query_obj.exec(batch_size=2, checkpoint_file=checkpoint_file)
+                self.assertEqual(requested, [])
+
+    def testAllowPartial(self) -> None:
+        input_ids = ["4HHB", "1IYE", "2LGI", "1STP", "2JEF"]
+        failing = {"2LGI": httpx.ConnectError("Simulated failure")}
+        submit = self.fake_submit(failing=failing)
+
+        query_obj = DataQuery(input_type="entries", input_ids=input_ids, return_data_list=["exptl.method"])
+        with mock.patch.object(query_obj, "_submit_request", side_effect=submit):
+            msg = "1. Successful batches are returned and failed batches are reported"
+            with self.subTest(msg=msg):
+                resD = query_obj.exec(batch_size=2, allow_partial=True)
+                self.assertEqual([entry["rcsb_id"] for entry in resD["data"]["entries"]], ["4HHB", "1IYE", "2JEF"])
+                failed_batches = query_obj.get_failed_batches()
+                self.assertEqual(len(failed_batches), 1)
+                self.assertEqual(failed_batches[0].ids, ["2LGI", "1STP"])
+                self.assertIsInstance(failed_batches[0].error, httpx.ConnectError)
+                self.assertEqual(failed_batches[0].attempts, 1)
+
+            msg = "2. retry_failed() merges newly retrieved data in input ID order"
+            with self.subTest(msg=msg):
+                failing.clear()
+                resD = query_obj.retry_failed()
+                self.assertEqual([entry["rcsb_id"] for entry in resD["data"]["entries"]], input_ids)
+                self.assertEqual(query_obj.get_failed_batches(), [])
+
+            msg = "3. Errors are raised by default"
+            with self.subTest(msg=msg):
+                failing["4HHB"] = httpx.ConnectError("Simulated failure")
+                with self.assertRaises(httpx.ConnectError):
+                    query_obj.exec(batch_size=2)
+
+        msg = "4. retry_failed() bisects and caches like the execution it retries"
+        with self.subTest(msg=msg):
+            cache = DataCache(":memory:")
+            failing.clear()
+            failing.update({"2LGI": httpx.ConnectError("Simulated failure"), "1STP": GraphQLError("1. Invalid ID")})
+            query_obj = DataQuery(input_type="entries", input_ids=input_ids, return_data_list=["exptl.method"])
+            with mock.patch.object(query_obj, "_submit_request", side_effect=submit):
+                query_obj.exec(batch_size=2, allow_partial=True, bisect_errors=True, cache=cache)
+                del failing["2LGI"]
+                resD = query_obj.retry_failed()
+            self.assertEqual([entry["rcsb_id"] for entry in resD["data"]["entries"]], ["4HHB", "1IYE", "2LGI", "2JEF"])
+            self.assertEqual(list(query_obj.get_quarantined_ids()), ["1STP"])
+            self.assertIn("2LGI", cache.get_many(cache.query_shape(query_obj.get_query()), ["2LGI"]))
+
+    def testBisectErrors(self) -> None:
+        input_ids = ["4HHB", "1IYE", "2LGI", "1STP", "2JEF", "1CDG", "6M0J", "7N0R"]
+        poison = {"1STP": GraphQLError("1. Invalid ID")}
+        requested = []
+        submit = self.fake_submit(requested=requested, failing=poison)
+
+        query_obj = DataQuery(input_type="entries", input_ids=input_ids, return_data_list=["exptl.method"])
+        with mock.patch.object(query_obj, "_submit_request", side_effect=submit):
+            msg = "1. Poison ID is isolated and the rest of the batch completes"
+            with self.subTest(msg=msg):
+                resD = query_obj.exec(batch_size=8, bisect_errors=True)
+                self.assertEqual([entry["rcsb_id"] for entry in resD["data"]["entries"]], [i for i in input_ids if i not in poison])
+                self.assertEqual(list(query_obj.get_quarantined_ids().keys()), ["1STP"])
+                # 1 original request + 2 requests per halving (log2(8) = 3)
+                self.assertEqual(len(requested), 7)
+
+            msg = "2. Non-transient errors are raised by default"
+            with self.subTest(msg=msg):
+                with self.assertRaises(ValueError):
+                    query_obj.exec(batch_size=8)
+
+        posted = []
+
+        async def post(url, headers=None, json=None):  # pylint: disable=unused-argument,redefined-outer-name
+            id_batch = re.findall(r'"(\w+)"', json["query"].split(")")[0])
+            posted.append(id_batch)
+            request = httpx.Request("POST", url)
+            if "1STP" in id_batch:
+                return httpx.Response(400, request=request)
+            if "2LGI" in id_batch:
+                return httpx.Response(200, content=b'{"data": {"entr', request=request)  # truncated
+            return httpx.Response(200, json={"data": {"entries": [{"rcsb_id": entry_id} for entry_id in id_batch]}}, request=request)
+
+        msg = "3. Client errors are bisected without being retried first"
+        with self.subTest(msg=msg), mock.patch.object(httpx.AsyncClient, "post", side_effect=post):
+            query_obj = DataQuery(input_type="entries", input_ids=["4HHB", "1STP"], return_data_list=["exptl.method"])
+            resD = query_obj.exec(batch_size=2, max_retries=3, bisect_errors=True)
+            self.assertEqual(posted, [["4HHB", "1STP"], ["4HHB"], ["1STP"]])
+            self.assertEqual([entry["rcsb_id"] for entry in resD["data"]["entries"]], ["4HHB"])
+            self.assertEqual(list(query_obj.get_quarantined_ids()), ["1STP"])
+
+        msg = "4. Responses that fail to decode are not bisected"
+        with self.subTest(msg=msg), mock.patch.object(httpx.AsyncClient, "post", side_effect=post):
+            posted.clear()
+            query_obj = DataQuery(input_type="entries", input_ids=["4HHB", "2LGI"], return_data_list=["exptl.method"])
+            with self.assertRaises(ValueError):
+                query_obj.exec(batch_size=2, max_retries=1, bisect_errors=True)
+            self.assertEqual(posted, [["4HHB", "2LGI"]])
+            self.assertEqual(query_obj.get_quarantined_ids(), {})
+
+    def testCache(self) -> None:
+        requested = []
+        submit = self.fake_submit(requested=requested, fields={"exptl": [{"method": "X-RAY DIFFRACTION"}]})
+
+        cache = DataCache(":memory:")
+        query_obj = DataQuery(input_type="entries", input_ids=["4HHB", "1IYE"], return_data_list=["rcsb_id", "exptl.method"])
+        with mock.patch.object(query_obj, "_submit_request", side_effect=submit):
+            msg = "1. Uncached IDs are requested and stored"
+            with self.subTest(msg=msg):
+                query_obj.exec(cache=cache)
+                self.assertEqual(requested, [["4HHB", "1IYE"]])
+
+            msg = "2. Fully cached query makes no requests"
+            with self.subTest(msg=msg):
+                requested.clear()
+                resD = query_obj.exec(cache=cache)
+                self.assertEqual(requested, [])
+                self.assertEqual([entry["rcsb_id"] for entry in resD["data"]["entries"]], ["4HHB", "1IYE"])
+
+        query_obj = DataQuery(input_type="entries", input_ids=["2LGI", "4HHB", "1STP"], return_data_list=["rcsb_id", "exptl.method"])
+        with mock.patch.object(query_obj, "_submit_request", side_effect=submit):
+            msg = "3. Only missing IDs are requested, and results keep input order"
+            with self.subTest(msg=msg):
+                requested.clear()
+                resD = query_obj.exec(cache=cache)
+                self.assertEqual(requested, [["2LGI", "1STP"]])
+                self.assertEqual([entry["rcsb_id"] for entry in resD["data"]["entries"]], ["2LGI", "4HHB", "1STP"])
+
+        query_obj = DataQuery(input_type="entries", input_ids=["PDB_00004HHB", "PDB_00006M0J", "1IYE"], return_data_list=["rcsb_id", "exptl.method"])
+        with mock.patch.object(query_obj, "_submit_request", side_effect=submit):
+            msg = "4. Extended PDB IDs are looked up and ordered by the rcsb_id the API returns"
+            with self.subTest(msg=msg):
+                requested.clear()
+                resD = query_obj.exec(cache=cache)
+                self.assertEqual(requested, [["PDB_00006M0J"]])
+                self.assertEqual([entry["rcsb_id"] for entry in resD["data"]["entries"]], ["4HHB", "6M0J", "1IYE"])
+                requested.clear()
+                resD = query_obj.exec(cache=cache)
+                self.assertEqual(requested, [])
+                self.assertEqual([entry["rcsb_id"] for entry in resD["data"]["entries"]], ["4HHB", "6M0J", "1IYE"])
+
+        msg = "5. Expired records are not returned"
+        with self.subTest(msg=msg):
+            expired_cache = DataCache(":memory:", ttl=-1)
+            expired_cache.put_many("shape", {"4HHB": {"rcsb_id": "4HHB"}})
+            self.assertEqual(expired_cache.get_many("shape", ["4HHB"]), {})
+
+        msg = "6. Least recently used records are evicted when over max_size"
+        with self.subTest(msg=msg):
+            small_cache = DataCache(":memory:", max_size=50)
+            small_cache.put_many("shape", {"4HHB": {"rcsb_id": "4HHB"}})
+            small_cache.put_many("shape", {"1IYE": {"rcsb_id": "1IYE"}, "2LGI": {"rcsb_id": "2LGI"}})
+            self.assertEqual(small_cache.get_many("shape", ["4HHB"]), {})
+            self.assertEqual(set(small_cache.get_many("shape", ["1IYE", "2LGI"])), {"1IYE", "2LGI"})
+
+        msg = "7. The cache file defaults to the user cache directory"
+        with self.subTest(msg=msg), tempfile.TemporaryDirectory() as tmp_dir, mock.patch.dict(os.environ, {"XDG_CACHE_HOME": tmp_dir}):
+            default_cache = DataCache()
+            try:
+                self.assertEqual(default_cache.path, os.path.join(tmp_dir, "rcsbapi", "data_cache.sqlite"))
+                self.assertTrue(os.path.exists(default_cache.path))
+            finally:
+                default_cache.close()
+
+    def testCoalesceRequests(self) -> None:
+        requested = []
+
+        async def send(self, client, query_body, semaphores, max_retries, retry_backoff, attempt_times=None, rate_limiter=None):  # pylint: disable=unused-argument
+            requested.append(query_body)
+            await asyncio.sleep(0.1)
+            return {"data": {"entries": [{"rcsb_id": "4HHB"}, {"rcsb_id": "1IYE"}]}}
+
+        async def run_concurrently(*query_objs):
+            return await asyncio.gather(*(query_obj._async_exec() for query_obj in query_objs))
+
+        query_objs = [DataQuery(input_type="entries", input_ids=["4HHB", "1IYE"], return_data_list=["exptl.method"]) for _ in range(3)]
+        with mock.patch.object(DataQuery, "_send_request", send):
+            msg = "1. Identical concurrent requests share one network call"
+            with self.subTest(msg=msg):
+                results = asyncio.run(run_concurrently(*query_objs))
+                self.assertEqual(len(requested), 1)
+                self.assertTrue(all(resD == results[0] for resD in results))
+
+            msg = "2. Each caller gets its own copy of the response"
+            with self.subTest(msg=msg):
+                results[0]["data"]["entries"].clear()
+                self.assertEqual(len(results[1]["data"]["entries"]), 2)
+
+            msg = "3. Coalescing can be turned off in config"
+            with self.subTest(msg=msg):
+                requested.clear()
+                config.DATA_API_COALESCE_REQUESTS = False
+                try:
+                    asyncio.run(run_concurrently(*query_objs))
+                finally:
+                    config.DATA_API_COALESCE_REQUESTS = True
+                self.assertEqual(len(requested), 3)
+
+        msg = "4. Waiters don't see changes the leader's caller makes to its response"
+        with self.subTest(msg=msg):
+            single_flight = SingleFlight()
+            waited = []
+
+            async def request():
+                await asyncio.sleep(0.05)
+                return {"data": {"entries": [{"rcsb_id": "4HHB"}]}}
+
+            async def leader():
+                result = await single_flight.do("key", request)
+                result["data"]["entries"].clear()  # e.g., merged into another response in place
+                return result
+
+            async def waiter():
+                await asyncio.sleep(0.01)
+                return await single_flight.do("key", request, waited.append)
+
+            async def run_leader_and_waiters():
+                return await asyncio.gather(leader(), waiter(), waiter())
+
+            results = asyncio.run(run_leader_and_waiters())
+            self.assertEqual(results[0]["data"]["entries"], [])
+            self.assertEqual([len(result["data"]["entries"]) for result in results[1:]], [1, 1])
+
+        msg = "5. Coalesced requests are recorded as attempts and instrumentation events"
+        with self.subTest(msg=msg):
+            self.assertEqual(len(waited), 2)
+            events = []
+            INSTRUMENTATION.add_listener(events.append)
+            try:
+                with mock.patch.object(DataQuery, "_send_request", send):
+                    asyncio.run(run_concurrently(*query_objs))
+            finally:
+                INSTRUMENTATION.remove_listener(events.append)
+            self.assertEqual([event.kind for event in events], [COALESCED, COALESCED])
+
+        msg = "6. Waiters send the request themselves if the leader is cancelled, and a cancelled waiter doesn't cancel the leader"
+        with self.subTest(msg=msg):
+            single_flight = SingleFlight()
+            calls = []
+
+            async def slow_request():
+                calls.append("request")
+                await asyncio.sleep(0.1)
+                return {"data": {"entries": [{"rcsb_id": "4HHB"}]}}
+
+            async def run_with_cancelled_leader():
+                leader_task = asyncio.ensure_future(single_flight.do("key", slow_request))
+                await asyncio.sleep(0.01)
+                waiter_tasks = [asyncio.ensure_future(single_flight.do("key", slow_request)) for _ in range(2)]
+                await asyncio.sleep(0.01)
+                leader_task.cancel()
+                return await asyncio.gather(leader_task, *waiter_tasks, return_exceptions=True)
+
+            results = asyncio.run(run_with_cancelled_leader())
+            self.assertIsInstance(results[0], asyncio.CancelledError)
+            self.assertEqual(results[1:], [{"data": {"entries": [{"rcsb_id": "4HHB"}]}}] * 2)
+            self.assertEqual(len(calls), 2)
+
+            async def run_with_cancelled_waiter():
+                leader_task = asyncio.ensure_future(single_flight.do("key", slow_request))
+                await asyncio.sleep(0.01)
+                waiter_task = asyncio.ensure_future(single_flight.do("key", slow_request))
+                await asyncio.sleep(0.01)
+                waiter_task.cancel()
+                return await asyncio.gather(leader_task, waiter_task, return_exceptions=True)
+
+            results = asyncio.run(run_with_cancelled_waiter())
+            self.assertEqual(results[0], {"data": {"entries": [{"rcsb_id": "4HHB"}]}})
+            self.assertIsInstance(results[1], asyncio.CancelledError)
+
+        msg = "7. Responses aren't copied when no identical request is waiting"
+        with self.subTest(msg=msg), mock.patch("rcsbapi.data.data_coalesce.copy.deepcopy") as deepcopy:
+            response = {"data": {"entries": []}}
+            self.assertIs(asyncio.run(SingleFlight().do("key", mock.AsyncMock(return_value=response))), response)
+            deepcopy.assert_not_called()
+
+    def testAexec(self) -> None:
+        clients = []
+        limiters = []
+
+        def on_request(client, rate_limiter):
+            clients.append(client)
+            limiters.append(rate_limiter)
+
+        submit = self.fake_submit(on_request=on_request, delay=0)
+
+        async def run_with_shared_client(limiter):
+            async with httpx.AsyncClient() as client:
+                query_objs = [
+                    DataQuery(input_type="entries", input_ids=["4HHB", "1IYE"], return_data_list=["exptl.method"]),
+                    DataQuery(input_type="entries", input_ids=["2LGI"], return_data_list=["exptl.method"]),
+                ]
+                with mock.patch.object(DataQuery, "_submit_request", side_effect=submit):
+                    results = await asyncio.gather(*(query_obj.aexec(client=client, rate_limiter=limiter) for query_obj in query_objs))
+                return client, results, client.is_closed
+
+        async def run_with_context():
+            async with DataQuery(input_type="entries", input_ids=["4HHB"], return_data_list=["exptl.method"]) as query_obj:
+                with mock.patch.object(query_obj, "_submit_request", side_effect=submit):
+                    await query_obj.aexec()
+                    await query_obj.aexec()
+                client = query_obj._client
+            return client, query_obj._client
+
+        msg = "1. aexec runs in the caller's event loop with an external client and rate limiter"
+        with self.subTest(msg=msg):
+            limiter = AsyncRateLimiter(config.DATA_API_REQUESTS_PER_SECOND)
+            client, results, closed = asyncio.run(run_with_shared_client(limiter))
+            self.assertEqual([[entry["rcsb_id"] for entry in resD["data"]["entries"]] for resD in results], [["4HHB", "1IYE"], ["2LGI"]])
+            self.assertTrue(all(c is client for c in clients))
+            self.assertTrue(all(lim is limiter for lim in limiters))
+            self.assertFalse(closed)
+
+        msg = "2. async with reuses one client across calls and closes it on exit"
+        with self.subTest(msg=msg):
+            clients.clear()
+            client, client_after_exit = asyncio.run(run_with_context())
+            self.assertEqual(len(clients), 2)
+            self.assertTrue(all(c is client for c in clients))
+            self.assertTrue(client.is_closed)
+            self.assertIsNone(client_after_exit)
+
+    def testBackgroundLoop(self) -> None:
+        clients = []
+        limiters = []
+        threads = []
+
+        def on_request(client, rate_limiter):
+            clients.append(client)
+            limiters.append(rate_limiter)
+            threads.append(threading.current_thread())
+
+        submit = self.fake_submit(on_request=on_request, delay=0.01)
+
+        def run_query(entry_id):
+            query_obj = DataQuery(input_type="entries", input_ids=[entry_id], return_data_list=["exptl.method"])
+            return query_obj.exec()
+
+        with mock.patch.object(DataQuery, "_submit_request", side_effect=submit):
+            msg = "1. Sync queries from many threads share one loop, client and rate limiter"
+            with self.subTest(msg=msg):
+                entry_ids = ["4HHB", "1IYE", "2LGI", "1STP", "2JEF", "1CDG"]
+                with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+                    results = list(executor.map(run_query, entry_ids))
+                self.assertEqual([resD["data"]["entries"][0]["rcsb_id"] for resD in results], entry_ids)
+                self.assertEqual(len(set(map(id, clients))), 1)
+                self.assertEqual(len(set(map(id, limiters))), 1)
+                self.assertEqual(len(set(threads)), 1)
+                self.assertIsNot(threads[0], threading.current_thread())
+
+            msg = "2. A new event loop is used per query when the background loop is turned off"
+            with self.subTest(msg=msg):
+                clients.clear()
+                threads.clear()
+                config.DATA_API_BACKGROUND_LOOP = False
+                try:
+                    run_query("4HHB")
+                    run_query("1IYE")
+                finally:
+                    config.DATA_API_BACKGROUND_LOOP = True
+                self.assertNotEqual(id(clients[0]), id(clients[1]))
+                self.assertTrue(all(thread is threading.current_thread() for thread in threads))
+
+        msg = "3. A replaced client is closed only once the queries using it have finished"
+        with self.subTest(msg=msg):
+            submit = self.fake_submit()
+            used = {}
+
+            async def slow_submit(client, query_body, *args, **kwargs):
+                entry_id = re.findall(r'"(\w+)"', query_body)[0]
+                if entry_id == "4HHB":
+                    await asyncio.sleep(0.3)
+                used[entry_id] = (client, client.is_closed)
+                return await submit(client, query_body, *args, **kwargs)
+
+            timeout = config.API_TIMEOUT
+            with mock.patch.object(DataQuery, "_submit_request", side_effect=slow_submit):
+                with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+                    slow_query = executor.submit(run_query, "4HHB")
+                    time.sleep(0.1)
+                    config.API_TIMEOUT = timeout + 1  # the next query replaces the shared client
+                    try:
+                        run_query("1IYE")
+                    finally:
+                        config.API_TIMEOUT = timeout
+                    self.assertEqual(slow_query.result()["data"]["entries"][0]["rcsb_id"], "4HHB")
+            old_client, closed_in_use = used["4HHB"]
+            self.assertIsNot(old_client, used["1IYE"][0])
+            self.assertFalse(closed_in_use)
+            data_runner.DATA_API_BACKGROUND_LOOP.close()
+            self.assertTrue(old_client.is_closed)
+            self.assertTrue(used["1IYE"][0].is_closed)
+
+    def testStreamingInputIds(self) -> None:
+        input_ids = ["4hhb", "1IYE", "2LGI", "1STP", "2JEF"]
+        requested = []
+        produced = []
+        produced_at_request = []
+        submit = self.fake_submit(requested=requested, on_request=lambda client, rate_limiter: produced_at_request.append(len(produced)))
+
+        def id_generator():
+            for input_id in input_ids:
+                produced.append(input_id)
+                yield input_id
+
+        async def id_async_generator():
+            for input_id in input_ids:
+                await asyncio.sleep(0)
+                yield input_id
+
+        msg = "1. Generator input is consumed lazily, one batch at a time"
+        with self.subTest(msg=msg):
+            query_obj = DataQuery(input_type="entries", input_ids=id_generator(), return_data_list=["exptl.method"])
+            self.assertEqual(len(produced), 1)  # only the first ID is read to build the query
+            with mock.patch.object(query_obj, "_submit_request", side_effect=submit):
+                resD = query_obj.exec(batch_size=2, max_concurrency=1)
+            self.assertEqual(requested, [["4HHB", "1IYE"], ["2LGI", "1STP"], ["2JEF"]])
+            self.assertEqual(produced_at_request, [2, 4, 5])
+            self.assertEqual([entry["rcsb_id"] for entry in resD["data"]["entries"]], [i.upper() for i in input_ids])
+
+        msg = "2. Iterable input can only be executed once"
+        with self.subTest(msg=msg):
+            with self.assertRaises(ValueError):
+                query_obj.exec()
+
+        msg = "3. Async generator input, with singular input_type converted to plural"
+        with self.subTest(msg=msg):
+            requested.clear()
+            query_obj = DataQuery(input_type="entry", input_ids=id_async_generator(), return_data_list=["exptl.method"])
+            self.assertEqual(query_obj.get_input_type(), "entries")
+            with mock.patch.object(query_obj, "_submit_request", side_effect=submit):
+                resD = query_obj.exec(batch_size=2)
+            self.assertEqual(len(requested), 3)
+            self.assertEqual([entry["rcsb_id"] for entry in resD["data"]["entries"]], [i.upper() for i in input_ids])
+
+    def testValidateIds(self) -> None:
+        msg = "1. IDs are uppercased, deduplicated, classified and validated in one pass"
+        with self.subTest(msg=msg):
+            normalized = normalize_ids(["4hhb", "4HHB", "1IYE", "4HHB.A", "4HHB-1.1", "not an id"], input_type="entries")
+            self.assertEqual(normalized.ids, ["4HHB", "1IYE"])
+            self.assertEqual(set(normalized.invalid), {"4HHB.A", "4HHB-1.1", "NOT AN ID"})
+            self.assertEqual(normalized.duplicates, 1)
+            normalized = normalize_ids(["4HHB", "4HHB_1", "4HHB.A", "4HHB-1", "4HHB-1.1", "P69905"])
+            self.assertEqual(list(normalized.kinds), ["entry", "entity", "instance", "assembly", "interface", "uniprot"])
+
+            normalized = normalize_ids(["pdb_00004hhb", "PDB_00004HHB_1", "PDB_00004HHB.A", "PDB_00004HHB-1", "PDB_00004HHB-1.1", "PDB_0004HHB"])
+            self.assertEqual(list(normalized.kinds), ["entry", "entity", "instance", "assembly", "interface"])
+            self.assertEqual(list(normalized.invalid), ["PDB_0004HHB"])
+            self.assertEqual(normalized.record_ids["PDB_00004HHB_1"], "4HHB_1")
+
+        msg = "2. DataQuery drops invalid IDs before making any requests"
+        with self.subTest(msg=msg):
+            query_obj = DataQuery(input_type="entries", input_ids=["4hhb", "4HHB.A", "1iye", "4HHB"], return_data_list=["exptl.method"], validate_ids=True)
+            self.assertEqual(query_obj.get_input_ids(), ["4HHB", "1IYE"])
+            self.assertEqual(list(query_obj.get_invalid_ids()), ["4HHB.A"])
+            self.assertIn('["4HHB", "1IYE"]', query_obj.get_query())
+
+        msg = "3. Error is raised if no IDs are valid"
+        with self.subTest(msg=msg):
+            with self.assertRaises(ValueError):
+                DataQuery(input_type="entries", input_ids=["4HHB.A"], return_data_list=["exptl.method"], validate_ids=True)
+
+        msg = "4. Iterable input_ids are validated as they are consumed"
+        with self.subTest(msg=msg):
+            query_obj = DataQuery(input_type="entries", input_ids=iter(["4HHB.A", "4hhb", "1IYE"]), return_data_list=["exptl.method"], validate_ids=True)
+            self.assertEqual(list(query_obj.get_input_ids()), ["4HHB", "1IYE"])
+            self.assertEqual(list(query_obj.get_invalid_ids()), ["4HHB.A"])
+
+    def testMixedIdQuery(self) -> None:
+        input_types = []
+        clients = set()
+        limiters = set()
+
+        async def submit(client, query_body, semaphores, max_retries, retry_backoff, attempt_times=None, rate_limiter=None):  # pylint: disable=unused-argument
+            input_type = re.search(r"\{\s*(\w+)\(", query_body).group(1)
+            input_types.append(input_type)
+            clients.add(id(client))
+            limiters.add(id(rate_limiter))
+            id_batch = re.findall(r'"([\w.-]+)"', query_body.split(")")[0])
+            # Like the API, answer with the four-character form of extended PDB IDs
+            return {"data": {input_type: [{"rcsb_id": re.sub(r"^PDB_0000", "", input_id)} for input_id in id_batch]}}
+
+        input_ids = ["4HHB", "4hhb_1", "4HHB.A", "4HHB-1", "AF_AFP69905F1", "1IYE", "not an id"]
+        return_data_list = {
+            "entries": ["exptl.method"],
+            "polymer_entities": ["rcsb_polymer_entity.pdbx_description"],
+            "polymer_entity_instances": ["rcsb_polymer_instance_annotation.type"],
+            "assemblies": ["rcsb_assembly_info.polymer_entity_count"],
+        }
+        query_obj = MixedIdQuery(input_ids=input_ids, return_data_list=return_data_list)
+        with mock.patch.object(DataQuery, "_submit_request", side_effect=submit):
+            msg = "1. IDs are routed to one query per input type"
+            with self.subTest(msg=msg):
+                self.assertEqual([query.get_input_type() for query in query_obj.get_queries()], ["entries", "polymer_entities", "polymer_entity_instances", "assemblies"])
+                self.assertEqual(list(query_obj.get_invalid_ids()), ["NOT AN ID"])
+
+            msg = "2. Queries share a client and rate limiter, and results are keyed by input ID"
+            with self.subTest(msg=msg):
+                resD = query_obj.exec()
+                self.assertEqual(sorted(input_types), sorted(return_data_list))
+                self.assertEqual(len(clients), 1)
+                self.assertEqual(len(limiters), 1)
+                self.assertEqual(list(resD), ["4HHB", "4HHB_1", "4HHB.A", "4HHB-1", "AF_AFP69905F1", "1IYE"])
+                self.assertEqual(resD["4HHB.A"], {"rcsb_id": "4HHB.A"})
+
+            msg = "3. Records are matched to extended PDB IDs by the rcsb_id returned for them"
+            with self.subTest(msg=msg):
+                extended_query = MixedIdQuery(input_ids=["pdb_00004hhb", "PDB_00004HHB_1", "4HHB_1"], return_data_list=return_data_list)
+                resD = extended_query.exec()
+                self.assertEqual(resD, {"PDB_00004HHB": {"rcsb_id": "4HHB"}, "PDB_00004HHB_1": {"rcsb_id": "4HHB_1"}, "4HHB_1": {"rcsb_id": "4HHB_1"}})
+
+        msg = "4. The number of queries running at once is bounded by max_concurrency"
+        with self.subTest(msg=msg):
+            running = []
+            most_running = []
+
+            async def aexec(self, **kwargs):  # pylint: disable=unused-argument
+                running.append(self)
+                most_running.append(len(running))
+                await asyncio.sleep(0.01)
+                running.remove(self)
+                return {"data": {"uniprot": {"rcsb_id": self.get_input_ids()[0]}}}
+
+            uniprot_ids = [f"P{i:05d}" for i in range(20)]
+            uniprot_query = MixedIdQuery(input_ids=uniprot_ids, return_data_list=["rcsb_uniprot_protein.name.value"])
+            self.assertEqual(len(uniprot_query.get_queries()), 20)
+            with mock.patch.object(DataQuery, "_async_exec", aexec):
+                resD = uniprot_query.exec(max_concurrency=3)
+            self.assertEqual(max(most_running), 3)
+            self.assertEqual(list(resD), uniprot_ids)
+
+        msg = "5. Requests of all queries share the max_concurrency budget"
+        with self.subTest(msg=msg):
+            in_flight = []
+            most_in_flight = []
+
+            async def respond(request: httpx.Request) -> httpx.Response:
+                in_flight.append(request)
+                most_in_flight.append(len(in_flight))
+                await asyncio.sleep(0.01)
+                in_flight.remove(request)
+                return httpx.Response(200, json={"data": {"entries": [], "uniprot": None}})
+
+            entry_ids = [f"{i}ABC" for i in range(1, 10)]
+            query_obj = MixedIdQuery(input_ids=entry_ids + uniprot_ids[:4], return_data_list={"entries": ["rcsb_id"], "uniprot": ["rcsb_id"]})
+            with use_transport(httpx.MockTransport(respond)):
+                query_obj.exec(batch_size=1, max_concurrency=3)
+            self.assertEqual(len(most_in_flight), 13)
+            self.assertLessEqual(max(most_in_flight), 3)
+
+    def testHoldingsCache(self) -> None:
+        holdings = {
+            "https://data.rcsb.org/rest/v1/holdings/current/entry_ids": (["4HHB", "1IYE", "2LGI"], '"v1"'),
+            "https://data.rcsb.org/rest/v1/holdings/current/ccd_ids": (["ATP", "HEM"], '"v1"'),
+            "https://data.rcsb.org/rest/v1/holdings/current/prd_ids": (["PRD_000001"], '"v1"'),
+        }
+        requested = []
+
+        class FakeClient:
+            async def get(self, url, headers=None, follow_redirects=False):  # pylint: disable=unused-argument
+                requested.append(url)
+                ids, etag = holdings[url]
+                request = httpx.Request("GET", url)
+                if headers.get("If-None-Match") == etag:
+                    return httpx.Response(304, request=request)
+                return httpx.Response(200, json=ids, headers={"ETag": etag}, request=request)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "holdings.json.gz")
+
+            msg = "1. Holdings are downloaded from all endpoints, sorted and saved"
+            with self.subTest(msg=msg):
+                cache = HoldingsCache(path)
+                self.assertFalse(cache.is_fresh(3600))
+                changes = asyncio.run(cache.refresh(client=FakeClient()))
+                self.assertEqual(len(requested), 3)
+                self.assertEqual(cache.get_all_ids(), {"entries": ["1IYE", "2LGI", "4HHB"], "chem_comps": ["ATP", "HEM", "PRD_000001"]})
+                self.assertEqual(changes["entries"].added, ["1IYE", "2LGI", "4HHB"])
+                self.assertTrue(os.path.exists(path))
+
+            msg = "2. Cached holdings are used without any requests"
+            with self.subTest(msg=msg):
+                requested.clear()
+                cache = HoldingsCache(path)
+                self.assertTrue(cache.is_fresh(3600))
+                all_structures = AllStructures(cache=cache)
+                self.assertEqual(all_structures.get_all_ids("entries"), ["1IYE", "2LGI", "4HHB"])
+                self.assertEqual(requested, [])
+
+            msg = "3. Incremental refresh only downloads and applies changed lists"
+            with self.subTest(msg=msg):
+                holdings["https://data.rcsb.org/rest/v1/holdings/current/entry_ids"] = (["4HHB", "2LGI", "7N0R"], '"v2"')
+                changes = asyncio.run(cache.refresh(client=FakeClient(), incremental=True))
+                self.assertEqual(changes["entries"].added, ["7N0R"])
+                self.assertEqual(changes["entries"].removed, ["1IYE"])
+                self.assertEqual(changes["chem_comps"].added, [])
+                self.assertEqual(HoldingsCache(path).get_all_ids()["entries"], ["2LGI", "4HHB", "7N0R"])
+
+    def testPlan(self) -> None:
+        input_ids = [f"{i}ABC" for i in range(250)]
+        query_obj = DataQuery(input_type="entries", input_ids=input_ids, return_data_list=["exptl.method", "rcsb_id"])
+
+        msg = "1. Plan counts batches and requests without recorded timings"
+        with self.subTest(msg=msg), mock.patch("rcsbapi.data.data_plan.DATA_API_TIMING_STATS", TimingStats()):
+            plan = query_obj.plan(batch_size=100, max_concurrency=2)
+            self.assertEqual(plan.input_ids, 250)
+            self.assertEqual(plan.batches, 3)
+            self.assertFalse(plan.based_on_history)
+            self.assertGreater(plan.estimated_seconds, 0)
+            self.assertGreater(plan.estimated_response_bytes, 0)
+            self.assertIn("3 requests", str(plan))
+
+        msg = "2. Recorded timings of the same query shape are used"
+        with self.subTest(msg=msg):
+            stats = TimingStats()
+            # 10 IDs took 2 seconds and 10 kB
+            stats.record(re.sub(r"\[([^]]+)\]", '["1ABC", "2ABC", "3ABC", "4ABC", "5ABC", "6ABC", "7ABC", "8ABC", "9ABC", "10ABC"]', query_obj.get_query()), 2.0, 10_000)
+            with mock.patch("rcsbapi.data.data_plan.DATA_API_TIMING_STATS", stats):
+                plan = query_obj.plan(batch_size=100, max_concurrency=2)
+            self.assertTrue(plan.based_on_history)
+            self.assertEqual(plan.estimated_response_bytes, 250_000)
+            self.assertAlmostEqual(plan.estimated_seconds_per_request, 20.0)
+            # 3 batches, 2 at a time
+            self.assertAlmostEqual(plan.estimated_seconds, 40.0)
+
+        msg = "3. Completed requests are recorded"
+        with self.subTest(msg=msg):
+            stats = TimingStats()
+            response = httpx.Response(200, json={"data": {"entries": []}}, request=httpx.Request("POST", const.DATA_API_ENDPOINT))
+            with mock.patch("rcsbapi.data.data_query.DATA_API_TIMING_STATS", stats), \
+                    mock.patch.object(httpx.AsyncClient, "post", mock.AsyncMock(return_value=response)):
+                query_obj.exec(batch_size=100)
+            recorded = stats.get(DataCache.query_shape(query_obj._query["query"]))
+            self.assertEqual(recorded.requests, 3)
+            self.assertEqual(recorded.ids, 250)
+
+        msg = "4. Lazily consumed input IDs can't be planned"
+        with self.subTest(msg=msg):
+            with self.assertRaises(ValueError):
+                DataQuery(input_type="entries", input_ids=iter(input_ids), return_data_list=["exptl.method"]).plan()
+
+    def testRetryPolicy(self) -> None:
+        url = "https://example.org/api"
+        request = httpx.Request("GET", url)
+
+        def status_error(status_code, headers=None):
+            response = httpx.Response(status_code, headers=headers, request=request)
+            return httpx.HTTPStatusError(f"{status_code}", request=request, response=response)
+
+        msg = "1. Delays are jittered between the minimum backoff and the cap"
+        with self.subTest(msg=msg):
+            policy = RetryPolicy(max_retries=5, retry_backoff=1, max_backoff=10, circuit_breaker=CircuitBreaker())
+            delay = 0.0
+            for _ in range(20):
+                delay = policy.next_delay(delay)
+                self.assertGreaterEqual(delay, 1)
+                self.assertLessEqual(delay, 10)
+
+        msg = "2. Client errors aren't retried, server errors are, and Retry-After is honored"
+        with self.subTest(msg=msg), mock.patch("rcsbapi.retry.time.sleep") as sleep:
+            policy = RetryPolicy(max_retries=3, retry_backoff=1, circuit_breaker=CircuitBreaker())
+            send = mock.Mock(side_effect=status_error(404))
+            with self.assertRaises(httpx.HTTPStatusError):
+                policy.call(send, url)
+            self.assertEqual(send.call_count, 1)
+
+            send = mock.Mock(side_effect=[status_error(503, {"Retry-After": "7"}), status_error(502), "ok"])
+            self.assertEqual(policy.call(send, url), "ok")
+            self.assertEqual(send.call_count, 3)
+            self.assertEqual(sleep.call_args_list[0], mock.call(7.0))
+
+        msg = "3. Circuit opens after consecutive failed requests (not attempts) and closes after a successful trial request"
+        with self.subTest(msg=msg), mock.patch("rcsbapi.retry.time.sleep"), \
+                mock.patch.object(config, "CIRCUIT_BREAKER_THRESHOLD", 3), mock.patch.object(config, "CIRCUIT_BREAKER_RESET_TIMEOUT", 1):
+            breaker = CircuitBreaker()
+            policy = RetryPolicy(max_retries=5, retry_backoff=1, circuit_breaker=breaker)
+            send = mock.Mock(side_effect=httpx.ConnectError("Simulated failure"))
+            for _ in range(3):
+                with self.assertRaises(httpx.ConnectError):
+                    policy.call(send, url)
+            self.assertEqual(send.call_count, 15)
+            with self.assertRaises(CircuitOpenError):
+                policy.call(mock.Mock(return_value="ok"), "https://example.org/other")
+            threading.Event().wait(1.1)  # time.sleep is mocked
+            self.assertEqual(policy.call(mock.Mock(return_value="ok"), url), "ok")
+            breaker.before_request("example.org")
+
+        msg = "4. A failed trial request reopens the circuit without being retried"
+        with self.subTest(msg=msg), mock.patch("rcsbapi.retry.time.sleep"), \
+                mock.patch.object(config, "CIRCUIT_BREAKER_THRESHOLD", 1), mock.patch.object(config, "CIRCUIT_BREAKER_RESET_TIMEOUT", 1):
+            policy = RetryPolicy(max_retries=2, retry_backoff=1, circuit_breaker=CircuitBreaker())
+            send = mock.Mock(side_effect=status_error(503))
+            with self.assertRaises(httpx.HTTPStatusError):
+                policy.call(send, url)
+            threading.Event().wait(1.1)
+            with self.assertRaises(httpx.HTTPStatusError):
+                policy.call(send, url)
+            self.assertEqual(send.call_count, 3)
+            with self.assertRaises(CircuitOpenError):
+                policy.call(send, url)
+
+        msg = "5. Content that fails to decode is retried"
+        with self.subTest(msg=msg), mock.patch("rcsbapi.retry.time.sleep"):
+            policy = RetryPolicy(max_retries=3, retry_backoff=1, circuit_breaker=CircuitBreaker())
+            send = mock.Mock(side_effect=[httpx.DecodingError("Simulated failure", request=request), "ok"])
+            self.assertEqual(policy.call(send, url), "ok")
+            self.assertEqual(send.call_count, 2)
+
+        msg = "6. Data API requests are retried by the policy"
+        with self.subTest(msg=msg), mock.patch("rcsbapi.retry.asyncio.sleep", mock.AsyncMock()):
+            data_request = httpx.Request("POST", const.DATA_API_ENDPOINT)
+            responses = [
+                httpx.Response(503, request=data_request),
+                httpx.Response(200, json={"data": {"entries": [{"rcsb_id": "4HHB"}]}}, request=data_request),
+            ]
+            query_obj = DataQuery(input_type="entries", input_ids=["4HHB"], return_data_list=["rcsb_id"])
+            with mock.patch.object(httpx.AsyncClient, "post", mock.AsyncMock(side_effect=responses)) as post:
+                self.assertEqual(query_obj.exec(max_retries=3), {"data": {"entries": [{"rcsb_id": "4HHB"}]}})
+            self.assertEqual(post.call_count, 2)
+
+    def testHedgedRequests(self) -> None:
+        msg = "1. A slow request is duplicated after the delay, the first response is used and the loser is cancelled"
+        with self.subTest(msg=msg):
+            cancelled = []
+
+            async def slow():
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    cancelled.append("slow")
+                    raise
+                return "slow"
+
+            async def fast():
+                return "fast"
+
+            async def run():
+                start = time.monotonic()
+                result = await hedged(slow, fast, 0.05)
+                await asyncio.sleep(0)
+                return result, time.monotonic() - start
+
+            result, elapsed = asyncio.run(run())
+            self.assertEqual(result, "fast")
+            self.assertLess(elapsed, 1)
+            self.assertEqual(cancelled, ["slow"])
+
+        msg = "2. No duplicate is sent if the request completes in time, and an error is raised only if both fail"
+        with self.subTest(msg=msg):
+            hedge = mock.AsyncMock(return_value="hedge")
+            self.assertEqual(asyncio.run(hedged(mock.AsyncMock(return_value="primary"), hedge, 1)), "primary")
+            hedge.assert_not_called()
+
+            async def failing():
+                await asyncio.sleep(0.1)
+                raise httpx.ConnectError("Simulated failure")
+
+            with self.assertRaises(httpx.ConnectError):
+                asyncio.run(hedged(failing, failing, 0.01))
+
+        msg = "3. DataQuery hedges at the configured percentile of recent latencies, counting hedges against the rate limit"
+        with self.subTest(msg=msg):
+            tracker = LatencyTracker(min_samples=5)
+            for _ in range(10):
+                tracker.record(0.05)
+            data_request = httpx.Request("POST", const.DATA_API_ENDPOINT)
+            delays = [5, 0]
+
+            async def post(*args, **kwargs):  # pylint: disable=unused-argument
+                await asyncio.sleep(delays.pop(0))
+                return httpx.Response(200, json={"data": {"entries": [{"rcsb_id": "4HHB"}]}}, request=data_request)
+
+            limiter = AsyncRateLimiter(config.DATA_API_REQUESTS_PER_SECOND)
+            query_obj = DataQuery(input_type="entries", input_ids=["4HHB"], return_data_list=["rcsb_id"])
+            with mock.patch("rcsbapi.data.data_query.DATA_API_LATENCY_TRACKER", tracker), \
+                    mock.patch.object(config, "DATA_API_HEDGE_PERCENTILE", 95), \
+                    mock.patch.object(limiter, "acquire", wraps=limiter.acquire) as acquire, \
+                    mock.patch.object(httpx.AsyncClient, "post", mock.AsyncMock(side_effect=post)) as client_post:
+                start = time.monotonic()
+                response = asyncio.run(query_obj.aexec(rate_limiter=limiter))
+            self.assertEqual(response, {"data": {"entries": [{"rcsb_id": "4HHB"}]}})
+            self.assertLess(time.monotonic() - start, 2)
+            self.assertEqual(client_post.call_count, 2)
+            self.assertEqual(acquire.call_count, 2)
+
+        msg = "4. An error response to the primary request doesn't win over a successful hedged request"
+        with self.subTest(msg=msg):
+            tracker = LatencyTracker(min_samples=5)
+            for _ in range(10):
+                tracker.record(0.05)
+            responses = [(0.2, 503), (0.3, 200)]
+
+            async def post_error(*args, **kwargs):  # pylint: disable=unused-argument
+                delay, status_code = responses.pop(0)
+                await asyncio.sleep(delay)
+                if status_code != 200:
+                    return httpx.Response(status_code, request=data_request)
+                return httpx.Response(200, json={"data": {"entries": [{"rcsb_id": "4HHB"}]}}, request=data_request)
+
+            query_obj = DataQuery(input_type="entries", input_ids=["4HHB"], return_data_list=["rcsb_id"])
+            with mock.patch("rcsbapi.data.data_query.DATA_API_LATENCY_TRACKER", tracker), \
+                    mock.patch.object(config, "DATA_API_HEDGE_PERCENTILE", 95), \
+                    mock.patch.object(httpx.AsyncClient, "post", mock.AsyncMock(side_effect=post_error)) as client_post:
+                response = query_obj.exec(max_retries=1)
+            self.assertEqual(response, {"data": {"entries": [{"rcsb_id": "4HHB"}]}})
+            self.assertEqual(client_post.call_count, 2)
+
+        msg = "5. Requests overtaken by hedged requests keep their latency, so hedging at p95 hedges about 5% of requests"
+        with self.subTest(msg=msg):
+            tracker = LatencyTracker(window=200, min_samples=20)
+            rng = random.Random(0)
+
+            async def post_lognormal(*args, json=None, **kwargs):  # pylint: disable=unused-argument,redefined-outer-name
+                await asyncio.sleep(rng.lognormvariate(math.log(0.01), 1))
+                entry_id = re.findall(r'"(\w+)"', json["query"].split(")")[0])[0]
+                return httpx.Response(200, json={"data": {"entries": [{"rcsb_id": entry_id}]}}, request=data_request)
+
+            input_ids = [str(1000 + i) for i in range(2000)]
+            query_obj = DataQuery(input_type="entries", input_ids=input_ids, return_data_list=["rcsb_id"])
+            with mock.patch("rcsbapi.data.data_query.DATA_API_LATENCY_TRACKER", tracker), \
+                    mock.patch.object(config, "DATA_API_HEDGE_PERCENTILE", 95), \
+                    mock.patch.object(httpx.AsyncClient, "post", mock.AsyncMock(side_effect=post_lognormal)) as client_post:
+                asyncio.run(query_obj.aexec(batch_size=1, max_concurrency=20, rate_limiter=AsyncRateLimiter(10000)))
+            hedge_rate = (client_post.call_count - len(input_ids)) / len(input_ids)
+            self.assertLess(hedge_rate, 0.085)
+
+    def testInstrumentation(self) -> None:
+        msg = "1. Histograms estimate percentiles from their buckets"
+        with self.subTest(msg=msg):
+            histogram = Histogram()
+            for value in [0.01] * 90 + [3.0] * 10:
+                histogram.observe(value)
+            self.assertEqual(histogram.percentile(50), 0.01)
+            self.assertEqual(histogram.percentile(99), 3.0)
+            self.assertEqual(histogram.snapshot()["count"], 100)
+            self.assertIsNone(Histogram().percentile(50))
+
+        msg = "2. Data API requests emit start, end and retry events"
+        with self.subTest(msg=msg), mock.patch("rcsbapi.retry.asyncio.sleep", mock.AsyncMock()):
+            events = []
+            metrics = MetricsRecorder()
+            data_request = httpx.Request("POST", const.DATA_API_ENDPOINT)
+            responses = [
+                httpx.Response(503, request=data_request),
+                httpx.Response(200, json={"data": {"entries": [{"rcsb_id": "4HHB"}, {"rcsb_id": "1IYE"}]}}, request=data_request),
+            ]
+            INSTRUMENTATION.add_listener(events.append)
+            INSTRUMENTATION.add_listener(metrics)
+            try:
+                query_obj = DataQuery(input_type="entries", input_ids=["4HHB", "1IYE"], return_data_list=["rcsb_id"])
+                with mock.patch.object(httpx.AsyncClient, "post", mock.AsyncMock(side_effect=responses)):
+                    query_obj.exec(max_retries=3)
+            finally:
+                INSTRUMENTATION.remove_listener(events.append)
+                INSTRUMENTATION.remove_listener(metrics)
+            self.assertFalse(INSTRUMENTATION.enabled)
+            self.assertEqual([event.kind for event in events], [REQUEST_START, REQUEST_END, RETRY, REQUEST_START, REQUEST_END])
+            self.assertEqual(events[1].status_code, 503)
+            self.assertEqual(events[4].batch_size, 2)
+            self.assertGreater(events[4].bytes, 0)
+            self.assertEqual(metrics.get_counter("data", "requests"), 2)
+            self.assertEqual(metrics.get_counter("data", "retries"), 1)
+            self.assertEqual(metrics.get_counter("data", "status_200"), 1)
+            self.assertEqual(metrics.get_histogram("data", "duration").count, 2)
+            self.assertIn("data: ", metrics.summary())
+
+        msg = "3. Failing listeners don't break requests"
+        with self.subTest(msg=msg):
+            def failing_listener(event):
+                raise RuntimeError("Simulated listener failure")
+
+            INSTRUMENTATION.add_listener(failing_listener)
+            try:
+                with self.assertLogs("rcsbapi.instrumentation", level="WARNING"):
+                    with INSTRUMENTATION.request("search", "https://example.org") as trace:
+                        trace.response = httpx.Response(200, content=b"{}")
+            finally:
+                INSTRUMENTATION.remove_listener(failing_listener)
+
+    def testTransport(self) -> None:
+        query_obj = DataQuery(input_type="entries", input_ids=["4HHB"], return_data_list=["rcsb_id"])
+        expected = {"data": {"entries": [{"rcsb_id": "4HHB"}]}}
+
+        def server(request):
+            return httpx.Response(200, json=expected)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cassette_path = os.path.join(tmp_dir, "responses.json")
+
+            msg = "1. Responses are recorded through the installed transport"
+            with self.subTest(msg=msg):
+                cassette = Cassette(cassette_path)
+                recorder = RecordTransport(cassette)
+                with mock.patch.object(httpx.AsyncHTTPTransport, "handle_async_request", mock.AsyncMock(side_effect=server)):
+                    with use_transport(recorder):
+                        self.assertEqual(query_obj.exec(), expected)
+                self.assertEqual(len(cassette), 1)
+                cassette.save()
+
+            msg = "2. Recorded responses are replayed without network access"
+            with self.subTest(msg=msg):
+                with use_transport(ReplayTransport(Cassette(cassette_path))):
+                    self.assertEqual(query_obj.exec(), expected)
+                    with self.assertRaises(ValueError):
+                        DataQuery(input_type="entries", input_ids=["1IYE"], return_data_list=["rcsb_id"]).exec(max_retries=1)
+
+            msg = "3. Simulated rate limits are answered with 429 and Retry-After"
+            with self.subTest(msg=msg):
+                replay = ReplayTransport(Cassette(cassette_path), requests_per_second=1)
+                request = httpx.Request("POST", const.DATA_API_ENDPOINT, json={"query": query_obj.get_query()})
+                self.assertEqual(replay.handle_request(request).status_code, 200)
+                response = replay.handle_request(request)
+                self.assertEqual(response.status_code, 429)
+                self.assertIn("Retry-After", response.headers)
+
+            msg = "4. The local stand-in server serves recorded responses over HTTP"
+            with self.subTest(msg=msg):
+                fake_server = start_server(Cassette(cassette_path), latency=0.01)
+                try:
+                    with use_transport(RedirectTransport(f"http://127.0.0.1:{fake_server.server_address[1]}")):
+                        self.assertEqual(query_obj.exec(), expected)
+                finally:
+                    fake_server.shutdown()
+
+        msg = "5. Clients don't close the installed transport, and synchronous requests share one client"
+        with self.subTest(msg=msg):
+            transport = httpx.MockTransport(server)
+
+            async def use_async_client():
+                async with async_client() as client:
+                    return (await client.get(const.DATA_API_ENDPOINT)).json()
+
+            with mock.patch.object(transport, "close") as close, mock.patch.object(transport, "aclose", mock.AsyncMock()) as aclose, \
+                    mock.patch("rcsbapi.transport.httpx.Client", wraps=httpx.Client) as client_class, use_transport(transport):
+                self.assertEqual(asyncio.run(use_async_client()), expected)
+                for _ in range(2):
+                    self.assertEqual(send_request("GET", const.DATA_API_ENDPOINT).json(), expected)
+            close.assert_not_called()
+            aclose.assert_not_called()
+            self.assertEqual(client_class.call_count, 1)
+
 
 def buildQuery() -> unittest.TestSuite:
     suiteSelect = unittest.TestSuite()
@@ -636,6 +1726,23 @@ def buildQuery() -> unittest.TestSuite:
     suiteSelect.addTest(QueryTests("testSearchDataNotebook"))
     suiteSelect.addTest(QueryTests("testConfigChange"))
     suiteSelect.addTest(QueryTests("testAllStructures"))
+    suiteSelect.addTest(QueryTests("testToColumns"))
+    suiteSelect.addTest(QueryTests("testCheckpoint"))
+    suiteSelect.addTest(QueryTests("testAllowPartial"))
+    suiteSelect.addTest(QueryTests("testBisectErrors"))
+    suiteSelect.addTest(QueryTests("testCache"))
+    suiteSelect.addTest(QueryTests("testCoalesceRequests"))
+    suiteSelect.addTest(QueryTests("testAexec"))
+    suiteSelect.addTest(QueryTests("testBackgroundLoop"))
+    suiteSelect.addTest(QueryTests("testStreamingInputIds"))
+    suiteSelect.addTest(QueryTests("testValidateIds"))
+    suiteSelect.addTest(QueryTests("testMixedIdQuery"))
+    suiteSelect.addTest(QueryTests("testHoldingsCache"))
+    suiteSelect.addTest(QueryTests("testPlan"))
+    suiteSelect.addTest(QueryTests("testRetryPolicy"))
+    suiteSelect.addTest(QueryTests("testHedgedRequests"))
+    suiteSelect.addTest(QueryTests("testInstrumentation"))
+    suiteSelect.addTest(QueryTests("testTransport"))
     return suiteSelect
 
 
@@ -500,6 +500,26 @@ class SchemaTests(unittest.TestCase):
 
             self.assertEqual(len(weigh_paths), 5)
 
+    def testSingularIdArgs(self) -> None:
+        msg = "1. Singular input IDs are split into arguments on their last separator"
+        with self.subTest(msg=msg):
+            for input_type, input_id, args in [
+                ("polymer_entity", "PDB_00004HHB_1", ['entry_id: "PDB_00004HHB"', 'entity_id: "1"']),
+                ("polymer_entity", "AF_AFP69905F1_1", ['entry_id: "AF_AFP69905F1"', 'entity_id: "1"']),
+                ("polymer_entity_instance", "PDB_00004HHB.A", ['entry_id: "PDB_00004HHB"', 'asym_id: "A"']),
+                ("assembly", "PDB_00004HHB-1", ['entry_id: "PDB_00004HHB"', 'assembly_id: "1"']),
+                ("interface", "PDB_00004HHB-1.2", ['entry_id: "PDB_00004HHB"', 'assembly_id: "1"', 'interface_id: "2"']),
+                ("interface", "4HHB-1.2", ['entry_id: "4HHB"', 'assembly_id: "1"', 'interface_id: "2"']),
+            ]:
+                query = DATA_SCHEMA.construct_query(input_type=input_type, return_data_list=["rcsb_id"], input_ids=[input_id])
+                for arg in args:
+                    self.assertIn(arg, query["query"])
+
+        msg = "2. Extended PDB IDs with too few characters are rejected"
+        with self.subTest(msg=msg):
+            with self.assertRaises(ValueError):
+                DATA_SCHEMA.construct_query(input_type="polymer_entity", return_data_list=["rcsb_id"], input_ids=["PDB_0004HHB_1"])
+
 
 def buildSchema() -> unittest.TestSuite:
     suiteSelect = unittest.TestSuite()
@@ -514,6 +534,7 @@ def buildSchema() -> unittest.TestSuite:
     suiteSelect.addTest(SchemaTests("testDescription"))
     suiteSelect.addTest(SchemaTests("testFindFieldNames"))
     suiteSelect.addTest(SchemaTests("testWeigh"))
+    suiteSelect.addTest(SchemaTests("testSingularIdArgs"))
     return suiteSelect
 
 
@@ -1,6 +1,12 @@
 import unittest
 import os
 import logging
+from unittest import mock
+import httpx
+from rcsbapi.config import config
+from rcsbapi.instrumentation import INSTRUMENTATION, REQUEST_START, RETRY
+from rcsbapi.retry import CircuitBreaker
+from rcsbapi.transport import Cassette, RecordTransport, ReplayTransport, use_transport
 from rcsbapi.model import ModelQuery
 
 logging.basicConfig(level=logging.WARNING, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
@@ -207,6 +213,50 @@ class ModelQueryTests(unittest.TestCase):
             except Exception as e:
                 logger.error("Get multiple structures query failed with exception: %s", e)
 
+    def test_retry(self) -> None:
+        content = "data_4HHB\n_atom_site.Cartn_x\n"
+        cassette = Cassette()
+        with use_transport(RecordTransport(cassette, httpx.MockTransport(lambda request: httpx.Response(200, text=content)))):
+            self.assertEqual(self.model_query.get_full_structure(entry_id="4HHB"), content)
+        events = []
+        INSTRUMENTATION.add_listener(events.append)
+        try:
+            msg = "1. Server errors are retried through the transport"
+            with self.subTest(msg=msg), mock.patch("rcsbapi.retry.CIRCUIT_BREAKER", CircuitBreaker()), mock.patch("rcsbapi.retry.time.sleep") as sleep:
+                logger.info("Running subtest %s", msg)
+                replay = ReplayTransport(cassette, error_rate=1.0)
+                sleep.side_effect = lambda delay: setattr(replay, "error_rate", 0.0)  # the server recovers while waiting
+                events.clear()
+                with use_transport(replay):
+                    self.assertEqual(ModelQuery(max_retries=3).get_full_structure(entry_id="4HHB"), content)
+                self.assertEqual(sleep.call_count, 1)
+                self.assertEqual([(event.api, event.status_code) for event in events if event.kind == RETRY], [("model", 503)])
+
+            msg = "2. Rate-limited requests wait for Retry-After"
+            with self.subTest(msg=msg), mock.patch("rcsbapi.retry.CIRCUIT_BREAKER", CircuitBreaker()), mock.patch("rcsbapi.retry.time.sleep") as sleep:
+                logger.info("Running subtest %s", msg)
+                replay = ReplayTransport(cassette, requests_per_second=1)
+                sleep.side_effect = lambda delay: setattr(replay, "requests_per_second", None)
+                model_query = ModelQuery(retry_backoff=5)
+                with use_transport(replay):
+                    model_query.get_full_structure(entry_id="4HHB")
+                    self.assertEqual(model_query.get_full_structure(entry_id="4HHB"), content)
+                self.assertEqual(sleep.call_count, 1)
+                self.assertLessEqual(sleep.call_args[0][0], 1)  # Retry-After, rather than the backoff of at least 5 seconds
+
+            msg = "3. Circuit opens after repeated failed requests, and requests fail without being sent"
+            with self.subTest(msg=msg), mock.patch("rcsbapi.retry.CIRCUIT_BREAKER", CircuitBreaker()), mock.patch("rcsbapi.retry.time.sleep"), \
+                    mock.patch.object(config, "CIRCUIT_BREAKER_THRESHOLD", 1):
+                logger.info("Running subtest %s", msg)
+                model_query = ModelQuery(max_retries=2)
+                events.clear()
+                with use_transport(ReplayTransport(cassette, error_rate=1.0)):
+                    self.assertIsNone(model_query.get_full_structure(entry_id="4HHB"))
+                    self.assertIsNone(model_query.get_full_structure(entry_id="4HHB"))
+                self.assertEqual([event.kind for event in events].count(REQUEST_START), 2)
+        finally:
+            INSTRUMENTATION.remove_listener(events.append)
+
 
 def buildQuery() -> unittest.TestSuite:
     suiteSelect = unittest.TestSuite()
@@ -221,6 +271,7 @@ def buildQuery() -> unittest.TestSuite:
     suiteSelect.addTest(ModelQueryTests("test_download_file"))
     suiteSelect.addTest(ModelQueryTests("test_download_compressed_file"))
     suiteSelect.addTest(ModelQueryTests("test_get_multiple_structures"))
+    suiteSelect.addTest(ModelQueryTests("test_retry"))
     return suiteSelect
 
 
@@ -11,18 +11,27 @@
 Tests for all functions of the search file.
 """
 
+import asyncio
+import json
 import logging
 import time
+import threading
 import unittest
+from unittest import mock
 import os
+import tempfile
 from itertools import islice
 import httpx
 from rcsbapi.const import const
 from rcsbapi.config import config
+from rcsbapi.transport import Cassette, RecordTransport, ReplayTransport, use_transport
+from rcsbapi.data import DataQuery
 from rcsbapi.search import search_attributes as attrs
 from rcsbapi.search import group
 from rcsbapi.search import TextQuery, Attr, AttributeQuery, ChemSimilarityQuery, SeqSimilarityQuery, SeqMotifQuery, StructSimilarityQuery, StructMotifResidue, StructMotifQuery
 from rcsbapi.search import Facet, FacetRange, TerminalFilter, GroupFilter, FilterFacet, Sort, GroupBy, RankingCriteriaType
+from rcsbapi.search import SearchCache, ResultSet
+from rcsbapi.search.search_optimizer import canonical_key
 from rcsbapi.search.search_query import PartialQuery, fileUpload, Session, Value, Terminal, Group, NestedAttributeQuery, NestedAttributeQueryChecker
 
 logging.basicConfig(level=logging.WARNING, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
@@ -2036,6 +2045,413 @@ class SearchTests(unittest.TestCase):
             with self.assertLogs(level='WARNING'):
                 NestedAttributeQueryChecker(query).validate()
 
+    def testFirstPageReuse(self) -> None:
+        """Test that the first page of results is requested once, and reused when iterating the session"""
+        requests = []
+        total, rows = 25, 10
+
+        def respond(request: httpx.Request) -> httpx.Response:
+            start = json.loads(request.content)["request_options"]["paginate"]["start"]
+            requests.append(start)
+            result_set = [f"{i:04d}" for i in range(start, min(start + rows, total))]
+            return httpx.Response(200, json={"total_count": total, "result_set": result_set})
+
+        q1 = AttributeQuery("rcsb_entry_container_identifiers.entry_id", operator="exact_match", value="4HHB")
+        with use_transport(httpx.MockTransport(respond)):
+            session = q1.exec(rows=rows)
+            self.assertEqual(session.count, total)
+            self.assertEqual(len(list(session)), total)
+            self.assertEqual(requests, [0, 10, 20])
+            # Neither iquery nor to_dict request the first page again, nor do they modify the stored response
+            self.assertEqual(len(session.iquery()), total)
+            self.assertEqual(len(session.to_dict()["result_set"]), rows)
+            self.assertEqual(requests, [0, 10, 20, 10, 20])
+            # The first page can be requested again explicitly
+            session.to_dict(refresh=True)
+            session.refresh()
+            self.assertEqual(len(list(session)), total)
+            self.assertEqual(requests, [0, 10, 20, 10, 20, 0, 0, 10, 20])
+            # Changing the returned response doesn't change the stored first page
+            response = session.to_dict()
+            del response["result_set"][5:]
+            response["total_count"] = 5
+            self.assertEqual(len(list(session)), total)
+            self.assertEqual(len(session.iquery()), total)
+            self.assertEqual(len(session.result_set()), total)
+
+    def testConcurrentPaging(self) -> None:
+        """Test that pages requested concurrently are returned in order, ahead of consumption"""
+        total, rows = 95, 10
+        in_flight, max_in_flight = [0], [0]
+        lock = threading.Lock()
+
+        def respond(request: httpx.Request) -> httpx.Response:
+            start = json.loads(request.content)["request_options"]["paginate"]["start"]
+            with lock:
+                in_flight[0] += 1
+                max_in_flight[0] = max(max_in_flight[0], in_flight[0])
+            # Later pages respond faster, to check that results are still returned in order
+            threading.Event().wait(0.05 if start == rows else 0.01)
+            with lock:
+                in_flight[0] -= 1
+            result_set = [f"{i:04d}" for i in range(start, min(start + rows, total))]
+            return httpx.Response(200, json={"total_count": total, "result_set": result_set})
+
+        q1 = AttributeQuery("rcsb_entry_container_identifiers.entry_id", operator="exact_match", value="4HHB")
+        with use_transport(httpx.MockTransport(respond)):
+            expected = [f"{i:04d}" for i in range(total)]
+            self.assertEqual(list(q1(rows=rows, max_concurrency=4)), expected)
+            self.assertGreater(max_in_flight[0], 1)
+            self.assertLessEqual(max_in_flight[0], 4)
+            self.assertEqual(q1(rows=rows, max_concurrency=4).iquery(), expected)
+            # Stopping early doesn't request the remaining pages
+            max_in_flight[0] = 0
+            self.assertEqual(list(islice(q1(rows=rows, max_concurrency=1), 15)), expected[:15])
+            self.assertEqual(max_in_flight[0], 1)
+        with self.assertRaises(ValueError):
+            config.SEARCH_API_MAX_CONCURRENT_REQUESTS = 0
+
+    def testRateLimit(self) -> None:
+        """Test that a session that reached the rate limit sleeps until the end of the current window"""
+        q1 = AttributeQuery("rcsb_entry_container_identifiers.entry_id", operator="exact_match", value="4HHB")
+        session = Session(q1)
+        session._request_count = session._requests_per_window_limit
+        session._last_request_time = time.monotonic() - 4
+        with mock.patch("rcsbapi.search.search_query.time.sleep") as sleep:
+            session._check_rate_limit()
+        sleep.assert_called_once()
+        self.assertAlmostEqual(sleep.call_args[0][0], session._request_limit_time_interval - 4, delta=0.5)
+        self.assertEqual(session._request_count, 1)
+
+    def testAsyncSession(self) -> None:
+        """Test evaluating a query and iterating over its results in an event loop"""
+        total, rows = 45, 10
+        requests = []
+
+        def respond(request: httpx.Request) -> httpx.Response:
+            params = json.loads(request.content)
+            if "paginate" not in params["request_options"]:
+                return httpx.Response(200, json={"total_count": total})
+            start = params["request_options"]["paginate"]["start"]
+            requests.append(start)
+            result_set = [f"{i:04d}" for i in range(start, min(start + rows, total))]
+            return httpx.Response(200, json={"total_count": total, "result_set": result_set, "facets": [{"name": "method"}]})
+
+        q1 = AttributeQuery("rcsb_entry_container_identifiers.entry_id", operator="exact_match", value="4HHB")
+
+        async def run():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(respond)) as client:
+                session = await q1.aexec(rows=rows, max_concurrency=3, client=client)
+                self.assertEqual(session.count, total)
+                self.assertEqual(session.facets, [{"name": "method"}])
+                self.assertEqual(await session.acount(), total)
+                results = [rcsb_id async for rcsb_id in session]
+                count = await q1.aexec(return_counts=True, client=client)
+            return results, count
+
+        results, count = asyncio.run(run())
+        self.assertEqual(results, [f"{i:04d}" for i in range(total)])
+        self.assertEqual(count, total)
+        self.assertEqual(sorted(requests), [0, 10, 20, 30, 40])
+
+        # Without a client, requests go through the current transport
+        with use_transport(httpx.MockTransport(respond)):
+            session = asyncio.run(q1.aexec(rows=rows))
+            self.assertEqual(session.count, total)
+
+        # The session opens one client and reuses it for every request, until the session is closed. Closing the
+        # iterator after stopping early cancels pending page requests.
+        async def stop_early():
+            clients = []
+
+            def make_client(**kwargs):
+                clients.append(httpx.AsyncClient(transport=httpx.MockTransport(respond), **kwargs))
+                return clients[-1]
+
+            with mock.patch("rcsbapi.transport.async_client", make_client):
+                self.assertEqual(await q1.aexec(return_counts=True), total)
+                self.assertEqual(len(clients), 1)
+                self.assertTrue(clients[0].is_closed)  # the session isn't returned, so its client is closed
+                async with await q1.aexec(rows=rows, max_concurrency=3) as session:
+                    self.assertEqual(await session.acount(refresh=True), total)
+                    results = session.__aiter__()
+                    try:
+                        async for rcsb_id in results:
+                            if rcsb_id == "0012":
+                                break
+                    finally:
+                        await results.aclose()
+                    self.assertEqual(len(clients), 2)
+                    self.assertFalse(clients[1].is_closed)
+            pending = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            return clients, pending
+
+        with use_transport(httpx.MockTransport(respond)):
+            clients, pending = asyncio.run(stop_early())
+        self.assertEqual(len(clients), 2)
+        self.assertTrue(clients[1].is_closed)
+        self.assertEqual(pending, [])
+
+        # A session used in another event loop gets a new client, and closes the one it opened in the previous loop
+        clients = []
+
+        def make_client(**kwargs):
+            clients.append(httpx.AsyncClient(transport=httpx.MockTransport(respond), **kwargs))
+            return clients[-1]
+
+        async def iterate(session):
+            async with session:
+                return [rcsb_id async for rcsb_id in session]
+
+        with mock.patch("rcsbapi.transport.async_client", make_client):
+            session = asyncio.run(q1.aexec(rows=rows))
+            self.assertEqual(len(asyncio.run(iterate(session))), total)
+        self.assertEqual(len(clients), 2)
+        self.assertTrue(all(client.is_closed for client in clients))
+
+    def testSearchCache(self) -> None:
+        """Test caching Search API responses in memory and on disk"""
+        total, rows = 15, 10
+        requests = []
+
+        def respond(request: httpx.Request) -> httpx.Response:
+            params = json.loads(request.content)
+            paginate = params["request_options"].get("paginate")
+            requests.append(paginate["start"] if paginate else "count")
+            if paginate is None:
+                return httpx.Response(200, json={"total_count": total})
+            result_set = [f"{i:04d}" for i in range(paginate["start"], min(paginate["start"] + paginate["rows"], total))]
+            return httpx.Response(200, json={"total_count": total, "result_set": result_set, "facets": [{"name": "method"}]})
+
+        q1 = AttributeQuery("rcsb_entry_container_identifiers.entry_id", operator="exact_match", value="4HHB")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "search_cache.sqlite")
+            cache = SearchCache(path, ttl=3600)
+            with use_transport(httpx.MockTransport(respond)):
+                self.assertEqual(len(list(q1(rows=rows, cache=cache))), total)
+                self.assertEqual(q1(return_counts=True, cache=cache), total)
+                self.assertEqual(requests, [0, 10, "count"])
+                # Sessions have different query IDs, but share cached pages, counts and facets
+                session = q1(rows=rows, cache=cache)
+                self.assertEqual((session.count, session.facets), (total, [{"name": "method"}]))
+                self.assertEqual(len(list(session)), total)
+                self.assertEqual(q1(return_counts=True, cache=cache), total)
+                # Different paging or options are cached separately
+                self.assertEqual(len(list(q1(rows=5, cache=cache))), total)
+                self.assertEqual(requests, [0, 10, "count", 0, 5, 10])
+                cache.close()
+                # Responses persist on disk
+                cache = SearchCache(path, ttl=3600)
+                self.assertEqual(len(list(q1(rows=rows, cache=cache))), total)
+                self.assertEqual(len(requests), 6)
+
+                # Async sessions share the cache
+                async def arun():
+                    session = await q1.aexec(rows=rows, cache=cache)
+                    return [rcsb_id async for rcsb_id in session]
+                self.assertEqual(len(asyncio.run(arun())), total)
+                self.assertEqual(len(requests), 6)
+                # Expired responses are requested again
+                cache.ttl = 0
+                threading.Event().wait(0.01)
+                self.assertEqual(len(list(q1(rows=rows, cache=cache))), total)
+                self.assertEqual(len(requests), 8)
+            cache.close()
+
+        # The least recently used responses are evicted from memory
+        cache = SearchCache(max_memory_size=100)
+        params = Session(q1)._make_params()
+        cache.put(params, {"total_count": 1, "result_set": ["4HHB"]})
+        self.assertEqual(cache.get(params), {"total_count": 1, "result_set": ["4HHB"]})
+        cache.put(params, {"total_count": 1, "result_set": ["X" * 200]})
+        self.assertIsNone(cache.get(params))
+
+        # Refreshing a session requests the first page again instead of reading it from the cache
+        requests.clear()
+        cache = SearchCache()
+        with use_transport(httpx.MockTransport(respond)):
+            session = q1(rows=rows, cache=cache)
+            self.assertEqual(requests, [0])
+            session.refresh()
+            self.assertEqual(session.to_dict()["total_count"], total)
+            self.assertEqual(session.to_dict(refresh=True)["total_count"], total)
+            self.assertEqual(session.iquery(limit=5, refresh=True), [f"{i:04d}" for i in range(5)])
+            self.assertEqual(requests, [0, 0, 0, 0])
+
+            async def arefresh():
+                async with await q1.aexec(rows=rows, cache=cache) as session:
+                    return await session.acount(refresh=True)
+            self.assertEqual(asyncio.run(arefresh()), total)
+            self.assertEqual(requests, [0, 0, 0, 0, 0])
+            # Refreshed responses are still cached for other sessions
+            self.assertEqual(q1(rows=rows, cache=cache).count, total)
+            self.assertEqual(len(requests), 5)
+
+    def testOptimize(self) -> None:
+        """Test simplifying query trees into canonical form"""
+        xray = AttributeQuery("exptl.method", operator="exact_match", value="X-RAY DIFFRACTION")
+        em = AttributeQuery("exptl.method", operator="exact_match", value="ELECTRON MICROSCOPY")
+        nmr = AttributeQuery("exptl.method", operator="in", value=["SOLUTION NMR", "X-RAY DIFFRACTION"])
+        human = AttributeQuery("rcsb_entity_source_organism.scientific_name", operator="exact_match", value="Homo sapiens")
+        text = TextQuery("hemoglobin")
+
+        # Equality terminals combined with OR are merged into "in", duplicates are removed and groups flattened
+        optimized = Group("and", [Group("and", [text, (xray | em) | nmr]), text, Group("or", [])]).optimize()
+        self.assertIsInstance(optimized, Group)
+        assert isinstance(optimized, Group)
+        self.assertEqual(optimized.operator, "and")
+        nodes = list(optimized.nodes)
+        self.assertEqual(len(nodes), 2)
+        merged = [node for node in nodes if isinstance(node, Terminal) and node.params.get("operator") == "in"]
+        self.assertEqual(merged[0].params["value"], ["ELECTRON MICROSCOPY", "SOLUTION NMR", "X-RAY DIFFRACTION"])
+
+        # Negated equality terminals combined with AND are merged, but not those combined with OR
+        self.assertEqual((~xray & ~em).optimize().params, {"attribute": "exptl.method", "operator": "in", "negation": True, "value": ["ELECTRON MICROSCOPY", "X-RAY DIFFRACTION"]})
+        self.assertEqual(len(list((~xray | ~em).optimize().nodes)), 2)
+        self.assertEqual(len(list((xray & em).optimize().nodes)), 2)
+        self.assertEqual(len(list((xray | human).optimize().nodes)), 2)
+
+        # Equivalent queries have the same canonical form, and nested groups are kept as they are
+        self.assertEqual(canonical_key(xray | em | human), canonical_key(Group("or", [human, Group("or", [em, xray, em])])))
+        self.assertNotEqual(canonical_key(xray | em), canonical_key(xray & em))
+        nested = group(xray & em)
+        self.assertTrue(any(node is nested for node in (nested | human).optimize().nodes))
+        with self.assertRaises(ValueError):
+            Group("and", [Group("or", [])]).optimize()
+
+        # Queries are optimized before submission if enabled
+        config.SEARCH_API_OPTIMIZE_QUERIES = True
+        try:
+            params = Session(xray | em)._make_params()
+        finally:
+            config.SEARCH_API_OPTIMIZE_QUERIES = False
+        self.assertEqual(params["query"]["type"], "terminal")
+        self.assertEqual(Session(xray | em)._make_params()["query"]["type"], "group")
+
+    def testSplitInQuery(self) -> None:
+        """Test splitting queries with oversized 'in' terminals into sub-queries, and combining their results"""
+        ids = [f"{i:04d}" for i in range(25)]
+        requests = []
+
+        def respond(request: httpx.Request) -> httpx.Response:
+            params = json.loads(request.content)
+            nodes = params["query"]["nodes"] if params["query"]["type"] == "group" else [params["query"]]
+            values = next(node["parameters"]["value"] for node in nodes if node["parameters"].get("operator") == "in")
+            requests.append(len(values))
+            # Every other ID matches, with increasing scores; "0001" matches two chunks
+            matching = [value for value in values if int(value) % 2 == 1]
+            if nodes[0]["parameters"]["negation"]:
+                matching = [value for value in ids if value not in values]
+            matching += ["0001"] if "0001" not in matching and not nodes[0]["parameters"]["negation"] else []
+            result_set = [{"identifier": value, "score": int(value) / 100} for value in matching]
+            assert params["request_options"]["results_verbosity"] == "minimal"
+            return httpx.Response(200, json={"total_count": len(result_set), "result_set": result_set})
+
+        q1 = AttributeQuery("rcsb_entry_container_identifiers.entry_id", operator="in", value=ids)
+        q2 = AttributeQuery("exptl.method", operator="exact_match", value="X-RAY DIFFRACTION")
+        config.SEARCH_API_MAX_IN_VALUES = 10
+        try:
+            with use_transport(httpx.MockTransport(respond)):
+                session = (q1 & q2)(max_concurrency=2)
+                self.assertEqual(requests, [10, 10, 5])
+                # The union is ordered by score, without duplicates
+                expected = [f"{i:04d}" for i in range(23, 0, -2)]
+                self.assertEqual(session.count, len(expected))
+                self.assertEqual(list(session), expected)
+                self.assertEqual(session.iquery(limit=3), expected[:3])
+                self.assertEqual(len(requests), 3)
+                self.assertEqual((q1 & q2)(return_counts=True), len(expected))
+                self.assertEqual(list((q1 & q2)(sort=[Sort("score", direction="asc")])), expected[::-1])
+                # Negated terminals match results matching every sub-query
+                self.assertEqual(list((~q1 | q2)()), [])
+                with self.assertRaises(ValueError):
+                    (q1 & q2)(sort=[Sort("rcsb_accession_info.initial_release_date")])
+                with self.assertRaises(ValueError):
+                    (q1 & q2)(facets=[Facet("Methods", "terms", "exptl.method")])
+                # Sub-queries share the rate limit of the session
+                waits = []
+                self.assertEqual(len(list(Session(q1 & q2, results_verbosity="minimal", rate_limiter=lambda: waits.append(1)))), len(expected))
+                self.assertEqual(len(waits), 3)
+        finally:
+            config.SEARCH_API_MAX_IN_VALUES = 10_000
+
+    def testResultSet(self) -> None:
+        """Test combining materialized result sets locally, and using them as query and DataQuery input"""
+        def respond(request: httpx.Request) -> httpx.Response:
+            params = json.loads(request.content)
+            method = params["query"]["parameters"]["value"]
+            ids = {"X-RAY DIFFRACTION": ["4HHB", "1IYE", "2LGI"], "ELECTRON MICROSCOPY": ["1IYE", "7XYZ", "5ABC"]}[method]
+            result_set = [{"identifier": id, "score": (i + 1) / 10} for i, id in enumerate(ids)]
+            if params["request_options"]["results_verbosity"] == "compact":
+                result_set = ids  # type: ignore[misc]
+            return httpx.Response(200, json={"result_type": "entry", "total_count": len(ids), "result_set": result_set})
+
+        xray = AttributeQuery("exptl.method", operator="exact_match", value="X-RAY DIFFRACTION")
+        em = AttributeQuery("exptl.method", operator="exact_match", value="ELECTRON MICROSCOPY")
+        with use_transport(httpx.MockTransport(respond)):
+            a = xray().result_set()
+            b = em(results_verbosity="minimal").result_set()
+            c = em().result_set()
+        self.assertIsInstance(a, ResultSet)
+        self.assertEqual(a.ids, ["1IYE", "2LGI", "4HHB"])
+        self.assertIsNone(a.scores)
+        self.assertEqual(b.scores, [0.1, 0.3, 0.2])
+        self.assertEqual(b.ranked(), ["5ABC", "7XYZ", "1IYE"])
+        self.assertIn("1IYE", a)
+        self.assertNotIn("7XYZ", a)
+
+        # Set operations mirror the query operators, and keep the results sorted
+        self.assertEqual(list(a & c), ["1IYE"])
+        self.assertEqual(list(a | c), ["1IYE", "2LGI", "4HHB", "5ABC", "7XYZ"])
+        self.assertEqual(list(a - c), ["2LGI", "4HHB"])
+        self.assertEqual(list(a ^ c), ["2LGI", "4HHB", "5ABC", "7XYZ"])
+        self.assertEqual(a & c, c & a)
+        self.assertEqual(list(ResultSet()), [])
+        # Scores are kept only if both operands have scores (or from the left operand of a difference)
+        self.assertIsNone((a | b).scores)
+        self.assertEqual((b - a).scores, [0.3, 0.2])
+        scored = ResultSet(["1IYE", "4HHB"], scores=[0.5, 0.05], return_type="entry")
+        self.assertEqual((b | scored).scores, [0.5, 0.05, 0.3, 0.2])
+        self.assertEqual((b & scored).score("1IYE"), 0.5)
+        with self.assertRaises(ValueError):
+            _ = a | ResultSet(["4HHB_1"], return_type="polymer_entity")
+        with self.assertRaises(ValueError):
+            ResultSet(["4HHB"], scores=[0.1, 0.2])
+
+        # Result sets can seed "in" queries and Data API queries
+        query = a.to_query()
+        self.assertEqual(query.params["attribute"], "rcsb_entry_container_identifiers.entry_id")
+        self.assertEqual(query.params["value"], ["1IYE", "2LGI", "4HHB"])
+        self.assertEqual(attrs.rcsb_entry_container_identifiers.entry_id.in_(a - c).params["value"], ["2LGI", "4HHB"])
+        with self.assertRaises(ValueError):
+            ResultSet().to_query()
+        with self.assertRaises(ValueError):
+            ResultSet(["4HHB"]).to_query()
+        data_query = DataQuery("entries", a & c, ["exptl.method"])
+        self.assertEqual(data_query.get_input_ids(), ["1IYE"])
+
+    def testRecordReplay(self) -> None:
+        """Test replaying recorded Search API responses, whose requests differ only by their random query_id"""
+        def respond(request: httpx.Request) -> httpx.Response:
+            start = json.loads(request.content)["request_options"]["paginate"]["start"]
+            result_set = [f"{i:04d}" for i in range(start, min(start + 10, 25))]
+            return httpx.Response(200, json={"result_type": "entry", "total_count": 25, "result_set": result_set})
+
+        query = AttributeQuery("exptl.method", operator="exact_match", value="ELECTRON MICROSCOPY")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cassette_path = os.path.join(tmp_dir, "responses.json")
+            cassette = Cassette(cassette_path)
+            with use_transport(RecordTransport(cassette, transport=httpx.MockTransport(respond))):
+                expected = list(query(rows=10))
+            self.assertEqual(len(expected), 25)
+            self.assertEqual(len(cassette), 3)
+            cassette.save()
+
+            with use_transport(ReplayTransport(Cassette(cassette_path))):
+                self.assertEqual(list(query(rows=10)), expected)
+                with self.assertRaises(ValueError):
+                    list(query(rows=5))
+
 
 def buildSearch() -> unittest.TestSuite:
     suiteSelect = unittest.TestSuite()
@@ -2079,6 +2495,14 @@ def buildSearch() -> unittest.TestSuite:
     suiteSelect.addTest(SearchTests("testScoringStrategy"))
     suiteSelect.addTest(SearchTests("testNestedAttributes"))
     suiteSelect.addTest(SearchTests("testNestedAttrsChecker"))
+    suiteSelect.addTest(SearchTests("testFirstPageReuse"))
+    suiteSelect.addTest(SearchTests("testConcurrentPaging"))
+    suiteSelect.addTest(SearchTests("testAsyncSession"))
+    suiteSelect.addTest(SearchTests("testSearchCache"))
+    suiteSelect.addTest(SearchTests("testOptimize"))
+    suiteSelect.addTest(SearchTests("testSplitInQuery"))
+    suiteSelect.addTest(SearchTests("testResultSet"))
+    suiteSelect.addTest(SearchTests("testRecordReplay"))
     return suiteSelect
 
 
@@ -14,7 +14,14 @@ Tests for all functions of the sequence-coordinates API module.
 import logging
 import time
 import unittest
+from unittest import mock
+import httpx
 
+from rcsbapi.config import config
+from rcsbapi.const import const
+from rcsbapi.instrumentation import INSTRUMENTATION, REQUEST_START, RETRY
+from rcsbapi.retry import CircuitBreaker, CircuitOpenError
+from rcsbapi.transport import Cassette, ReplayTransport, use_transport
 from rcsbapi.sequence.seq_query import Alignments, GroupAlignments, Annotations, GroupAnnotations, GroupAnnotationsSummary, AnnotationFilterInput
 
 logging.basicConfig(level=logging.WARNING, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
@@ -307,6 +314,55 @@ class SeqTests(unittest.TestCase):
             except Exception as error:
                 self.fail(f"Failed unexpectedly: {error}")
 
+    def testRetry(self) -> None:
+        query_obj = Alignments(
+            db_from="NCBI_PROTEIN",
+            db_to="PDB_ENTITY",
+            query_id="XP_642496",
+            return_data_list=["target_alignments.target_id"]
+        )
+        response_json = {"data": {"alignments": {"target_alignments": [{"target_id": "4Z36_1"}]}}}
+        cassette = Cassette()
+        cassette.add(httpx.Request("POST", const.SEQUENCE_API_GRAPHQL_ENDPOINT, json=dict(query_obj._query)), httpx.Response(200, json=response_json))
+        events = []
+        INSTRUMENTATION.add_listener(events.append)
+        try:
+            msg = "1. Server errors are retried through the transport"
+            logger.info("Running subtest %s", msg)
+            with self.subTest(msg=msg), mock.patch("rcsbapi.retry.CIRCUIT_BREAKER", CircuitBreaker()), mock.patch("rcsbapi.retry.time.sleep") as sleep:
+                replay = ReplayTransport(cassette, error_rate=1.0)
+                sleep.side_effect = lambda delay: setattr(replay, "error_rate", 0.0)  # the server recovers while waiting
+                events.clear()
+                with use_transport(replay):
+                    self.assertEqual(query_obj.exec(max_retries=3), response_json)
+                self.assertEqual(sleep.call_count, 1)
+                self.assertEqual([(event.api, event.status_code) for event in events if event.kind == RETRY], [("sequence", 503)])
+
+            msg = "2. Rate-limited requests wait for Retry-After"
+            logger.info("Running subtest %s", msg)
+            with self.subTest(msg=msg), mock.patch("rcsbapi.retry.CIRCUIT_BREAKER", CircuitBreaker()), mock.patch("rcsbapi.retry.time.sleep") as sleep:
+                replay = ReplayTransport(cassette, requests_per_second=1)
+                sleep.side_effect = lambda delay: setattr(replay, "requests_per_second", None)
+                with use_transport(replay):
+                    query_obj.exec()
+                    self.assertEqual(query_obj.exec(retry_backoff=5), response_json)
+                self.assertEqual(sleep.call_count, 1)
+                self.assertLessEqual(sleep.call_args[0][0], 1)  # Retry-After, rather than the backoff of at least 5 seconds
+
+            msg = "3. Circuit opens after repeated failed requests, and requests fail without being sent"
+            logger.info("Running subtest %s", msg)
+            with self.subTest(msg=msg), mock.patch("rcsbapi.retry.CIRCUIT_BREAKER", CircuitBreaker()), mock.patch("rcsbapi.retry.time.sleep"), \
+                    mock.patch.object(config, "CIRCUIT_BREAKER_THRESHOLD", 1):
+                events.clear()
+                with use_transport(ReplayTransport(cassette, error_rate=1.0)):
+                    with self.assertRaises(httpx.HTTPStatusError):
+                        query_obj.exec(max_retries=2)
+                    with self.assertRaises(CircuitOpenError):
+                        query_obj.exec(max_retries=2)
+                self.assertEqual([event.kind for event in events].count(REQUEST_START), 2)
+        finally:
+            INSTRUMENTATION.remove_listener(events.append)
+
 
 def buildQuery() -> unittest.TestSuite:
     suiteSelect = unittest.TestSuite()
@@ -316,6 +372,7 @@ def buildQuery() -> unittest.TestSuite:
     suiteSelect.addTest(SeqTests("testGroupAnnotations"))
     suiteSelect.addTest(SeqTests("testGroupAnnotationsSummary"))
     suiteSelect.addTest(SeqTests("testDocExamples"))
+    suiteSelect.addTest(SeqTests("testRetry"))
     return suiteSelect
 
 